@@ -0,0 +1 @@
+from .anytime import *
@@ -0,0 +1,202 @@
+import json
+import os
+import random
+import time
+import numpy as np
+from copy import copy
+import utils
+from classes import Data
+from classes.Placement import Placement
+
+__all__ = ["ANYTIME_ALGORITHMS", "Checkpoint", "anytime_solve"]
+
+# the solvers that can be run in rounds, each one restarting from the placement found by the previous round
+ANYTIME_ALGORITHMS = ["hill", "annealing", "genetic", "priority"]
+
+
+class Checkpoint:
+	"""
+	The state of an anytime run after a round: the best placement found and its score, the placement the next round
+	starts from and the state of the random generators, so that a resumed run goes on as the original one would.
+
+	It is stored as a .npz file, with the routers as arrays of coordinates and the scalars in a JSON header; the
+	file is written under a temporary name and then renamed, so that an interrupted save keeps the old checkpoint.
+
+	Attributes:
+
+	algorithm: the algorithm of the run
+	shape: the (n, m) shape of the building
+	round: the number of rounds completed
+	elapsed: the time spent in the rounds, in seconds, over all the sessions of the run
+	best: Placement, the best placement found, None if no round has been completed
+	best_score: the score of best
+	best_out_of_budget: True if best is out of budget
+	current: Placement, the placement the next round starts from, None to start from the initial placement of the
+		algorithm
+	random_state: the state of the random module
+	numpy_state: the state of the numpy.random generator
+	"""
+	def __init__(self, algorithm: str, shape: tuple):
+		self.algorithm = algorithm
+		self.shape = (int(shape[0]), int(shape[1]))
+		self.round = 0
+		self.elapsed = 0.0
+		self.best = None
+		self.best_score = None
+		self.best_out_of_budget = None
+		self.current = None
+		self.random_state = None
+		self.numpy_state = None
+
+	def is_better(self, score: int, out_of_budget: bool) -> bool:
+		"""
+		:return: True if a placement with the given score is better than the best one, a placement within the
+			budget is always better than one out of budget
+		"""
+		return self.best is None or (not out_of_budget, score) > (not self.best_out_of_budget, self.best_score)
+
+	def save(self, path: str):
+		header = {
+			"algorithm": self.algorithm,
+			"shape": self.shape,
+			"round": self.round,
+			"elapsed": self.elapsed,
+			"best_score": self.best_score,
+			"best_out_of_budget": self.best_out_of_budget,
+			"has_best": self.best is not None,
+			"has_current": self.current is not None,
+			"random_version": self.random_state[0],
+			"random_gauss_next": self.random_state[2],
+			"numpy_algorithm": self.numpy_state[0],
+			"numpy_position": int(self.numpy_state[2]),
+			"numpy_has_gauss": int(self.numpy_state[3]),
+			"numpy_cached_gaussian": float(self.numpy_state[4])
+		}
+		empty = np.empty(shape=(0, 2), dtype=np.int32)
+
+		temporary_path = f"{path}.tmp"
+		with open(temporary_path, "wb") as f:
+			np.savez(
+				f,
+				header=np.array(json.dumps(header)),
+				best=self.best.coords.astype(np.int32) if self.best is not None else empty,
+				current=self.current.coords.astype(np.int32) if self.current is not None else empty,
+				random_state=np.array(self.random_state[1], dtype=np.int64),
+				numpy_keys=self.numpy_state[1]
+			)
+		os.replace(temporary_path, path)
+
+	@classmethod
+	def load(cls, path: str):
+		with np.load(path, allow_pickle=False) as arrays:
+			header = json.loads(str(arrays["header"]))
+			checkpoint = cls(header["algorithm"], header["shape"])
+			checkpoint.round = header["round"]
+			checkpoint.elapsed = header["elapsed"]
+			checkpoint.best_score = header["best_score"]
+			checkpoint.best_out_of_budget = header["best_out_of_budget"]
+			if header["has_best"]:
+				checkpoint.best = Placement(checkpoint.shape, arrays["best"])
+			if header["has_current"]:
+				checkpoint.current = Placement(checkpoint.shape, arrays["current"])
+			checkpoint.random_state = (
+				header["random_version"], tuple(arrays["random_state"].tolist()), header["random_gauss_next"]
+			)
+			checkpoint.numpy_state = (
+				header["numpy_algorithm"], arrays["numpy_keys"], header["numpy_position"],
+				header["numpy_has_gauss"], header["numpy_cached_gaussian"]
+			)
+		return checkpoint
+
+
+def anytime_solve(data: Data, args, solve_round) -> Placement:
+	"""
+	Runs the algorithm selected in args in rounds until the time limit, keeping the best placement found and
+	writing it to the checkpoint file every checkpoint_interval seconds, at the end and when the run is interrupted
+	with Ctrl-C.
+
+	Each round runs the algorithm with its usual arguments (e.g. --iterations) starting from the placement found by
+	the previous round; hill climbing starts from random placements anyway, so its rounds are random restarts.
+	The time limit is checked between two rounds, so a round is never cut: a run can last up to a round more than
+	the limit. Without a time limit the rounds go on until Ctrl-C.
+
+	Every round is seeded from the random module, which is seeded by --seed and saved in the checkpoints, so a run
+	resumed from a checkpoint goes on as the original one would have.
+
+	:param data: Data, the problem instance
+	:param args: the parsed command line arguments of main.py, see main.get_parser
+	:param solve_round: function, solve_round(data, args, initial_state) runs the algorithm once from the Placement
+		initial_state (None for the initial placement of the algorithm) and returns the configuration found
+	:return: Placement, the best placement found, None if no round has been completed
+	"""
+	if args.resume is not None:
+		checkpoint = Checkpoint.load(args.resume)
+		if checkpoint.algorithm != args.algorithm or checkpoint.shape != data.matrix.shape:
+			raise ValueError(
+				f"The checkpoint {args.resume} is a run of {checkpoint.algorithm} on a {checkpoint.shape} building, "
+				f"not of {args.algorithm} on a {data.matrix.shape} building"
+			)
+		random.setstate(checkpoint.random_state)
+		np.random.set_state(checkpoint.numpy_state)
+		print(f"resuming from round {checkpoint.round}, best score: {checkpoint.best_score}")
+	else:
+		checkpoint = Checkpoint(args.algorithm, data.matrix.shape)
+		if args.seed is not None:
+			random.seed(args.seed)
+			np.random.seed(args.seed)
+
+	checkpoint_path = args.checkpoint if args.checkpoint is not None else args.resume
+	start = time.perf_counter()
+	last_checkpoint = start
+
+	def save_checkpoint():
+		if checkpoint_path is not None:
+			checkpoint.save(checkpoint_path)
+
+	# the state of the generators is the one between two rounds, a round interrupted is run again when resuming
+	checkpoint.random_state = random.getstate()
+	checkpoint.numpy_state = np.random.get_state()
+
+	try:
+		while args.time_limit is None or time.perf_counter() - start < args.time_limit:
+			round_start = time.perf_counter()
+
+			round_args = copy(args)
+			round_args.seed = random.getrandbits(31)
+			configuration = solve_round(data, round_args, checkpoint.current)
+			current = configuration if isinstance(configuration, Placement) else Placement.from_mask(configuration)
+
+			score, out_of_budget = utils.compute_fitness(
+				building_matrix=data.matrix,
+				routers_placement=current,
+				router_range=data.router_range,
+				backbone_starting_point=data.initial_backbone,
+				router_cost=data.router_cost,
+				backbone_cost=data.backbone_cost,
+				budget=data.budget,
+				coverage_index=data.coverage_index
+			)
+
+			checkpoint.current = current
+			checkpoint.round += 1
+			checkpoint.random_state = random.getstate()
+			checkpoint.numpy_state = np.random.get_state()
+			checkpoint.elapsed += time.perf_counter() - round_start
+			if checkpoint.is_better(score, out_of_budget):
+				checkpoint.best = current.copy()
+				checkpoint.best_score = int(score)
+				checkpoint.best_out_of_budget = bool(out_of_budget)
+
+			print(
+				f"round {checkpoint.round}: score {score}{' (out of budget)' if out_of_budget else ''}, "
+				f"best score {checkpoint.best_score}, elapsed {time.perf_counter() - start:.1f}s"
+			)
+
+			if time.perf_counter() - last_checkpoint >= args.checkpoint_interval:
+				save_checkpoint()
+				last_checkpoint = time.perf_counter()
+	except KeyboardInterrupt:
+		print(f"interrupted during round {checkpoint.round + 1}, keeping the best placement found so far")
+
+	save_checkpoint()
+	return checkpoint.best
@@ -1 +1,4 @@
 from .get_backbone_graph import *
+from .grid_graph_tree import *
+from .steiner import *
+from .incremental import *
@@ -1,6 +1,8 @@
 import numpy as np
 import networkx as nx
 import itertools
+from backbone.grid_graph_tree import cut_exceeding_leaves
+from backbone.steiner import get_steiner_length
 
 
 __all__ = [
@@ -9,26 +11,6 @@ __all__ = [
 ]
 
 
-def cut_exceeding_leaves(
-	g_original: nx.Graph,
-	terminal_nodes: list[tuple]
-) -> nx.Graph:
-	"""
-	Optimizes the original backbone graph by breaking loops and removing exceeding non terminals routers
-
-	:param g_original: the original graph to be optimized
-	:param terminal_nodes: list, the list containing the terminal nodes (routers and backbone initial starting point)
-	:return: a optimized copy of the original graph
-	"""
-	g = nx.minimum_spanning_tree(g_original)
-
-	leaf_nodes = [node for node in g.nodes() if g.degree(node) == 1 and node not in terminal_nodes]
-	while leaf_nodes != []:
-		g.remove_nodes_from(leaf_nodes)
-		leaf_nodes = [node for node in g.nodes() if g.degree(node) == 1 and node not in terminal_nodes]
-
-	return g
-
 def get_chebyshev_distance(point1: tuple, point2: tuple):
 	x1, y1 = point1
 	x2, y2 = point2
@@ -116,17 +98,18 @@ def get_backbone_length(
 		backbone_unit_cost: int
 ) -> int:
 	"""
-	Returns the length of the minimum sized graph connecting all the routers and the backbone starting points
+	Returns the length of the minimum sized graph connecting all the routers and the backbone starting points.
+	The graph is approximated with the tree of backbone.get_steiner_tree, computed directly on the coordinates of
+	the routers, without building the grid graph of get_backbone_graph.
 
 	:param backbone_starting_point: tuple of ints, the x,y coordinates of the backbone starting point inside the matrix
 	:param routers_placement: array of arrays, the matrix describing the placement of routers inside the building
 	:param backbone_unit_cost: int, cost of a single unit of the backbone
 	:return: the len of the minimum sized graph that connects all the routers and the starting point
 	"""
-	return len(
-		get_backbone_graph(
-			backbone_starting_point,
-			routers_placement,
-			backbone_unit_cost
-		)
+	return get_steiner_length(
+		backbone_starting_point,
+		np.transpose(np.nonzero(routers_placement)),
+		routers_placement.shape,
+		backbone_unit_cost
 	)
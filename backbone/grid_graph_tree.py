@@ -0,0 +1,171 @@
+import heapq
+import itertools
+import numpy as np
+import networkx as nx
+
+
+__all__ = [
+	"cut_exceeding_leaves",
+	"get_grid_graph_tree"
+]
+
+# the neighbors of a cell in the order of the adjacency of the grid graph built by get_backbone_graph: vertical,
+# horizontal, then the two diagonals
+NEIGHBOR_STEPS = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (1, 1), (-1, 1), (1, -1)]
+
+
+def cut_exceeding_leaves(
+	g_original: nx.Graph,
+	terminal_nodes: list[tuple]
+) -> nx.Graph:
+	"""
+	Optimizes the original backbone graph by breaking loops and removing exceeding non terminals routers
+
+	:param g_original: the original graph to be optimized
+	:param terminal_nodes: list, the list containing the terminal nodes (routers and backbone initial starting point)
+	:return: a optimized copy of the original graph
+	"""
+	g = nx.minimum_spanning_tree(g_original)
+
+	leaf_nodes = [node for node in g.nodes() if g.degree(node) == 1 and node not in terminal_nodes]
+	while leaf_nodes != []:
+		g.remove_nodes_from(leaf_nodes)
+		leaf_nodes = [node for node in g.nodes() if g.degree(node) == 1 and node not in terminal_nodes]
+
+	return g
+
+
+def _astar_path(
+		shape: tuple,
+		laid_edges: set,
+		source: tuple,
+		target: tuple,
+		backbone_unit_cost: int,
+		max_expansions: float
+) -> tuple:
+	"""
+	networkx.astar_path on the grid graph of get_backbone_graph, with its Chebyshev heuristic, where the edges
+	already laid cost nothing; the grid is never built, the neighbors of a cell are visited in the order of its
+	adjacency, so that the ties are broken the same way and the same path is found
+
+	:return: tuple, the path as a list of cells, None if more than max_expansions cells had to be expanded, and
+		the number of cells expanded
+	"""
+	n, m = shape
+	target_row, target_column = target
+	counter = itertools.count()
+	queue = [(0, next(counter), source, 0, None)]
+	enqueued = {}
+	explored = {}
+
+	while queue:
+		_, _, cell, distance, parent = heapq.heappop(queue)
+
+		if cell == target:
+			path = [cell]
+			while parent is not None:
+				path.append(parent)
+				parent = explored[parent]
+			path.reverse()
+			return path, len(explored)
+
+		if cell in explored:
+			if explored[cell] is None:
+				continue
+			queued_distance, _ = enqueued[cell]
+			if queued_distance < distance:
+				continue
+
+		explored[cell] = parent
+		if len(explored) > max_expansions:
+			return None, len(explored)
+
+		row, column = cell
+		for row_step, column_step in NEIGHBOR_STEPS:
+			neighbor = (row + row_step, column + column_step)
+			if not (0 <= neighbor[0] < n and 0 <= neighbor[1] < m):
+				continue
+
+			neighbor_distance = distance + (0 if (cell, neighbor) in laid_edges else backbone_unit_cost)
+			if neighbor in enqueued:
+				queued_distance, heuristic = enqueued[neighbor]
+				if queued_distance <= neighbor_distance:
+					continue
+			else:
+				heuristic = max(abs(neighbor[0] - target_row), abs(neighbor[1] - target_column))
+
+			enqueued[neighbor] = neighbor_distance, heuristic
+			heapq.heappush(queue, (neighbor_distance + heuristic, next(counter), neighbor, neighbor_distance, cell))
+
+	return None, len(explored)
+
+
+def get_grid_graph_tree(
+		shape: tuple,
+		backbone_starting_point: tuple,
+		routers_coords: np.array,
+		backbone_unit_cost: int = 1,
+		max_expansions: float = np.inf
+) -> np.array:
+	"""
+	Finds the same tree of get_backbone_graph working on coordinates, without building the grid graph of the
+	building: the A* paths from the backbone starting point to the routers, taken in the same order, are searched
+	on the grid itself, and only the graph of the edges laid is built to break its loops and cut its leaves.
+
+	The tree is the same only as long as the ties are broken the same way: the searches follow the order of the
+	queue of networkx.astar_path and of the adjacency of nx.grid_2d_graph, and the laid edges are given to
+	minimum_spanning_tree in the order of the grid graph; a change of any of them in networkx can make the trees
+	differ (see the tests of backbone).
+
+	The searches still expand many cells, often a large part of the square between the backbone starting point
+	and the router, so they can be stopped after max_expansions expanded cells.
+
+	:param shape: tuple, the shape of the building
+	:param backbone_starting_point: tuple of ints, the x,y coordinates of the backbone starting point inside the matrix
+	:param routers_coords: array of shape (n, 2), the coordinates of the routers
+	:param backbone_unit_cost: int, cost of a single unit of backbone
+	:param max_expansions: int, the maximum number of cells expanded by all the searches, unlimited by default
+	:return: array of shape (k, 2), the cells of the tree, the first one is the backbone starting point; None if
+		the searches were stopped
+	"""
+	backbone_starting_point = tuple(int(coordinate) for coordinate in backbone_starting_point)
+	# the routers in the order of np.nonzero, as get_backbone_graph takes them
+	routers = [tuple(router) for router in np.unique(np.reshape(routers_coords, (-1, 2)), axis=0).tolist()]
+	if len(routers) == 0:
+		return np.array([backbone_starting_point])
+
+	laid_edges = set()
+	for router in routers:
+		path, expansions = _astar_path(
+			shape, laid_edges, backbone_starting_point, router, backbone_unit_cost, max_expansions
+		)
+		if path is None:
+			return None
+		max_expansions -= expansions
+		for u, v in itertools.pairwise(path):
+			laid_edges.update([(u, v), (v, u)])
+
+	# the graph of the laid edges, with its nodes and edges in the order of the grid graph, so that
+	# minimum_spanning_tree breaks the loops as it does in get_backbone_graph
+	g = nx.Graph()
+	g.add_nodes_from(sorted({u for u, _ in laid_edges}))
+	edges = {(min(u, v), max(u, v)) for u, v in laid_edges}
+	g.add_edges_from(sorted(
+		((v, u) for u, v in edges if u[1] == v[1]),
+		key=lambda edge: (edge[1][0], edge[0][1])
+	))
+	g.add_edges_from(sorted(
+		((v, u) for u, v in edges if u[0] == v[0]),
+		key=lambda edge: (edge[0][0], edge[1][1])
+	))
+	g.add_edges_from(sorted(
+		(u, v) for u, v in edges if u[0] != v[0] and u[1] < v[1]
+	))
+	g.add_edges_from(sorted(
+		((v, u) for u, v in edges if u[0] != v[0] and u[1] > v[1]),
+		key=lambda edge: (edge[1][0], edge[0][1])
+	))
+
+	g = cut_exceeding_leaves(g, routers + [backbone_starting_point])
+	cells = [backbone_starting_point] + [node for node in g.nodes() if node != backbone_starting_point]
+	return np.array(cells)
@@ -0,0 +1,221 @@
+import numpy as np
+from backbone.steiner import get_chebyshev_path
+
+
+__all__ = ["IncrementalBackbone"]
+
+
+class IncrementalBackbone:
+	"""
+	Backbone tree maintained under insertions and deletions of routers, without rebuilding it.
+
+	A new router is attached with a shortest 8-connected path to the nearest cell of the tree (in Chebyshev
+	distance), as done by backbone.grow_steiner_tree; a removed router is detached by pruning the branch that is
+	left dangling, i.e. the chain of cells leading to it that do not serve any other router. The tree is stored as
+	parent pointers rooted in the backbone starting point, with the number of children of every cell, while the
+	coordinates of the cells are kept in a compact array for vectorized nearest cell queries.
+
+	The length is counted as done by backbone.get_backbone_length: it is the number of cells of the tree, the
+	starting point included, or 0 if the tree has no cells other than the starting point.
+	"""
+
+	def __init__(self, backbone_starting_point: tuple, routers_coords: np.array = None):
+		"""
+		:param backbone_starting_point: tuple of ints, the x,y coordinates of the backbone starting point
+		:param routers_coords: array of shape (n, 2), the coordinates of the initial routers, optional
+		"""
+		self.root = (int(backbone_starting_point[0]), int(backbone_starting_point[1]))
+		self.routers = set()
+
+		self._parent = {self.root: None}
+		self._children = {self.root: 0}
+		self._cell_array = np.empty(shape=(64, 2), dtype=np.int64)
+		self._cell_array[0] = self.root
+		self._cell_index = {self.root: 0}
+
+		if routers_coords is not None:
+			for router in np.reshape(routers_coords, (-1, 2)):
+				self.add(router)
+
+	@staticmethod
+	def _length(number_cells: int) -> int:
+		return number_cells if number_cells > 1 else 0
+
+	@property
+	def length(self) -> int:
+		return self._length(len(self._cell_index))
+
+	@property
+	def cells(self) -> np.array:
+		"""
+		:return: array of shape (k, 2), the cells of the tree
+		"""
+		return self._cell_array[:len(self._cell_index)].copy()
+
+	@property
+	def number_cells(self) -> int:
+		return len(self._cell_index)
+
+	def __contains__(self, cell: tuple) -> bool:
+		return (int(cell[0]), int(cell[1])) in self._cell_index
+
+	def _nearest_cell(self, cell: tuple, exclude: list = ()) -> tuple:
+		"""
+		:param cell: tuple, the (x,y) coordinates of a cell
+		:param exclude: list of tuples, cells of the tree not to be considered
+		:return: tuple, the nearest cell of the tree and its Chebyshev distance from cell
+		"""
+		cells = self._cell_array[:len(self._cell_index)]
+		distances = np.maximum(np.abs(cells[:, 0] - cell[0]), np.abs(cells[:, 1] - cell[1]))
+		for excluded in exclude:
+			distances[self._cell_index[excluded]] = np.iinfo(np.int64).max
+
+		i = np.argmin(distances)
+		return (int(cells[i][0]), int(cells[i][1])), int(distances[i])
+
+	def distance(self, cell: tuple, since: int = 0) -> int:
+		"""
+		:param cell: tuple, the (x,y) coordinates of a cell
+		:param since: int, if given only the cells inserted after the first since ones are considered; as removals
+			move the last cells in the rows of the removed ones, this is meaningful only while no router is removed
+		:return: the Chebyshev distance of cell from the (considered) cells of the tree, None if there are none
+		"""
+		cells = self._cell_array[since:len(self._cell_index)]
+		if len(cells) == 0:
+			return None
+		return int(np.min(np.maximum(np.abs(cells[:, 0] - cell[0]), np.abs(cells[:, 1] - cell[1]))))
+
+	def distances(self, cells: np.array, since: int = 0) -> np.array:
+		"""
+		Vectorized distance of many cells
+
+		:param cells: array of shape (k, 2), the (x,y) coordinates of the cells
+		:param since: int, see distance
+		:return: array of ints of length k, the distances, None if there are no cells of the tree to consider
+		"""
+		tree_cells = self._cell_array[since:len(self._cell_index)]
+		if len(tree_cells) == 0:
+			return None
+		return np.min(np.maximum(
+			np.abs(cells[:, 0, np.newaxis] - tree_cells[np.newaxis, :, 0]),
+			np.abs(cells[:, 1, np.newaxis] - tree_cells[np.newaxis, :, 1])
+		), axis=1)
+
+	def _dangling_branch(self, router: tuple) -> list:
+		"""
+		:param router: tuple, the (x,y) coordinates of a router of the tree
+		:return: list of tuples, the cells that would be pruned removing the router, starting from the router
+		"""
+		if router == self.root or self._children[router] > 0:
+			return []
+
+		branch = [router]
+		parent = self._parent[router]
+		# the parent is dangling too only if the branch is its only child and it does not hold another router
+		while parent != self.root and self._children[parent] == 1 and parent not in self.routers:
+			branch.append(parent)
+			parent = self._parent[parent]
+		return branch
+
+	def _insert_cell(self, cell: tuple, parent: tuple):
+		self._parent[cell] = parent
+		self._children[cell] = 0
+		self._children[parent] += 1
+
+		if len(self._cell_index) == len(self._cell_array):
+			self._cell_array = np.concatenate((self._cell_array, np.empty_like(self._cell_array)))
+		self._cell_array[len(self._cell_index)] = cell
+		self._cell_index[cell] = len(self._cell_index)
+
+	def _delete_cell(self, cell: tuple):
+		self._children[self._parent.pop(cell)] -= 1
+		del self._children[cell]
+
+		# move the last cell in the row of the deleted one
+		row = self._cell_index.pop(cell)
+		last = len(self._cell_index)
+		if row != last:
+			moved = (int(self._cell_array[last][0]), int(self._cell_array[last][1]))
+			self._cell_array[row] = self._cell_array[last]
+			self._cell_index[moved] = row
+
+	def delta_add(self, router: tuple, exclude: list = ()) -> int:
+		"""
+		:param router: tuple, the (x,y) coordinates of the new router
+		:param exclude: list of tuples, cells of the tree to be considered as already removed
+		:return: the variation of the length of the backbone if the router is added
+		"""
+		router = (int(router[0]), int(router[1]))
+		number_cells = len(self._cell_index) - len(exclude)
+		if router not in self._cell_index or router in exclude:
+			_, distance = self._nearest_cell(router, exclude)
+			number_cells += distance
+
+		return self._length(number_cells) - self.length
+
+	def delta_remove(self, router: tuple) -> int:
+		"""
+		:param router: tuple, the (x,y) coordinates of the router to remove
+		:return: the variation of the length of the backbone if the router is removed
+		"""
+		router = (int(router[0]), int(router[1]))
+		if router not in self.routers:
+			return 0
+
+		return self._length(len(self._cell_index) - len(self._dangling_branch(router))) - self.length
+
+	def delta_move(self, src: tuple, dst: tuple) -> int:
+		"""
+		:param src: tuple, the (x,y) coordinates of the router to move
+		:param dst: tuple, the (x,y) coordinates where the router is moved
+		:return: the variation of the length of the backbone if the router in src is moved in dst
+		"""
+		src = (int(src[0]), int(src[1]))
+		if src not in self.routers:
+			return self.delta_add(dst)
+
+		return self.delta_add(dst, exclude=self._dangling_branch(src))
+
+	def add(self, router: tuple):
+		"""
+		Connects a router to the nearest cell of the tree
+
+		:param router: tuple, the (x,y) coordinates of the new router
+		"""
+		router = (int(router[0]), int(router[1]))
+		self.routers.add(router)
+		if router in self._cell_index:
+			return
+
+		parent, _ = self._nearest_cell(router)
+		for cell in get_chebyshev_path(parent, router).tolist():
+			cell = tuple(cell)
+			self._insert_cell(cell, parent)
+			parent = cell
+
+	def remove(self, router: tuple):
+		"""
+		Disconnects a router, pruning the branch left dangling
+
+		:param router: tuple, the (x,y) coordinates of the router to remove
+		"""
+		router = (int(router[0]), int(router[1]))
+		if router not in self.routers:
+			return
+
+		branch = self._dangling_branch(router)
+		self.routers.remove(router)
+		for cell in branch:
+			self._delete_cell(cell)
+
+	def update(self, routers_coords: np.array):
+		"""
+		Adds and removes routers so that the routers of the tree are exactly the given ones
+
+		:param routers_coords: array of shape (n, 2), the coordinates of the routers
+		"""
+		routers = set(map(tuple, np.reshape(routers_coords, (-1, 2)).tolist()))
+		for router in self.routers - routers:
+			self.remove(router)
+		for router in routers - self.routers:
+			self.add(router)
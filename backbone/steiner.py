@@ -0,0 +1,179 @@
+import numpy as np
+from backbone.grid_graph_tree import get_grid_graph_tree
+
+
+__all__ = [
+	"get_chebyshev_path",
+	"grow_steiner_tree",
+	"get_steiner_tree",
+	"get_steiner_length"
+]
+
+# the maximum number of cells expanded by the searches of get_grid_graph_tree when it is compared with the Steiner
+# tree, about 30ms
+GRID_GRAPH_MAX_EXPANSIONS = 4096
+
+
+def get_chebyshev_path(source: tuple, destination: tuple, diagonal_first: bool = True) -> np.array:
+	"""
+	Returns a shortest path between two cells of the 8-connected grid: the path is made of a diagonal segment and
+	of a straight (horizontal or vertical) one.
+
+	:param source: tuple of ints, the x,y coordinates of the first cell
+	:param destination: tuple of ints, the x,y coordinates of the last cell
+	:param diagonal_first: bool, if True the path starts moving diagonally until the destination is aligned on a
+		row or a column, otherwise it starts with the straight segment
+	:return: array of shape (d, 2), the cells of the path without the source, where d is the Chebyshev distance
+	"""
+	(x1, y1), (x2, y2) = source, destination
+	dx, dy = abs(x2 - x1), abs(y2 - y1)
+	length = max(dx, dy)
+
+	steps = np.arange(1, length + 1)
+	if diagonal_first:
+		row_steps, column_steps = np.minimum(steps, dx), np.minimum(steps, dy)
+	else:
+		row_steps, column_steps = np.maximum(steps - (length - dx), 0), np.maximum(steps - (length - dy), 0)
+
+	return np.transpose([x1 + np.sign(x2 - x1) * row_steps, y1 + np.sign(y2 - y1) * column_steps])
+
+
+def grow_steiner_tree(backbone_starting_point: tuple, routers_coords: np.array) -> np.array:
+	"""
+	Finds an approximation of the minimum Steiner tree connecting the routers and the backbone starting point
+	on the 8-connected grid, working only on coordinates.
+
+	The tree grows from the backbone starting point: at each step the router nearest to the tree, in Chebyshev
+	distance, is connected with a shortest path to its nearest cell of the tree, so that every cell already laid
+	(not only routers) acts as a Steiner point. The cost is never greater than the one of the minimum spanning
+	tree of the routers and the starting point over Chebyshev distances.
+
+	Between the two shapes of path (diagonal segment first or last) the one bringing the tree closer to the
+	routers still to connect is laid.
+
+	:param backbone_starting_point: tuple of ints, the x,y coordinates of the backbone starting point inside the matrix
+	:param routers_coords: array of shape (n, 2), the coordinates of the routers
+	:return: array of shape (k, 2), the cells of the tree, the first one is the backbone starting point
+	"""
+	tree = [np.array([backbone_starting_point])]
+
+	routers = np.unique(np.reshape(routers_coords, (-1, 2)).astype(np.int64), axis=0)
+	if len(routers) == 0:
+		return tree[0]
+
+	# the routers still to connect are kept in the first n rows, with their distance to the tree and their
+	# nearest cell of the tree; a connected router is swapped with the last one
+	rows, columns = routers[:, 0].copy(), routers[:, 1].copy()
+	nearest_rows = np.full(len(routers), backbone_starting_point[0], dtype=np.int64)
+	nearest_columns = np.full(len(routers), backbone_starting_point[1], dtype=np.int64)
+	distances = np.maximum(np.abs(rows - nearest_rows), np.abs(columns - nearest_columns))
+	arrays = [rows, columns, nearest_rows, nearest_columns, distances]
+
+	n = len(routers)
+	while n > 0:
+		i = np.argmin(distances[:n])
+		router = (rows[i], columns[i])
+		nearest_cell = (nearest_rows[i], nearest_columns[i])
+		distance = distances[i]
+
+		n -= 1
+		for array in arrays:
+			array[i] = array[n]
+
+		if distance == 0:  # the router lies on the tree
+			continue
+
+		best = None
+		for diagonal_first in [True, False]:
+			path = get_chebyshev_path(nearest_cell, router, diagonal_first)
+
+			# only the routers nearer to the bounding box of the path than to the tree can get closer to the tree
+			(lower_row, lower_column), (upper_row, upper_column) = path.min(axis=0), path.max(axis=0)
+			box_distances = np.maximum(
+				np.maximum(lower_row - rows[:n], rows[:n] - upper_row),
+				np.maximum(lower_column - columns[:n], columns[:n] - upper_column)
+			)
+			candidates = np.flatnonzero(box_distances < distances[:n])
+
+			# distances of the candidates from the new cells
+			path_distances = np.maximum(
+				np.abs(rows[candidates, np.newaxis] - path[np.newaxis, :, 0]),
+				np.abs(columns[candidates, np.newaxis] - path[np.newaxis, :, 1])
+			)
+			nearest_on_path = np.argmin(path_distances, axis=1)
+			new_distances = path_distances[np.arange(len(candidates)), nearest_on_path]
+			gain = np.maximum(distances[candidates] - new_distances, 0).sum()
+
+			if best is None or gain > best[0]:
+				best = (gain, path, candidates, nearest_on_path, new_distances)
+
+		_, path, candidates, nearest_on_path, new_distances = best
+		tree.append(path)
+
+		# updating the distances of the routers still to connect with the new cells
+		closer = new_distances < distances[candidates]
+		candidates, nearest_on_path = candidates[closer], nearest_on_path[closer]
+		distances[candidates] = new_distances[closer]
+		nearest_rows[candidates] = path[nearest_on_path, 0]
+		nearest_columns[candidates] = path[nearest_on_path, 1]
+
+	return np.concatenate(tree)
+
+
+def get_steiner_tree(
+		backbone_starting_point: tuple,
+		routers_coords: np.array,
+		shape: tuple = None,
+		backbone_unit_cost: int = 1
+) -> np.array:
+	"""
+	Finds the tree connecting the routers and the backbone starting point with grow_steiner_tree, or with
+	get_grid_graph_tree, the tree of get_backbone_graph, if it has fewer cells.
+
+	The tree of get_backbone_graph is much longer on most placements, but it can be a few cells shorter when there
+	are few routers; its searches are costly, so it is looked for only if they can expand at most
+	GRID_GRAPH_MAX_EXPANSIONS cells: they expand at least the cells of the paths, so the distances of the routers
+	from the starting point must add up to less than that, and they are stopped beyond it. So the tree is never
+	longer than the one of get_backbone_graph only below that limit: above it the tree of grow_steiner_tree is
+	returned without any comparison, and nothing bounds its length by the one of get_backbone_graph.
+
+	:param backbone_starting_point: tuple of ints, the x,y coordinates of the backbone starting point inside the matrix
+	:param routers_coords: array of shape (n, 2), the coordinates of the routers
+	:param shape: tuple, the shape of the building, if None the tree of get_backbone_graph is not looked for
+	:param backbone_unit_cost: int, cost of a single unit of backbone, used by get_backbone_graph to weight its paths
+	:return: array of shape (k, 2), the cells of the tree, the first one is the backbone starting point
+	"""
+	tree = grow_steiner_tree(backbone_starting_point, routers_coords)
+	if shape is None:
+		return tree
+
+	routers = np.reshape(routers_coords, (-1, 2))
+	if np.abs(routers - backbone_starting_point).max(axis=1, initial=0).sum() > GRID_GRAPH_MAX_EXPANSIONS:
+		return tree
+
+	grid_graph_tree = get_grid_graph_tree(
+		shape, backbone_starting_point, routers, backbone_unit_cost, GRID_GRAPH_MAX_EXPANSIONS
+	)
+	if grid_graph_tree is not None and len(grid_graph_tree) < len(tree):
+		return grid_graph_tree
+	return tree
+
+
+def get_steiner_length(
+		backbone_starting_point: tuple,
+		routers_coords: np.array,
+		shape: tuple = None,
+		backbone_unit_cost: int = 1
+) -> int:
+	"""
+	Returns the number of cells of the tree found by get_steiner_tree, counting the backbone starting point as
+	done by get_backbone_length; it is 0 if the tree has no cells other than the starting point
+
+	:param backbone_starting_point: tuple of ints, the x,y coordinates of the backbone starting point inside the matrix
+	:param routers_coords: array of shape (n, 2), the coordinates of the routers
+	:param shape: tuple, the shape of the building, see get_steiner_tree
+	:param backbone_unit_cost: int, cost of a single unit of backbone, see get_steiner_tree
+	:return: the number of cells of the tree
+	"""
+	length = len(get_steiner_tree(backbone_starting_point, routers_coords, shape, backbone_unit_cost))
+	return length if length > 1 else 0
@@ -0,0 +1,81 @@
+"""
+Compares the set based coverage evaluation with the vectorized one on the Hash Code datasets.
+
+usage: python -m benchmarks.coverage [--datasets NAME ...] [--repeat N]
+"""
+import argparse
+import time
+import utils
+from classes.Data import Data
+
+DATASETS = ["charleston_road", "rue_de_londres", "opera", "lets_go_higher"]
+
+
+def get_covered_cells_reference(routers_placement, building_matrix, router_range) -> set:
+	"""
+	The router by router evaluation replaced by the vectorized one: the cells around each router are filtered one
+	at a time, scanning the rectangle between the router and each cell for walls
+	"""
+	covered_cells = set()
+	for router_coords in zip(*routers_placement.nonzero()):
+		covered_cells.update(utils.filter_non_target_points(
+			building_matrix,
+			router_coords,
+			utils.get_points_around_router(building_matrix, router_coords, router_range)
+		))
+	return covered_cells
+
+
+def timeit(function, repeat: int) -> tuple:
+	"""
+	:return: tuple, the best wall time over the repetitions and the value returned by the function
+	"""
+	best = float("inf")
+	for _ in range(repeat):
+		start = time.perf_counter()
+		value = function()
+		best = min(best, time.perf_counter() - start)
+	return best, value
+
+
+def run(dataset: str, repeat: int) -> dict:
+	data = Data(f"Dataset/{dataset}.in")
+	routers_placement = utils.get_grid_router_placement(data=data, rescale_range_factor=0.7)
+
+	reference_time, reference_cells = timeit(
+		lambda: get_covered_cells_reference(routers_placement, data.matrix, data.router_range), 1
+	)
+	vectorized_time, (_, vectorized_count) = timeit(
+		lambda: utils.get_coverage_mask(routers_placement, data.matrix, data.router_range), repeat
+	)
+	index_build_time, coverage_index = timeit(lambda: data.coverage_index, 1)
+	indexed_time, (_, indexed_count) = timeit(
+		lambda: utils.get_coverage_mask(routers_placement, data.matrix, data.router_range, coverage_index), repeat
+	)
+	assert len(reference_cells) == vectorized_count == indexed_count
+
+	return {
+		"dataset": dataset,
+		"routers": utils.get_number_routers(routers_placement),
+		"covered": vectorized_count,
+		"reference": reference_time,
+		"vectorized": vectorized_time,
+		"index_build": index_build_time,
+		"indexed": indexed_time
+	}
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser()
+	parser.add_argument("--datasets", nargs="+", default=DATASETS, help="Datasets (inside Dataset/) to benchmark")
+	parser.add_argument("--repeat", type=int, default=5, help="Repetitions of the vectorized evaluations")
+	args = parser.parse_args()
+
+	print(f"{'dataset':<16}{'routers':>8}{'covered':>9}{'reference':>11}{'vectorized':>12}{'speedup':>9}{'index':>9}{'indexed':>10}{'speedup':>9}")
+	for dataset in args.datasets:
+		r = run(dataset, args.repeat)
+		print(
+			f"{r['dataset']:<16}{r['routers']:>8}{r['covered']:>9}"
+			f"{r['reference']:>10.3f}s{r['vectorized']:>11.4f}s{r['reference'] / r['vectorized']:>8.0f}x"
+			f"{r['index_build']:>8.2f}s{r['indexed']:>9.4f}s{r['reference'] / r['indexed']:>8.0f}x"
+		)
@@ -0,0 +1,220 @@
+"""
+Times the loading of the data, the main evaluations and one fixed-seed run of each solver on the Hash Code
+datasets, recording wall time, peak RSS and final score of each case to JSON, and compares them with a stored
+baseline to spot regressions.
+
+Each case runs in a new process, so that its peak RSS is not hidden by the cases run before it; the peak RSS of
+the worker processes spawned by a solver is not included.
+
+usage: python -m benchmarks.suite [--datasets NAME ...] [--cases NAME ...] [--all] [--seed N] [--output PATH]
+                                  [--baseline PATH] [--save-baseline] [--tolerance T]
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import resource
+import sys
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+DATASETS = ["tiny_test", "charleston_road", "rue_de_londres", "opera", "lets_go_higher"]
+OPERATIONS = ["load", "coverage", "fitness", "backbone_graph"]
+SOLVERS = ["hill", "annealing", "genetic", "priority", "greedy"]
+
+# command line arguments of main.py used for the run of each solver
+SOLVER_ARGUMENTS = {
+	"hill": ["--max_step", "1"],
+	"annealing": ["-i", "2000"],
+	"genetic": ["-i", "2"],
+	"priority": ["-i", "10"],
+	"greedy": []
+}
+
+# the runs left out by default, taking several minutes: hill climbing has no bound on the number of steps, while
+# the priority solver on opera.in removes routers one at a time until the placement is back in budget
+SKIPPED = {
+	"hill": ["opera", "lets_go_higher"],
+	"priority": ["opera"]
+}
+
+# slowdowns smaller than this (in seconds) are considered noise
+MIN_TIME_DIFFERENCE = 0.01
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results.json")
+
+
+def get_fitness(data, routers_placement) -> int:
+	import utils
+	score, _ = utils.compute_fitness(
+		building_matrix=data.matrix,
+		routers_placement=routers_placement,
+		router_range=data.router_range,
+		backbone_starting_point=data.initial_backbone,
+		router_cost=data.router_cost,
+		backbone_cost=data.backbone_cost,
+		budget=data.budget,
+		coverage_index=data.coverage_index
+	)
+	return int(score)
+
+
+def time_case(case: str, file_path: str, seed: int) -> tuple:
+	"""
+	Runs a case, timing only the operation under test
+
+	:return: tuple, the wall time and the score of the case (None for the cases not producing a placement)
+	"""
+	import utils
+	import backbone
+	import main
+	from classes.Data import Data
+
+	if case == "load":
+		start = time.perf_counter()
+		Data(file_path)
+		return time.perf_counter() - start, None
+
+	data = Data(file_path)
+
+	if case in SOLVERS:
+		args = main.get_parser().parse_args([file_path, case, "--seed", str(seed)] + SOLVER_ARGUMENTS[case])
+		start = time.perf_counter()
+		best_configuration = main.solve(data, args)
+		wall_time = time.perf_counter() - start
+		return wall_time, get_fitness(data, best_configuration)
+
+	# the evaluations are timed on the grid placement, with the coverage index already built
+	routers_placement = utils.get_grid_router_placement(data=data, rescale_range_factor=0.7)
+	coverage_index = data.coverage_index
+
+	start = time.perf_counter()
+	if case == "coverage":
+		utils.get_number_covered_cells(routers_placement, data.matrix, data.router_range, coverage_index)
+	elif case == "fitness":
+		get_fitness(data, routers_placement)
+	elif case == "backbone_graph":
+		backbone.get_backbone_graph(data.initial_backbone, routers_placement, data.backbone_cost)
+	else:
+		raise ValueError(f"Case {case} not supported")
+	wall_time = time.perf_counter() - start
+
+	return wall_time, get_fitness(data, routers_placement)
+
+
+def run_case(case: str, dataset: str, seed: int) -> dict:
+	"""
+	Runs a case inside the current process, to be called in a new process
+
+	:return: dict, the result of the case
+	"""
+	import matplotlib
+	matplotlib.use("Agg")  # the solvers plot their progress
+
+	with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+		wall_time, score = time_case(case, f"Dataset/{dataset}.in", seed)
+
+	# ru_maxrss is in kilobytes on Linux and in bytes on macOS
+	peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+	return {
+		"dataset": dataset,
+		"case": case,
+		"wall_time": wall_time,
+		"peak_rss": peak_rss,
+		"score": score
+	}
+
+
+def run(datasets: list, cases: list, seed: int, skip: bool = True) -> dict:
+	results = []
+	for dataset in datasets:
+		for case in cases:
+			if skip and dataset in SKIPPED.get(case, []):
+				continue
+
+			with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+				result = executor.submit(run_case, case, dataset, seed).result()
+			results.append(result)
+			print(
+				f"{dataset:<16}{case:<16}{result['wall_time']:>10.3f}s{result['peak_rss'] / 2**20:>9.1f}MB"
+				f"{result['score'] if result['score'] is not None else '-':>12}"
+			)
+
+	return {
+		"environment": {
+			"python": platform.python_version(),
+			"numpy": np.__version__,
+			"platform": platform.platform(),
+			"processors": os.cpu_count()
+		},
+		"seed": seed,
+		"results": results
+	}
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list:
+	"""
+	Compares the results with the ones of the baseline: a case regresses if it is slower or takes more memory
+	than the baseline by more than tolerance (relative), or if its score is lower; slowdowns shorter than
+	MIN_TIME_DIFFERENCE are ignored
+
+	:return: list of strings, the description of the regressions
+	"""
+	baseline_results = {(r["dataset"], r["case"]): r for r in baseline["results"]}
+	regressions = []
+
+	print(f"\n{'dataset':<16}{'case':<16}{'time':>9}{'rss':>9}{'score':>14}")
+	for result in report["results"]:
+		reference = baseline_results.get((result["dataset"], result["case"]))
+		if reference is None:
+			continue
+
+		time_ratio = result["wall_time"] / max(reference["wall_time"], 1e-9)
+		rss_ratio = result["peak_rss"] / max(reference["peak_rss"], 1)
+		score_delta = (
+			result["score"] - reference["score"]
+			if result["score"] is not None and reference["score"] is not None else 0
+		)
+		print(f"{result['dataset']:<16}{result['case']:<16}{time_ratio:>8.2f}x{rss_ratio:>8.2f}x{score_delta:>+14}")
+
+		name = f"{result['dataset']} {result['case']}"
+		if time_ratio > 1 + tolerance and result["wall_time"] - reference["wall_time"] > MIN_TIME_DIFFERENCE:
+			regressions.append(f"{name}: wall time {time_ratio:.2f}x the baseline")
+		if rss_ratio > 1 + tolerance:
+			regressions.append(f"{name}: peak RSS {rss_ratio:.2f}x the baseline")
+		if score_delta < 0:
+			regressions.append(f"{name}: score {score_delta} from the baseline")
+
+	return regressions
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser()
+	parser.add_argument("--datasets", nargs="+", default=DATASETS, help="Datasets (inside Dataset/) to benchmark")
+	parser.add_argument("--cases", nargs="+", default=OPERATIONS + SOLVERS, choices=OPERATIONS + SOLVERS, help="Cases to run")
+	parser.add_argument("--all", action="store_true", help="Run also the cases skipped by default, see SKIPPED")
+	parser.add_argument("--seed", type=int, default=0, help="Seed of the solvers runs")
+	parser.add_argument("--output", default=OUTPUT, help="Path of the JSON report")
+	parser.add_argument("--baseline", default=BASELINE, help="Path of the JSON baseline to compare with")
+	parser.add_argument("--save-baseline", action="store_true", help="Store the report as the new baseline")
+	parser.add_argument("--tolerance", type=float, default=0.25, help="Relative slowdown or memory increase allowed")
+	args = parser.parse_args()
+
+	report = run(args.datasets, args.cases, args.seed, skip=not args.all)
+	with open(args.output, "w") as f:
+		json.dump(report, f, indent=1)
+
+	if args.save_baseline:
+		with open(args.baseline, "w") as f:
+			json.dump(report, f, indent=1)
+	elif os.path.exists(args.baseline):
+		with open(args.baseline, "r") as f:
+			regressions = compare(report, json.load(f), args.tolerance)
+
+		print("\n".join(["", "Regressions:"] + regressions) if regressions else "\nNo regressions")
+		sys.exit(1 if regressions else 0)
@@ -0,0 +1,62 @@
+"""
+Checks the quadrant sweep visibility against utils.filter_non_target_points on the Hash Code datasets, comparing
+their times on routers placed at random.
+
+usage: python -m benchmarks.visibility [--datasets NAME ...] [--routers N]
+"""
+import argparse
+import random
+import time
+import utils
+from classes.Data import Data
+from classes.Visibility import Visibility
+
+DATASETS = ["charleston_road", "rue_de_londres", "opera", "lets_go_higher"]
+
+
+def run(dataset: str, number_routers: int) -> dict:
+	data = Data(f"Dataset/{dataset}.in")
+	n, m = data.matrix.shape
+
+	start = time.perf_counter()
+	visibility = Visibility(data.matrix)
+	build_time = time.perf_counter() - start
+
+	random.seed(0)
+	reference_time, sweep_time = 0.0, 0.0
+	for _ in range(number_routers):
+		router_coords = (random.randrange(n), random.randrange(m))
+		points = utils.get_points_around_router(data.matrix, router_coords, data.router_range)
+
+		start = time.perf_counter()
+		expected = utils.filter_non_target_points(data.matrix, router_coords, points)
+		reference_time += time.perf_counter() - start
+
+		start = time.perf_counter()
+		filtered = visibility.filter_non_target_points(router_coords, points)
+		sweep_time += time.perf_counter() - start
+
+		assert filtered == expected, f"different coverage of the router {router_coords}"
+
+	return {
+		"dataset": dataset,
+		"routers": number_routers,
+		"build": build_time,
+		"reference": reference_time,
+		"sweep": sweep_time
+	}
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser()
+	parser.add_argument("--datasets", nargs="+", default=DATASETS, help="Datasets (inside Dataset/) to check")
+	parser.add_argument("--routers", type=int, default=1000, help="Number of routers placed at random")
+	args = parser.parse_args()
+
+	print(f"{'dataset':<16}{'routers':>8}{'tables':>9}{'reference':>11}{'sweep':>10}{'speedup':>9}")
+	for dataset in args.datasets:
+		r = run(dataset, args.routers)
+		print(
+			f"{r['dataset']:<16}{r['routers']:>8}{r['build']:>8.3f}s"
+			f"{r['reference']:>10.3f}s{r['sweep']:>9.3f}s{r['reference'] / r['sweep']:>8.1f}x"
+		)
@@ -0,0 +1,77 @@
+import os
+import shutil
+import tempfile
+import numpy as np
+from classes.CoverageIndex import CoverageIndex
+
+__all__ = ["BuildingCache"]
+
+
+class BuildingCache:
+	"""
+	On-disk cache of the artifacts precomputed from a building, so that they are computed only by the first run on
+	a dataset.
+
+	The artifacts of a building are stored in a directory named after the hash of the content of the dataset and
+	the router range, one raw .npy file per array: the files are loaded with np.load(mmap_mode="r"), so that
+	loading them costs only the pages actually read, and the processes loading the same files share those pages.
+	A directory is written under a temporary name and then renamed, so that a run interrupted while saving, or two
+	runs saving at the same time, never leave a partial entry.
+
+	Attributes:
+
+	cache_dir: the directory of the cache, created when the first entry is saved
+	"""
+	# bumped when the layout or the meaning of the arrays change, so that the old entries are not used
+	VERSION = 1
+
+	COVERAGE_INDEX_ARRAYS = ["wall_prefix_sum", "offsets", "footprints"]
+
+	def __init__(self, cache_dir: str):
+		self.cache_dir = cache_dir
+
+	@staticmethod
+	def get_key(content_hash: str, router_range: int) -> str:
+		"""
+		:param content_hash: str, the hexadecimal SHA-256 digest of the content of the dataset file
+		:param router_range: int, the range of a router
+		:return: str, the name of the entry of the building
+		"""
+		return f"{content_hash[:32]}_r{router_range}_v{BuildingCache.VERSION}"
+
+	def load_coverage_index(self, key: str, router_range: int) -> CoverageIndex:
+		"""
+		:return: the coverage index stored in the entry, with memory-mapped read-only arrays, None if it is not cached
+		"""
+		entry = os.path.join(self.cache_dir, key)
+		try:
+			arrays = {
+				name: np.load(os.path.join(entry, f"{name}.npy"), mmap_mode="r")
+				for name in BuildingCache.COVERAGE_INDEX_ARRAYS
+			}
+		except (OSError, ValueError):
+			return None
+		return CoverageIndex.from_arrays(router_range=router_range, **arrays)
+
+	def save_coverage_index(self, key: str, coverage_index: CoverageIndex):
+		"""
+		Stores the arrays of the coverage index in the entry, if it does not exist yet
+		"""
+		entry = os.path.join(self.cache_dir, key)
+		if os.path.isdir(entry):
+			return
+
+		try:
+			os.makedirs(self.cache_dir, exist_ok=True)
+			temporary_entry = tempfile.mkdtemp(prefix=f".{key}_", dir=self.cache_dir)
+		except OSError:
+			# the cache is not writable, the index is computed again by the next run
+			return
+
+		try:
+			for name in BuildingCache.COVERAGE_INDEX_ARRAYS:
+				np.save(os.path.join(temporary_entry, f"{name}.npy"), getattr(coverage_index, name))
+			os.rename(temporary_entry, entry)
+		except OSError:
+			# another run saved the same entry meanwhile, or the disk is full
+			shutil.rmtree(temporary_entry, ignore_errors=True)
@@ -0,0 +1,71 @@
+import numpy as np
+
+__all__ = [
+	"VOID",
+	"WALL",
+	"TARGET",
+	"encode_building",
+	"decode_building",
+	"get_cell_grid",
+	"get_target_mask",
+	"get_wall_mask",
+	"get_void_mask"
+]
+
+
+# the types of the cells of the building are the ASCII codes of the characters of the input file, so the grid is
+# read from the file without translating it
+VOID = ord("-")
+WALL = ord("#")
+TARGET = ord(".")
+
+
+def encode_building(building_matrix: np.array) -> np.array:
+	"""
+	:param building_matrix: array of arrays of characters, the matrix describing the building
+	:return: array of arrays of uint8, the type of each cell, 4 times smaller than the array of characters
+	"""
+	return building_matrix.astype("S1").view(np.uint8)
+
+
+def decode_building(grid: np.array) -> np.array:
+	"""
+	:param grid: array of arrays of uint8, the type of each cell
+	:return: array of arrays of characters, the matrix describing the building, e.g. to print it
+	"""
+	return grid.view("S1").astype(str)
+
+
+def get_cell_grid(building_matrix: np.array) -> np.array:
+	"""
+	:param building_matrix: array of arrays, the matrix describing the building, either as a grid of uint8 or as
+		an array of characters
+	:return: array of arrays of uint8, the type of each cell
+	"""
+	if building_matrix.dtype.kind in "US":
+		return encode_building(building_matrix)
+	return building_matrix
+
+
+def get_target_mask(building_matrix: np.array) -> np.array:
+	"""
+	:param building_matrix: array of arrays, the matrix describing the building, see get_cell_grid
+	:return: array of arrays of bool, True where the cell is a target
+	"""
+	return get_cell_grid(building_matrix) == TARGET
+
+
+def get_wall_mask(building_matrix: np.array) -> np.array:
+	"""
+	:param building_matrix: array of arrays, the matrix describing the building, see get_cell_grid
+	:return: array of arrays of bool, True where the cell is a wall
+	"""
+	return get_cell_grid(building_matrix) == WALL
+
+
+def get_void_mask(building_matrix: np.array) -> np.array:
+	"""
+	:param building_matrix: array of arrays, the matrix describing the building, see get_cell_grid
+	:return: array of arrays of bool, True where the cell is void
+	"""
+	return get_cell_grid(building_matrix) == VOID
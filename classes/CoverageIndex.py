@@ -0,0 +1,144 @@
+import numpy as np
+from classes.CellType import get_cell_grid, TARGET, WALL
+
+__all__ = ["CoverageIndex", "get_wall_prefix_sum"]
+
+
+def get_wall_prefix_sum(building_matrix: np.array) -> np.array:
+	"""
+	Computes the 2D prefix sum of the wall cells of the building, padded with a leading row and column of zeros,
+	so that the number of walls inside any rectangle can be retrieved in O(1)
+
+	:param building_matrix: array of arrays, the matrix describing the building (voids, targets, walls)
+	:return: array of arrays of shape (n + 1, m + 1), where the cell (i, j) contains the number of walls in the
+		rectangle [0, i) x [0, j)
+	"""
+	grid = get_cell_grid(building_matrix)
+	n, m = grid.shape
+	prefix_sum = np.zeros(shape=(n + 1, m + 1), dtype=np.int32)
+	prefix_sum[1:, 1:] = (grid == WALL).cumsum(axis=0, dtype=np.int32).cumsum(axis=1, dtype=np.int32)
+	return prefix_sum
+
+
+class CoverageIndex:
+	"""
+	Precomputed wall-aware footprint of a router for every cell of the building.
+
+	The footprint of a cell is the set of target cells that a router placed in that cell covers; it is stored as
+	a bitmask over the (2R+1)^2 offsets of the router square, packed in bytes, so that the whole index of
+	lets_go_higher.in fits in about 14 MB. The offsets are enumerated in the same row-major order used by
+	utils.get_points_around_router, hence footprints are returned in the same order as utils.filter_non_target_points.
+
+	Attributes:
+
+	shape: the (n, m) shape of the building
+	router_range: the range of a router
+	wall_prefix_sum: the padded 2D prefix sum of the wall cells, see get_wall_prefix_sum
+	offsets: array of shape (K, 2), the (row, column) offsets of the router square
+	footprints: array of shape (n, m, ceil(K / 8)) of packed bits, bit k of cell (i, j) is set if a router in
+		(i, j) covers the cell (i, j) + offsets[k]
+	"""
+	def __init__(self, building_matrix: np.array, router_range: int):
+		self.shape = building_matrix.shape
+		self.router_range = router_range
+		self.wall_prefix_sum = get_wall_prefix_sum(building_matrix)
+
+		radius = np.arange(start=-router_range, stop=router_range + 1, step=1)
+		self.offsets = np.transpose([np.repeat(radius, len(radius)), np.tile(radius, len(radius))])
+
+		self.footprints = self._build_footprints(get_cell_grid(building_matrix) == TARGET)
+
+	@classmethod
+	def from_arrays(cls, router_range: int, wall_prefix_sum: np.array, offsets: np.array, footprints: np.array):
+		"""
+		Rebuilds an index from its arrays, e.g. when they are loaded from shared memory, without computing them
+
+		:return: the coverage index
+		"""
+		coverage_index = cls.__new__(cls)
+		coverage_index.shape = footprints.shape[:2]
+		coverage_index.router_range = router_range
+		coverage_index.wall_prefix_sum = wall_prefix_sum
+		coverage_index.offsets = offsets
+		coverage_index.footprints = footprints
+		return coverage_index
+
+	def _build_footprints(self, target_mask: np.array) -> np.array:
+		"""
+		Fills the packed footprints one offset at a time, checking the enclosing rectangle of every
+		(router, covered cell) pair with the prefix sum of walls; each offset costs a constant number of
+		array operations over the whole building
+
+		:param target_mask: array of arrays of bool, True where the cell is a target
+		:return: the packed footprints
+		"""
+		n, m = self.shape
+		p = self.wall_prefix_sum
+		footprints = np.zeros(shape=(n, m, (len(self.offsets) + 7) // 8), dtype=np.uint8)
+
+		for k, (dx, dy) in enumerate(self.offsets):
+			# routers (i, j) such that the covered cell (i + dx, j + dy) lies inside the building
+			i_start, i_stop = max(0, -dx), min(n, n - dx)
+			j_start, j_stop = max(0, -dy), min(m, m - dy)
+			if i_start >= i_stop or j_start >= j_stop:
+				continue
+
+			# bounds of the smallest enclosing rectangle of router and covered cell
+			lower_row, upper_row = i_start + min(0, dx), i_stop + max(0, dx)
+			lower_col, upper_col = j_start + min(0, dy), j_stop + max(0, dy)
+			height, width = i_stop - i_start, j_stop - j_start
+
+			number_walls = (
+				p[upper_row - height + 1:upper_row + 1, upper_col - width + 1:upper_col + 1]
+				- p[lower_row:lower_row + height, upper_col - width + 1:upper_col + 1]
+				- p[upper_row - height + 1:upper_row + 1, lower_col:lower_col + width]
+				+ p[lower_row:lower_row + height, lower_col:lower_col + width]
+			)
+
+			covered = (number_walls == 0) & target_mask[i_start + dx:i_stop + dx, j_start + dy:j_stop + dy]
+			footprints[i_start:i_stop, j_start:j_stop, k // 8] |= covered.astype(np.uint8) << (7 - k % 8)
+
+		return footprints
+
+	def has_wall(self, row_lower: int, col_lower: int, row_upper: int, col_upper: int) -> bool:
+		"""
+		:return: True if there is at least a wall in the rectangle [row_lower, row_upper] x [col_lower, col_upper]
+			(bounds included)
+		"""
+		p = self.wall_prefix_sum
+		return (
+			p[row_upper + 1, col_upper + 1] - p[row_lower, col_upper + 1]
+			- p[row_upper + 1, col_lower] + p[row_lower, col_lower]
+		) > 0
+
+	def footprint_mask(self, router_coords: tuple) -> np.array:
+		"""
+		:param router_coords: tuple, the (x,y) coordinates of a router in the building
+		:return: array of bool of length K, True for the offsets covered by the router
+		"""
+		r, c = router_coords
+		return np.unpackbits(self.footprints[r, c], count=len(self.offsets)).astype(bool)
+
+	def footprint_array(self, router_coords: tuple) -> np.array:
+		"""
+		:param router_coords: tuple, the (x,y) coordinates of a router in the building
+		:return: array of shape (k, 2), the coordinates of the target cells covered by the router
+		"""
+		return self.offsets[self.footprint_mask(router_coords)] + np.array(router_coords)
+
+	def footprint(self, router_coords: tuple) -> list:
+		"""
+		Drop-in replacement of utils.filter_non_target_points applied to utils.get_points_around_router
+
+		:param router_coords: tuple, the (x,y) coordinates of a router in the building
+		:return: list of tuples, the target cells covered by the router
+		"""
+		return [(x, y) for (x, y) in self.footprint_array(router_coords).tolist()]
+
+	def footprint_size(self, router_coords: tuple) -> int:
+		"""
+		:param router_coords: tuple, the (x,y) coordinates of a router in the building
+		:return: the number of target cells covered by the router
+		"""
+		r, c = router_coords
+		return int(np.unpackbits(self.footprints[r, c], count=len(self.offsets)).sum())
@@ -1,5 +1,9 @@
+import hashlib
 import numpy as np
 import random
+from classes.CoverageIndex import CoverageIndex
+from classes.BuildingCache import BuildingCache
+from classes.CellType import VOID, WALL, TARGET, decode_building
 
 class Data:
     """" A class used to represent the data of the problem
@@ -11,36 +15,98 @@ class Data:
     router_cost
     budget
     initial_backbone: touple containing the initial access point for the backbone
-    matrix: a 2D numpy.array of char values 
-    target_area: the number of "." in the matrix
+    matrix: a 2D numpy.array of uint8 values, the type of each cell (VOID, WALL or TARGET of classes.CellType)
+    target_mask, wall_mask, void_mask: 2D numpy.arrays of bool, True where the cell is of the given type
+    string_matrix: the matrix as a 2D numpy.array of char values, for output
+    target_area: the number of targets in the matrix
+    coverage_index: the CoverageIndex of the building, built on first access (or loaded from the cache, if any)
 
 
     """
-    def __init__(self, file_path : str):
-        
-        with open(file_path, "r") as f:
-            lines = f.readlines()
-            first_line = lines[0].split(" ")
+    def __init__(self, file_path : str, cache_dir : str = None):
+        """
+        file_path: the path of the dataset
+        cache_dir: the directory of the BuildingCache storing the precomputed artifacts of the building, optional
+        """
+        # the hash of the content is needed only to look up the cache
+        content_hash = hashlib.sha256() if cache_dir is not None else None
+
+        with open(file_path, "rb") as f:
+            lines = [self._read_line(f, content_hash) for _ in range(3)]
+            first_line = lines[0].split(b" ")
             self.height = int(first_line[0])
             self.width = int(first_line[1])
             self.router_range = int(first_line[2])
-            self.backbone_cost = int((lines[1].split(" "))[0])
-            self.router_cost = int((lines[1].split(" "))[1])
-            self.budget = int((lines[1].split(" "))[2])
-            self.initial_backbone = (int((lines[2].split(" "))[0]), int((lines[2].split(" "))[1]))
-
-            lines = lines[3:]
-
-            python_matrix = []
-            for line in lines:
-                python_matrix.append([str(c) for c in line][:len(line)-1])
-            
-            self.matrix = np.array(python_matrix, dtype=str)
-            self.building_matrix = self.matrix
-            
-            self.target_area = np.count_nonzero(self.matrix == ".")
+            self.backbone_cost = int((lines[1].split(b" "))[0])
+            self.router_cost = int((lines[1].split(b" "))[1])
+            self.budget = int((lines[1].split(b" "))[2])
+            self.initial_backbone = (int((lines[2].split(b" "))[0]), int((lines[2].split(b" "))[1]))
+
+            # the rows are streamed into the preallocated grid, so that the peak memory is about one byte per cell
+            grid = np.empty(shape=(self.height, self.width), dtype=np.uint8)
+            for i in range(self.height):
+                row = self._read_line(f, content_hash)
+                if row is None:
+                    raise ValueError(f"{file_path}: the building has {i} rows, {self.height} expected")
+                if len(row) != self.width:
+                    raise ValueError(f"{file_path}: row {i} of the building has {len(row)} cells, {self.width} expected")
+                grid[i] = np.frombuffer(row, dtype=np.uint8)
+
+            self.set_grid(grid)
             self.coverage_mask = np.full((self.height, self.width), False, dtype=bool)
-            
+
+        self._coverage_index = None
+        self._cache = BuildingCache(cache_dir) if cache_dir is not None else None
+        self._cache_key = BuildingCache.get_key(content_hash.hexdigest(), self.router_range) if cache_dir is not None else None
+
+    @staticmethod
+    def _read_line(f, content_hash=None) -> bytes:
+        """
+        f: the dataset file, opened in binary mode
+        content_hash: the hashlib object to update with the bytes read, optional
+
+        returns: the next line of the file, without its line terminator (either \\n or \\r\\n), None at the end of the file
+        """
+        line = f.readline()
+        if content_hash is not None:
+            content_hash.update(line)
+        return line.rstrip(b"\r\n") if line else None
+
+    def set_grid(self, grid : np.array):
+        """
+        Sets the grid of the building and the masks of its cells
+
+        grid: a 2D numpy.array of uint8, the type of each cell (see classes.CellType)
+        """
+        self.matrix = grid
+        self.building_matrix = self.matrix
+
+        self.target_mask = self.matrix == TARGET
+        self.wall_mask = self.matrix == WALL
+        self.void_mask = self.matrix == VOID
+        self.target_area = np.count_nonzero(self.target_mask)
+
+    @property
+    def string_matrix(self) -> np.array:
+        """
+        The building as a 2D numpy.array of char values, to be used only for output
+        """
+        return decode_building(self.matrix)
+
+    @property
+    def coverage_index(self) -> CoverageIndex:
+        """
+        The wall-aware footprint of every cell, computed only once per building
+        """
+        if self._coverage_index is None and self._cache is not None:
+            self._coverage_index = self._cache.load_coverage_index(self._cache_key, self.router_range)
+
+        if self._coverage_index is None:
+            self._coverage_index = CoverageIndex(self.matrix, self.router_range)
+            if self._cache is not None:
+                self._cache.save_coverage_index(self._cache_key, self._coverage_index)
+        return self._coverage_index
+
     def random_init(self, num_routers=None):
         """
         Random initialization of routers position.
@@ -51,11 +117,7 @@ class Data:
         if num_routers is None:
             num_routers = (self.target_area // self.router_range**2) + 1
         
-        self.target_coords = []
-        for i, row in enumerate(self.matrix):
-            for j, item in enumerate(row):
-                if item == '.':
-                    self.target_coords.append((i,j))
+        self.target_coords = [(i, j) for (i, j) in np.argwhere(self.target_mask).tolist()]
                     
         router_init_list = []
         unique_randoms = random.sample(range(0, len(self.target_coords)), num_routers)
@@ -0,0 +1,99 @@
+import numpy as np
+from collections import OrderedDict
+from classes.Placement import Placement, get_placement_hash
+
+__all__ = ["FitnessCache"]
+
+
+class FitnessCache:
+	"""
+	Bounded cache of the values of a fitness function, wrapping it transparently: calling the cache with a placement
+	returns the value computed for the same routers the last time, if it is still cached, and calls the fitness
+	function otherwise.
+
+	The placements are identified by their Zobrist hash and their number of routers (see get_placement_hash), which
+	a Placement keeps up to date while routers are added and removed, so looking a placement up costs O(1); a dense
+	placement is hashed in a single pass. When the cache is full, the least recently used value is evicted.
+
+	Attributes:
+
+	fitness_function: the function cached, taken a routers placement returns its value
+	max_size: int, the maximum number of values kept
+	hits: int, the number of values found in the cache
+	misses: int, the number of values computed by the fitness function
+	"""
+	def __init__(self, fitness_function, max_size: int = 65536):
+		"""
+		:param fitness_function: function that, taken a routers placement as its parameter, returns its value
+		:param max_size: int, the maximum number of values kept, at least 1
+		"""
+		self.fitness_function = fitness_function
+		self.max_size = max(1, int(max_size))
+		self.hits = 0
+		self.misses = 0
+		self._values = OrderedDict()
+
+	def __len__(self) -> int:
+		return len(self._values)
+
+	def __call__(self, routers_placement):
+		key = self.get_key(routers_placement)
+		value = self.get(key)
+		if value is None:
+			value = self.fitness_function(routers_placement)
+			self.put(key, value)
+		return value
+
+	@staticmethod
+	def get_key(routers_placement) -> tuple:
+		"""
+		:param routers_placement: Placement or array of arrays, the placement of the routers
+		:return: tuple, the key of the placement in the cache
+		"""
+		number_routers = len(routers_placement) if isinstance(routers_placement, Placement) else int(np.count_nonzero(routers_placement))
+		return get_placement_hash(routers_placement), number_routers
+
+	def get(self, key: tuple):
+		"""
+		:param key: tuple, the key of a placement, see get_key
+		:return: the cached value of the placement, None if it is not cached
+		"""
+		value = self._values.get(key)
+		if value is None:
+			self.misses += 1
+			return None
+		self.hits += 1
+		self._values.move_to_end(key)
+		return value
+
+	def put(self, key: tuple, value):
+		"""
+		Caches the value of a placement, evicting the least recently used value if the cache is full
+
+		:param key: tuple, the key of the placement, see get_key
+		:param value: the value of the placement
+		"""
+		self._values[key] = value
+		self._values.move_to_end(key)
+		if len(self._values) > self.max_size:
+			self._values.popitem(last=False)
+
+	def clear(self):
+		self._values.clear()
+
+	@property
+	def hit_rate(self) -> float:
+		"""
+		:return: float, the fraction of the lookups found in the cache, 0 if there were none
+		"""
+		lookups = self.hits + self.misses
+		return self.hits / lookups if lookups > 0 else 0.0
+
+	def stats(self) -> str:
+		"""
+		:return: str, a summary of the lookups and of the size of the cache
+		"""
+		return (
+			f"fitness cache: {self.hits} hits, {self.misses} misses ({100 * self.hit_rate:.1f}% hit rate), "
+			f"{len(self)}/{self.max_size} values"
+		)
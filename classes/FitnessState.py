@@ -0,0 +1,246 @@
+import numpy as np
+import utils
+from classes import Data
+from classes.Placement import Placement
+from backbone.incremental import IncrementalBackbone
+
+__all__ = ["FitnessState"]
+
+
+class FitnessState:
+	"""
+	Incremental evaluation of the fitness of a routers placement.
+
+	The state keeps the number of routers covering each cell, the number of covered target cells, the routers
+	and the backbone length, so that the fitness variation of adding, removing or moving a single router is
+	computed looking only at the footprints involved, in O(R^2), instead of evaluating the whole placement again.
+
+	The backbone is kept as an IncrementalBackbone, so its variation is computed attaching the router to the
+	nearest cell of the current tree or pruning the branch left dangling by its removal.
+	"""
+
+	def __init__(self, data: Data, routers_placement: np.array = None):
+		"""
+		:param data: Data, the problem instance
+		:param routers_placement: array of arrays, the initial placement of the routers, optional
+		"""
+		self.coverage_index = data.coverage_index
+		self.backbone_starting_point = data.initial_backbone
+		self.router_cost = data.router_cost
+		self.backbone_cost = data.backbone_cost
+		self.budget = data.budget
+
+		self.coverage_counts = np.zeros(shape=data.matrix.shape, dtype=np.int32)
+		self.number_covered_cells = 0
+
+		self.placement = Placement(data.matrix.shape)
+		self.backbone = IncrementalBackbone(data.initial_backbone)
+
+		if routers_placement is not None:
+			# the coverage of all the routers is counted at once, only the backbone is built router by router
+			self.coverage_counts = utils.get_coverage_counts(
+				routers_placement, data.matrix, data.router_range, self.coverage_index
+			)
+			self.number_covered_cells = int(np.count_nonzero(self.coverage_counts))
+			for router in np.transpose(np.nonzero(routers_placement)).tolist():
+				self.backbone.add(tuple(router))
+				self.placement.add(tuple(router))
+
+	@classmethod
+	def from_routers(cls, data: Data, routers_coords: np.array):
+		"""
+		:param data: Data, the problem instance
+		:param routers_coords: array of shape (n, 2), the coordinates of the routers
+		:return: the state of the routers, built without a dense placement
+		"""
+		fitness_state = cls(data)
+		for router in np.reshape(routers_coords, (-1, 2)):
+			fitness_state.add(router)
+		return fitness_state
+
+	@property
+	def number_routers(self) -> int:
+		return len(self.placement)
+
+	@property
+	def routers(self) -> list:
+		"""
+		:return: list of tuples, the coordinates of the routers
+		"""
+		return list(self.placement)
+
+	@property
+	def backbone_length(self) -> int:
+		return self.backbone.length
+
+	@property
+	def total_cost(self) -> int:
+		return self.number_routers * self.router_cost + self.backbone_length * self.backbone_cost
+
+	@property
+	def score(self) -> int:
+		return 1000 * self.number_covered_cells + (self.budget - self.total_cost)
+
+	@property
+	def fitness(self) -> tuple:
+		"""
+		:return: tuple, the same (score, out of budget) pair returned by utils.compute_fitness
+		"""
+		return self.score, self.total_cost > self.budget
+
+	def __contains__(self, cell: tuple) -> bool:
+		return cell in self.placement
+
+	def random_router(self) -> tuple:
+		"""
+		:return: tuple, the coordinates of a router picked uniformly at random, None if there are no routers
+		"""
+		return self.placement.random_router()
+
+	def _coverage_gain(self, footprint: np.array) -> int:
+		return int(np.count_nonzero(self.coverage_counts[footprint[:, 0], footprint[:, 1]] == 0))
+
+	def _coverage_loss(self, footprint: np.array) -> int:
+		return int(np.count_nonzero(self.coverage_counts[footprint[:, 0], footprint[:, 1]] == 1))
+
+	def _score_delta(self, covered_delta: int, routers_delta: int, backbone_delta: int) -> int:
+		return 1000 * covered_delta - routers_delta * self.router_cost - backbone_delta * self.backbone_cost
+
+	def coverage_gain(self, cell: tuple) -> int:
+		"""
+		:param cell: tuple, the (x,y) coordinates of a router
+		:return: the number of target cells covered by the router and by no other router
+		"""
+		return self._coverage_gain(self.coverage_index.footprint_array(cell))
+
+	def coverage_gains(self, cells: np.array) -> np.array:
+		"""
+		Vectorized coverage_gain of many routers, each one evaluated alone
+
+		:param cells: array of shape (k, 2), the (x,y) coordinates of the routers
+		:return: array of ints of length k, the number of target cells covered by each router and by no other one
+		"""
+		n, m = self.coverage_counts.shape
+		offsets = self.coverage_index.offsets
+		footprints = np.unpackbits(
+			self.coverage_index.footprints[cells[:, 0], cells[:, 1]],
+			axis=1,
+			count=len(offsets)
+		).astype(bool)
+
+		# the cells outside the building are never in the footprints, their indices are only clipped
+		rows = np.clip(cells[:, 0, np.newaxis] + offsets[np.newaxis, :, 0], 0, n - 1)
+		columns = np.clip(cells[:, 1, np.newaxis] + offsets[np.newaxis, :, 1], 0, m - 1)
+		return np.count_nonzero(footprints & (self.coverage_counts[rows, columns] == 0), axis=1)
+
+	def delta_add(self, cell: tuple) -> int:
+		"""
+		:param cell: tuple, the (x,y) coordinates of the new router
+		:return: the variation of the score if a router is added in cell
+		"""
+		cell = (int(cell[0]), int(cell[1]))
+		if cell in self.placement:
+			return 0
+
+		covered_delta = self.coverage_gain(cell)
+		return self._score_delta(covered_delta, 1, self.backbone.delta_add(cell))
+
+	def delta_remove(self, cell: tuple) -> int:
+		"""
+		:param cell: tuple, the (x,y) coordinates of the router to remove
+		:return: the variation of the score if the router in cell is removed
+		"""
+		cell = (int(cell[0]), int(cell[1]))
+		if cell not in self.placement:
+			return 0
+
+		covered_delta = -self._coverage_loss(self.coverage_index.footprint_array(cell))
+		return self._score_delta(covered_delta, -1, self.backbone.delta_remove(cell))
+
+	def delta_move(self, src: tuple, dst: tuple) -> int:
+		"""
+		:param src: tuple, the (x,y) coordinates of the router to move
+		:param dst: tuple, the (x,y) coordinates where the router is moved
+		:return: the variation of the score if the router in src is moved in dst
+		"""
+		src = (int(src[0]), int(src[1]))
+		dst = (int(dst[0]), int(dst[1]))
+		if src not in self.placement or src == dst:
+			return 0
+		if dst in self.placement:
+			return self.delta_remove(src)
+
+		src_footprint = self.coverage_index.footprint_array(src)
+		dst_footprint = self.coverage_index.footprint_array(dst)
+
+		# the cells of dst are evaluated as if the router in src was already removed
+		lost = self._coverage_loss(src_footprint)
+		self.coverage_counts[src_footprint[:, 0], src_footprint[:, 1]] -= 1
+		gained = self._coverage_gain(dst_footprint)
+		self.coverage_counts[src_footprint[:, 0], src_footprint[:, 1]] += 1
+
+		return self._score_delta(gained - lost, 0, self.backbone.delta_move(src, dst))
+
+	def add(self, cell: tuple):
+		"""
+		Places a router in cell, updating coverage and backbone
+
+		:param cell: tuple, the (x,y) coordinates of the new router
+		"""
+		cell = (int(cell[0]), int(cell[1]))
+		if cell in self.placement:
+			return
+
+		footprint = self.coverage_index.footprint_array(cell)
+		self.number_covered_cells += self._coverage_gain(footprint)
+		self.coverage_counts[footprint[:, 0], footprint[:, 1]] += 1
+
+		self.backbone.add(cell)
+		self.placement.add(cell)
+
+	def remove(self, cell: tuple):
+		"""
+		Removes the router in cell, updating coverage and backbone
+
+		:param cell: tuple, the (x,y) coordinates of the router to remove
+		"""
+		cell = (int(cell[0]), int(cell[1]))
+		if cell not in self.placement:
+			return
+
+		footprint = self.coverage_index.footprint_array(cell)
+		self.coverage_counts[footprint[:, 0], footprint[:, 1]] -= 1
+		self.number_covered_cells -= self._coverage_gain(footprint)
+
+		self.backbone.remove(cell)
+		self.placement.remove(cell)
+
+	def apply(self, move_type: str, *cells):
+		"""
+		Applies a move to the state
+
+		:param move_type: string, one of "add" (cells = (cell,)), "remove" (cells = (cell,)) or "move"
+			(cells = (src, dst))
+		"""
+		if move_type == "add":
+			self.add(*cells)
+		elif move_type == "remove":
+			self.remove(*cells)
+		elif move_type == "move":
+			src, dst = cells
+			self.remove(src)
+			self.add(dst)
+		else:
+			raise ValueError(f"Move {move_type} not supported")
+
+	def get_routers_placement(self) -> np.array:
+		"""
+		:return: array of arrays, the placement of the routers as a mask of the building
+		"""
+		return np.asarray(self.placement, dtype=float)
+
+	def get_placement(self) -> Placement:
+		"""
+		:return: Placement, a copy of the sparse placement of the routers
+		"""
+		return self.placement.copy()
@@ -0,0 +1,186 @@
+import numpy as np
+import random
+
+__all__ = ["Placement", "get_cell_hash", "get_placement_hash"]
+
+_MASK = 2**64 - 1
+
+
+def get_cell_hash(index: int) -> int:
+	"""
+	The random 64 bits key of a cell for the Zobrist hash of the placements: instead of drawing the keys of all
+	the cells in a table, the key of a cell is the splitmix64 mix of its index
+
+	:param index: int, the index of the cell in the flattened building, row * m + column
+	:return: int, the key of the cell
+	"""
+	z = (index + 0x9E3779B97F4A7C15) & _MASK
+	z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+	z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK
+	return z ^ (z >> 31)
+
+
+def get_placement_hash(routers_placement) -> int:
+	"""
+	The Zobrist hash of a placement, the xor of the keys of the cells with a router (see get_cell_hash): two
+	placements with the same routers have the same hash, and adding or removing a router changes it with a xor
+
+	:param routers_placement: Placement, whose hash is kept up to date, or array of arrays, the dense placement
+	:return: int, the 64 bits hash of the placement
+	"""
+	if isinstance(routers_placement, Placement):
+		return routers_placement.zobrist_hash
+
+	rows, columns = np.nonzero(routers_placement)
+	return _get_cells_hash(rows, columns, routers_placement.shape[1])
+
+
+def _get_cells_hash(rows: np.array, columns: np.array, m: int) -> int:
+	"""
+	:return: int, the xor of the keys of the cells (see get_cell_hash) of a building with m columns
+	"""
+	z = np.asarray(rows).astype(np.uint64) * np.uint64(m) + np.asarray(columns).astype(np.uint64)
+	# the same steps of get_cell_hash, on all the cells at once (the uint64 products wrap around as the masks)
+	z = z + np.uint64(0x9E3779B97F4A7C15)
+	z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+	z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+	z = z ^ (z >> np.uint64(31))
+	return int(np.bitwise_xor.reduce(z)) if len(z) > 0 else 0
+
+
+class Placement:
+	"""
+	Sparse placement of routers in the building.
+
+	The routers are kept in a compact array of coordinates, together with a dict mapping each router to its row,
+	so adding, removing and looking up a router costs O(1) and copying a placement costs O(number of routers),
+	instead of O(n * m) for the dense matrices used by the solvers.
+
+	A placement can be used where a dense placement is expected: np.nonzero(placement) returns the coordinates of
+	the routers without building the matrix, placement[x, y] is 1 if there is a router in (x, y) and 0 otherwise
+	(assigning it adds or removes the router), and np.asarray(placement) builds the dense mask, only when it is
+	really needed (e.g. to plot it).
+
+	The Zobrist hash of the routers (see get_placement_hash) is kept up to date by add and remove, in zobrist_hash.
+	"""
+
+	def __init__(self, shape: tuple, routers_coords: np.array = None):
+		"""
+		:param shape: tuple, the (n, m) shape of the building
+		:param routers_coords: array of shape (k, 2), the coordinates of the routers, optional
+		"""
+		self.shape = (int(shape[0]), int(shape[1]))
+		self._router_array = np.empty(shape=(16, 2), dtype=np.int64)
+		self._router_index = {}
+		self.zobrist_hash = 0
+
+		if routers_coords is not None and len(routers_coords) > 0:
+			# the routers are stored at once, in the order of their first occurrence
+			routers = list(dict.fromkeys(map(tuple, np.reshape(routers_coords, (-1, 2)).tolist())))
+			self._router_array = np.array(routers + [(0, 0)] * max(0, 16 - len(routers)), dtype=np.int64)
+			self._router_index = dict(zip(routers, range(len(routers))))
+			self.zobrist_hash = _get_cells_hash(
+				self._router_array[:len(routers), 0], self._router_array[:len(routers), 1], self.shape[1]
+			)
+
+	@classmethod
+	def from_mask(cls, routers_placement: np.array):
+		"""
+		:param routers_placement: array of arrays, the dense placement, not zero where there is a router
+		:return: the sparse placement of the same routers
+		"""
+		return cls(routers_placement.shape, np.transpose(np.nonzero(routers_placement)))
+
+	def __len__(self) -> int:
+		return len(self._router_index)
+
+	def __contains__(self, cell: tuple) -> bool:
+		return (int(cell[0]), int(cell[1])) in self._router_index
+
+	def __iter__(self):
+		return iter(self._router_index)
+
+	def __eq__(self, other) -> bool:
+		if not isinstance(other, Placement):
+			return NotImplemented
+		return self.shape == other.shape and self._router_index.keys() == other._router_index.keys()
+
+	def __getitem__(self, cell: tuple) -> int:
+		return 1 if cell in self else 0
+
+	def __setitem__(self, cell: tuple, value):
+		if value:
+			self.add(cell)
+		else:
+			self.remove(cell)
+
+	def __array__(self, dtype=None, copy=None) -> np.array:
+		routers_placement = np.zeros(shape=self.shape, dtype=dtype)
+		routers = self.coords
+		routers_placement[routers[:, 0], routers[:, 1]] = 1
+		return routers_placement
+
+	@property
+	def coords(self) -> np.array:
+		"""
+		:return: array of shape (k, 2), the coordinates of the routers
+		"""
+		return self._router_array[:len(self)].copy()
+
+	def nonzero(self) -> tuple:
+		"""
+		:return: tuple of arrays, the row and column coordinates of the routers, as numpy.nonzero of the dense mask
+		"""
+		routers = self._router_array[:len(self)]
+		return routers[:, 0].copy(), routers[:, 1].copy()
+
+	def add(self, cell: tuple):
+		"""
+		:param cell: tuple, the (x,y) coordinates of the new router
+		"""
+		cell = (int(cell[0]), int(cell[1]))
+		if cell in self._router_index:
+			return
+
+		if len(self) == len(self._router_array):
+			self._router_array = np.concatenate((self._router_array, np.empty_like(self._router_array)))
+		self._router_array[len(self)] = cell
+		self._router_index[cell] = len(self)
+		self.zobrist_hash ^= get_cell_hash(cell[0] * self.shape[1] + cell[1])
+
+	def remove(self, cell: tuple):
+		"""
+		:param cell: tuple, the (x,y) coordinates of the router to remove
+		"""
+		cell = (int(cell[0]), int(cell[1]))
+		if cell not in self._router_index:
+			return
+
+		# move the last router in the row of the removed one
+		row = self._router_index.pop(cell)
+		self.zobrist_hash ^= get_cell_hash(cell[0] * self.shape[1] + cell[1])
+		last = len(self)
+		if row != last:
+			moved = (int(self._router_array[last][0]), int(self._router_array[last][1]))
+			self._router_array[row] = self._router_array[last]
+			self._router_index[moved] = row
+
+	def copy(self):
+		"""
+		:return: a new placement with the same routers
+		"""
+		placement = Placement.__new__(Placement)
+		placement.shape = self.shape
+		placement._router_array = self._router_array[:max(len(self), 16)].copy()
+		placement._router_index = self._router_index.copy()
+		placement.zobrist_hash = self.zobrist_hash
+		return placement
+
+	def random_router(self) -> tuple:
+		"""
+		:return: tuple, the coordinates of a router picked uniformly at random, None if there are no routers
+		"""
+		if len(self) == 0:
+			return None
+		x, y = self._router_array[random.randrange(len(self))]
+		return int(x), int(y)
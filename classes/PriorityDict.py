@@ -1,48 +1,121 @@
-from classes.Cell import Cell
-import sys
 import random
 
+__all__ = ["PriorityDict"]
 
 
 class PriorityDict:
+    """
+    Bucket queue of the target cells by coverage level.
+
+    The coverage levels are small non negative integers, so the cells are kept in one bucket (a list) per level,
+    together with a dict mapping each cell to its level and its index in the bucket: editing the level of a cell
+    moves it to another bucket in O(1), swapping it with the last cell of its bucket. The range of the levels is
+    tracked lazily: an edit can only widen it, and the empty levels at its ends are dropped by the next query.
+
+    Among the cells with the same level, the ones returned by the queries are picked at random, using the random
+    module (so its seed makes them reproducible).
+    """
     def __init__(self) -> None:
-        self.inner_dict = {}
-        self.inner_list = []
-        self.approximate_higer_index = 0
-        self.approximate_lower_index = len(self.inner_list) -1
-        self.edits_since_ordered = sys.maxsize
-        pass
-
-    def add_element(self, position : tuple[int, int]):
-        new_cell = Cell(position, coverage_level=0)
-        self.inner_dict[position] = new_cell
-        self.inner_list.append(new_cell)
-    
+        self.buckets = {}
+        self.positions = {}
+        self.min_level = 0
+        self.max_level = 0
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __contains__(self, position: tuple[int, int]) -> bool:
+        return position in self.positions
+
+    def _insert(self, position: tuple[int, int], level: int):
+        bucket = self.buckets.setdefault(level, [])
+        self.positions[position] = (level, len(bucket))
+        bucket.append(position)
+
+    def _delete(self, position: tuple[int, int]) -> int:
+        level, index = self.positions.pop(position)
+        bucket = self.buckets[level]
+        last = bucket.pop()
+        if last != position:
+            # the last cell of the bucket takes the place of the deleted one
+            bucket[index] = last
+            self.positions[last] = (level, index)
+        return level
+
+    def add_element(self, position : tuple[int, int], coverage_level: int = 0):
+        """
+        :param position: tuple of two int, the coordinates of the cell
+        :param coverage_level: int, the initial coverage level of the cell
+        """
+        if len(self.positions) == 0:
+            self.min_level = self.max_level = coverage_level
+        self.min_level = min(self.min_level, coverage_level)
+        self.max_level = max(self.max_level, coverage_level)
+        self._insert(position, coverage_level)
+
     def edit_element(self, position : tuple[int, int], delta):
-        cell = self.inner_dict[position]
-        cell.coverage_level += delta
-    
-    def order(self):
-        self.inner_list.sort(key=lambda x : x.coverage_level, reverse=True)
-        self.approximate_higer_index = 0
-        self.approximate_lower_index = len(self.inner_list) - 1
-        self.edits_since_ordered = 0
-    
-    def get_higer(self):
-        if self.edits_since_ordered >= len(self.inner_list) / 2: # euristic to reorder the list
-            self.order()
-
-        cell = self.inner_list[self.approximate_higer_index]
-        self.approximate_higer_index += 1
-        return cell.position
-    
-    def get_lower(self):
-        if self.edits_since_ordered >= len(self.inner_list) / 2: # euristic to reorder the list
-            self.order()
-
-        cell = self.inner_list[self.approximate_lower_index]
-        self.approximate_lower_index -= 1
-        return cell.position
-    
-    def shuffle(self):
-        random.shuffle(self.inner_list)
\ No newline at end of file
+        """
+        :param position: tuple of two int, the coordinates of the cell
+        :param delta: int, the change of the coverage level of the cell
+        """
+        level = self._delete(position) + delta
+        self._insert(position, level)
+        self.min_level = min(self.min_level, level)
+        self.max_level = max(self.max_level, level)
+
+    def get_level(self, position: tuple[int, int]) -> int:
+        """
+        :return: the coverage level of the cell
+        """
+        return self.positions[position][0]
+
+    def _levels(self, reverse: bool):
+        """
+        :return: generator of the non empty buckets, from the lowest level (from the highest one if reverse)
+        """
+        # the empty levels at the extremes are skipped once for all
+        while self.min_level < self.max_level and not self.buckets.get(self.min_level):
+            self.min_level += 1
+        while self.max_level > self.min_level and not self.buckets.get(self.max_level):
+            self.max_level -= 1
+
+        levels = range(self.max_level, self.min_level - 1, -1) if reverse else range(self.min_level, self.max_level + 1)
+        for level in levels:
+            bucket = self.buckets.get(level)
+            if bucket:
+                yield bucket
+
+    def _iterate(self, reverse: bool):
+        for bucket in self._levels(reverse):
+            # the cells of a level are visited from a random one, so that ties are broken at random
+            start = random.randrange(len(bucket))
+            for i in range(len(bucket)):
+                yield bucket[(start + i) % len(bucket)]
+
+    def iter_lower(self):
+        """
+        The queue must not be edited while iterating
+
+        :return: generator of the cells, from the lowest coverage level
+        """
+        return self._iterate(reverse=False)
+
+    def iter_higher(self):
+        """
+        The queue must not be edited while iterating
+
+        :return: generator of the cells, from the highest coverage level
+        """
+        return self._iterate(reverse=True)
+
+    def peek_min(self) -> tuple[int, int]:
+        """
+        :return: a cell with the lowest coverage level, None if the queue is empty
+        """
+        return next(self.iter_lower(), None)
+
+    def peek_max(self) -> tuple[int, int]:
+        """
+        :return: a cell with the highest coverage level, None if the queue is empty
+        """
+        return next(self.iter_higher(), None)
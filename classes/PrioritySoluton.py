@@ -4,6 +4,9 @@ import numpy as np
 from classes import Data
 import random
 from classes.PriorityDict import PriorityDict
+from classes.CoverageIndex import CoverageIndex
+from classes.RouterIndex import RouterIndex
+from classes.CellType import get_target_mask
 
 class PrioritySolution:
 	"""
@@ -24,46 +27,30 @@ class PrioritySolution:
 		self.pri_dic = self.init_pri_dic(
 			data.building_matrix,
 			initial_state,
-			data.router_range
+			data.router_range,
+			data.coverage_index
 		)
+		# the routers of the current state, to find the one to remove
+		self.router_index = RouterIndex.from_placement(initial_state, data.router_range)
 
 	@staticmethod
 	def init_pri_dic(
 			building_matrix: np.array,
 			routers_placement: np.array,
-			router_range: int
+			router_range: int,
+			coverage_index: CoverageIndex = None
 	) -> PriorityDict:
 		"""
 		Initialize the dictionary with the order on the values such that for each target cell of the matrix there is an entry in the dictionary
 		"""
-		# we want to add each cell of the grid and then update the coverage level
-		pri_dict = PriorityDict()
-
-		# add all the target coords to the priority dict
-		target_coords = np.nonzero(building_matrix == ".")
-		for (i, j) in zip(target_coords[0], target_coords[1]):
-			pri_dict.add_element((i, j))
-
-		# iterate the router and update the nearby cells
-		router_coords = routers_placement.nonzero()
-		for (i, j) in zip(router_coords[0], router_coords[1]):  # for each router
-
-			# filter points covered by walls and void cells
-			points_covered_by_router = utils.filter_non_target_points(
-				building_matrix=building_matrix,
-				router_coords=(i, j),
-				points=utils.get_points_around_router(
-					matrix=building_matrix,
-					router_coords=(i, j),
-					router_radius=router_range
-				)
-			)
-
-			for (x, y) in points_covered_by_router:  # for each point (cell) covered by the router
-				pri_dict.edit_element((x, y), 1)
+		# count how many routers cover each cell, for all the routers at once
+		coverage_levels = utils.get_coverage_counts(routers_placement, building_matrix, router_range, coverage_index)
 
-		pri_dict.shuffle()
-		pri_dict.order()
+		# add all the target coords to the priority dict, with their coverage level
+		pri_dict = PriorityDict()
+		target_coords = np.nonzero(get_target_mask(building_matrix))
+		for (i, j, level) in zip(target_coords[0].tolist(), target_coords[1].tolist(), coverage_levels[target_coords].tolist()):
+			pri_dict.add_element((i, j), level)
 
 		return pri_dict
 
@@ -73,23 +60,22 @@ class PrioritySolution:
 			building_matrix: np.array,
 			router: tuple[int, int],
 			router_range: int,
-			delta: int
+			delta: int,
+			coverage_index: CoverageIndex = None
 	):
 		"""
 		Given a router position and a delta value, update the coverage value of all the cells covered by the router with the delta, the walls are taken into account
 		:param router: tuple of two int, the position of the router
 		:param delta: int, the delta to apply to the near cells
+		:param coverage_index: CoverageIndex, the precomputed footprints of the building, optional
 		"""
 		x, y = router
 
-		points_covered_by_router = utils.filter_non_target_points(
+		points_covered_by_router = utils.get_router_coverage(
 			building_matrix=building_matrix,
 			router_coords=(x, y),
-			points=utils.get_points_around_router(
-				matrix=building_matrix,
-				router_coords=(x, y),
-				router_radius=router_range
-			)
+			router_range=router_range,
+			coverage_index=coverage_index
 		)
 		for (x, y) in points_covered_by_router:  # for each point (cell) covered by the router
 			pri_dic.edit_element((x, y), delta=delta)  # edit the point
@@ -100,28 +86,36 @@ class PrioritySolution:
 			building_matrix: np.array,
 			routers_placement: np.array,
 			router_range: int,
-			move_type: str
+			move_type: str,
+			coverage_index: CoverageIndex = None,
+			router_index: RouterIndex = None
 	) -> np.array:
 		"""
 		Given a move type, returns the new state in the solution space.
 		If the move is 'add' a new router will be add in the less covered cell,
 		if the move is 'remove' the nearest router to the most covered cell will be removed
 		:param move_type: string, the type of move to perform, if it is not supported, a random move will be performed
-		:returns: np.array, the new state
+		:param coverage_index: CoverageIndex, the precomputed footprints of the building, optional
+		:param router_index: RouterIndex, the index of the routers of routers_placement, optional; it is updated
+			with the move, so that it indexes the new state
+		:returns: the new state, of the same type (np.array or Placement) of routers_placement
 		"""
 
 		supported_moves = ["add", "remove"]
-		new_state = np.copy(routers_placement)
+		new_state = routers_placement.copy()
 
 		if move_type not in supported_moves:
 			move_type = random.choice(supported_moves)
 
 		if move_type == "add":  # add one router
-			while True:
-				x, y = pri_dic.get_lower()  # the cell with less coverage
-				if routers_placement[x][y] == 0:  # there is not another router in that cell
-					new_state[x][y] = 1
+			for (x, y) in pri_dic.iter_lower():  # from the cells with less coverage
+				if routers_placement[x, y] == 0:  # there is not another router in that cell
+					new_state[x, y] = 1
 					break
+			else:  # every target cell has a router, the state is left as it is
+				return new_state
+			if router_index is not None:
+				router_index.add((x, y))
 
 			# we have to update the near cells
 			PrioritySolution._update_neighbor(
@@ -129,14 +123,20 @@ class PrioritySolution:
 				building_matrix=building_matrix,
 				router=(x, y),
 				router_range=router_range,
-				delta=+1
+				delta=+1,
+				coverage_index=coverage_index
 			)
 
 		elif move_type == "remove":  # remove one router
-			target = pri_dic.get_higer()  # the cell with most coverage
-			to_remove = utils.get_nearest_router(cell=target, routers=routers_placement)
+			target = pri_dic.peek_max()  # the cell with most coverage
+			to_remove = utils.get_nearest_router(
+				cell=target,
+				routers=router_index if router_index is not None else routers_placement
+			)
 			x, y = to_remove
-			new_state[x][y] = 0
+			new_state[x, y] = 0
+			if router_index is not None:
+				router_index.remove((x, y))
 
 			# we have to update the near cells
 			PrioritySolution._update_neighbor(
@@ -144,7 +144,8 @@ class PrioritySolution:
 				building_matrix=building_matrix,
 				router=(x, y),
 				router_range=router_range,
-				delta=-1
+				delta=-1,
+				coverage_index=coverage_index
 			)
 		else:
 			pass
@@ -155,7 +156,8 @@ class PrioritySolution:
 	def run(
 			self,
 			num_iterations : int = 50,
-			evaluation_delay: int = 5
+			evaluation_delay: int = 5,
+			seed: int = None
 	) -> np.array:
 
 		""""
@@ -163,19 +165,18 @@ class PrioritySolution:
 
 		:param num_iterations: int, the number of iterations, note: if the solution is out of budget other iterations will be performed
 		:param evaluation_delay: int, how often perform the fitness evaluation, the shuffling and reordering of the inner dict and the coverage evaluation, that are all computational intensive
+		:param seed: int, the seed of the random generator, by default the run is not reproducible
 
 
-		returns: the final configuration as a np.array
+		returns: the final configuration, of the same type (np.array or Placement) of the initial state
 		"""
 
-		rm.seed(a=None, version=2)
+		rm.seed(a=seed, version=2)
 
 		if self.verbose:
 			print(f"evaluation step")
 		fitness, out_budget = self.fitness_function(self.state) # calculate fitness function and out of budget
-		coverage = utils.get_number_covered_cells(self.state, self.data.matrix, self.data.router_range) / self.data.target_area #calculate coverage
-		self.pri_dic.shuffle() #shuffle priority dict
-		self.pri_dic.order() #ordinate priority dict
+		coverage = utils.get_number_covered_cells(self.state, self.data.matrix, self.data.router_range, self.data.coverage_index) / self.data.target_area #calculate coverage
 		if self.verbose:
 			print(f"out_budget: {out_budget}, coverage: {coverage}")
 
@@ -197,7 +198,9 @@ class PrioritySolution:
 					self.data.building_matrix,
 					self.state,
 					self.data.router_range,
-					move_type="remove"
+					move_type="remove",
+					coverage_index=self.data.coverage_index,
+					router_index=self.router_index
 				)
 			else:
 				if self.verbose:
@@ -207,7 +210,9 @@ class PrioritySolution:
 					self.data.building_matrix,
 					self.state,
 					self.data.router_range,
-					move_type="add"
+					move_type="add",
+					coverage_index=self.data.coverage_index,
+					router_index=self.router_index
 				)
 
 			if(i % evaluation_delay == 0) or out_budget:
@@ -215,13 +220,11 @@ class PrioritySolution:
 				if self.verbose:
 					print(f"evaluation step")
 				fitness, out_budget = self.fitness_function(self.state) # calculate fitness function and out of budget
-				coverage = utils.get_number_covered_cells(self.state, self.data.matrix, self.data.router_range) / self.data.target_area #calculate coverage
-				self.pri_dic.shuffle() #shuffle priority dict
-				self.pri_dic.order() #ordinate priority dict
+				coverage = utils.get_number_covered_cells(self.state, self.data.matrix, self.data.router_range, self.data.coverage_index) / self.data.target_area #calculate coverage
 				if self.verbose:
 					print(f"out_budget: {out_budget}, coverage: {coverage}")
 
 			i+=1
 			num_iterations -= 1
 
-		return np.copy(self.state)
\ No newline at end of file
+		return self.state.copy()
\ No newline at end of file
@@ -0,0 +1,132 @@
+import numpy as np
+
+__all__ = ["RouterIndex"]
+
+
+class RouterIndex:
+	"""
+	Spatial index of the routers placed in the building, answering nearest-router queries in the Chebyshev metric.
+
+	The building is split in square buckets of side bucket_size (the router range, by default), each bucket keeping
+	the set of routers inside it, so adding and removing a router costs O(1). A query visits the rings of buckets
+	around the bucket of the cell, from the nearest outwards: every router in a bucket out of the first d rings is
+	more than d * bucket_size cells away, so the search stops as soon as the k nearest routers found are closer than
+	that, visiting only the buckets near the cell even when the routers are sparse.
+
+	The index is not updated by the placements, the solvers adding and removing routers have to keep it in sync.
+	"""
+
+	def __init__(self, shape: tuple, bucket_size: int, routers_coords: np.array = None):
+		"""
+		:param shape: tuple, the (n, m) shape of the building
+		:param bucket_size: int, the side of the buckets, e.g. the router range
+		:param routers_coords: array of shape (k, 2), the coordinates of the routers, optional
+		"""
+		self.shape = (int(shape[0]), int(shape[1]))
+		self.bucket_size = max(1, int(bucket_size))
+		self._buckets = {}
+		self._number_routers = 0
+		# number of rings of buckets around any bucket that cover the whole building
+		self._max_ring = (max(self.shape) - 1) // self.bucket_size + 1
+
+		if routers_coords is not None:
+			for router in np.reshape(routers_coords, (-1, 2)).tolist():
+				self.add(router)
+
+	@classmethod
+	def from_placement(cls, routers_placement, bucket_size: int):
+		"""
+		:param routers_placement: Placement or array of arrays, the placement of the routers
+		:param bucket_size: int, the side of the buckets
+		:return: the index of the routers of the placement
+		"""
+		return cls(routers_placement.shape, bucket_size, np.transpose(np.nonzero(routers_placement)))
+
+	def __len__(self) -> int:
+		return self._number_routers
+
+	def __contains__(self, cell: tuple) -> bool:
+		cell = (int(cell[0]), int(cell[1]))
+		return cell in self._buckets.get(self._bucket(cell), ())
+
+	def _bucket(self, cell: tuple) -> tuple:
+		return cell[0] // self.bucket_size, cell[1] // self.bucket_size
+
+	def add(self, cell: tuple):
+		"""
+		:param cell: tuple, the (x,y) coordinates of the new router
+		"""
+		cell = (int(cell[0]), int(cell[1]))
+		bucket = self._buckets.setdefault(self._bucket(cell), set())
+		if cell not in bucket:
+			bucket.add(cell)
+			self._number_routers += 1
+
+	def remove(self, cell: tuple):
+		"""
+		:param cell: tuple, the (x,y) coordinates of the router to remove
+		"""
+		cell = (int(cell[0]), int(cell[1]))
+		key = self._bucket(cell)
+		bucket = self._buckets.get(key)
+		if bucket is None or cell not in bucket:
+			return
+
+		bucket.remove(cell)
+		self._number_routers -= 1
+		if not bucket:
+			del self._buckets[key]
+
+	def _ring(self, bucket: tuple, ring: int):
+		"""
+		:return: generator of the buckets at Chebyshev distance ring from bucket, containing at least a router
+		"""
+		row, column = bucket
+		if ring == 0:
+			candidates = [bucket]
+		else:
+			candidates = [(row - ring, column + j) for j in range(-ring, ring + 1)]
+			candidates += [(row + ring, column + j) for j in range(-ring, ring + 1)]
+			candidates += [(row + i, column - ring) for i in range(-ring + 1, ring)]
+			candidates += [(row + i, column + ring) for i in range(-ring + 1, ring)]
+		for candidate in candidates:
+			routers = self._buckets.get(candidate)
+			if routers:
+				yield routers
+
+	def k_nearest(self, cell: tuple, k: int) -> list:
+		"""
+		Finds the k routers nearest to a cell ignoring the walls, ties are broken by the row and then the column
+
+		:param cell: tuple, the (x,y) coordinates of the cell
+		:param k: int, the number of routers to find
+		:return: list of tuples, the coordinates of at most k routers, from the nearest
+		"""
+		cell = (int(cell[0]), int(cell[1]))
+		k = min(k, len(self))
+		if k <= 0:
+			return []
+
+		bucket = self._bucket(cell)
+		found = []
+		for ring in range(self._max_ring + 1):
+			for routers in self._ring(bucket, ring):
+				found += [
+					(max(abs(x - cell[0]), abs(y - cell[1])), x, y) for (x, y) in routers
+				]
+			# the routers in the buckets not visited yet are farther than ring * bucket_size
+			if len(found) >= k:
+				found.sort()
+				if found[k - 1][0] <= ring * self.bucket_size:
+					break
+		found.sort()
+		return [(x, y) for (_, x, y) in found[:k]]
+
+	def nearest(self, cell: tuple) -> tuple:
+		"""
+		:param cell: tuple, the (x,y) coordinates of the cell
+		:return: tuple, the coordinates of the router nearest to the cell ignoring the walls, None if there are no
+			routers
+		"""
+		routers = self.k_nearest(cell, 1)
+		return routers[0] if routers else None
@@ -0,0 +1,109 @@
+import numpy as np
+from classes.CellType import get_cell_grid, WALL, VOID
+
+__all__ = ["Visibility", "get_wall_runs"]
+
+
+def get_wall_runs(building_matrix: np.array) -> tuple:
+	"""
+	Computes, for every cell, the number of consecutive cells without walls from it to the left and to the right,
+	along its row
+
+	:param building_matrix: array of arrays, the matrix describing the building (voids, targets, walls)
+	:return: tuple of two arrays of shape (n, m), the runs to the left and to the right: the cell (i, j) + (0, k)
+		is reached without crossing a wall for -left[i, j] < k < right[i, j], both are 0 on a wall
+	"""
+	walls = get_cell_grid(building_matrix) == WALL
+	m = walls.shape[1]
+	columns = np.arange(m, dtype=np.int32)
+
+	# the column of the nearest wall at the right of each cell (m if there is none), and at its left (-1)
+	next_wall = np.minimum.accumulate(np.where(walls, columns, m)[:, ::-1], axis=1)[:, ::-1]
+	previous_wall = np.maximum.accumulate(np.where(walls, columns, -1), axis=1)
+	return (columns - previous_wall).astype(np.int32), (next_wall - columns).astype(np.int32)
+
+
+class Visibility:
+	"""
+	Wall-aware visibility of the routers, computed from the nearest-wall run tables of the building.
+
+	A cell is covered by a router if the rectangle between them has no wall: in each quadrant around the router the
+	visible cells form a staircase, where a row is visible up to the nearest wall along it and no farther than the
+	rows between it and the router. Sweeping the rows outwards from the router with a running minimum of the runs
+	(see get_wall_runs) gives the width of every row of the four quadrants in O(R), and the whole footprint in
+	O(R^2), without scanning the rectangle of each cell.
+
+	Attributes:
+
+	shape: the (n, m) shape of the building
+	left_runs: the runs of cells without walls to the left of each cell, see get_wall_runs
+	right_runs: the runs of cells without walls to the right of each cell, see get_wall_runs
+	void_mask: array of arrays of bool, True where the cell is void
+	"""
+	def __init__(self, building_matrix: np.array):
+		grid = get_cell_grid(building_matrix)
+		self.shape = grid.shape
+		self.left_runs, self.right_runs = get_wall_runs(grid)
+		self.void_mask = grid == VOID
+
+	def visible_window(self, router_coords: tuple, router_range: int) -> tuple:
+		"""
+		:param router_coords: tuple, the (x,y) coordinates of a router in the building
+		:param router_range: int, the range of the router
+		:return: tuple, the mask of the cells covered by the router inside the square of the range clipped to the
+			building, and the coordinates of the upper left cell of the square
+		"""
+		n, m = self.shape
+		a, b = int(router_coords[0]), int(router_coords[1])
+		row_start, row_stop = max(0, a - router_range), min(n, a + router_range + 1)
+		column_start, column_stop = max(0, b - router_range), min(m, b + router_range + 1)
+
+		# the width of each row in the column of the router, then the running minimum from the router outwards
+		k = a - row_start
+		widths = []
+		for runs in (self.left_runs, self.right_runs):
+			row_runs = runs[row_start:row_stop, b]
+			row_widths = np.empty_like(row_runs)
+			row_widths[k:] = np.minimum.accumulate(row_runs[k:])
+			row_widths[:k + 1] = np.minimum.accumulate(row_runs[k::-1])[::-1]
+			widths.append(row_widths[:, np.newaxis])
+
+		dy = np.arange(column_start - b, column_stop - b)
+		visible = ((dy <= 0) & (-dy < widths[0])) | ((dy >= 0) & (dy < widths[1]))
+		visible &= ~self.void_mask[row_start:row_stop, column_start:column_stop]
+		return visible, (row_start, column_start)
+
+	def footprint(self, router_coords: tuple, router_range: int) -> list:
+		"""
+		:param router_coords: tuple, the (x,y) coordinates of a router in the building
+		:param router_range: int, the range of the router
+		:return: list of tuples, the cells covered by the router, in row-major order
+		"""
+		visible, (row_start, column_start) = self.visible_window(router_coords, router_range)
+		return [(x + row_start, y + column_start) for (x, y) in np.argwhere(visible).tolist()]
+
+	def is_visible(self, router_coords: tuple, points: np.array) -> np.array:
+		"""
+		:param router_coords: tuple, the (x,y) coordinates of a router in the building
+		:param points: array of shape (k, 2), the coordinates of cells of the building
+		:return: array of bool of length k, True for the cells covered by the router, whatever their distance
+		"""
+		a, b = int(router_coords[0]), int(router_coords[1])
+		points = np.reshape(np.asarray(points, dtype=np.int64), (-1, 2))
+		if len(points) == 0:
+			return np.zeros(shape=0, dtype=bool)
+
+		router_range = int(np.max(np.abs(points - (a, b))))
+		visible, (row_start, column_start) = self.visible_window((a, b), router_range)
+		return visible[points[:, 0] - row_start, points[:, 1] - column_start]
+
+	def filter_non_target_points(self, router_coords: tuple, points: list) -> list:
+		"""
+		Drop-in replacement of utils.filter_non_target_points
+
+		:param router_coords: tuple, the (x,y) coordinates of a router in the building
+		:param points: list, the cells (described with (x,y) coordinates) to filter
+		:return: filtered points, in their order
+		"""
+		keep = self.is_visible(router_coords, points)
+		return [point for (point, kept) in zip(points, keep.tolist()) if kept]
@@ -1,3 +1,11 @@
 from .Cell import *
 from .PriorityDict import *
 from .PrioritySoluton import *
+from .CellType import *
+from .CoverageIndex import *
+from .Visibility import *
+from .BuildingCache import *
+from .Placement import *
+from .RouterIndex import *
+from .FitnessState import *
+from .FitnessCache import *
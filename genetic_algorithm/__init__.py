@@ -1 +1,3 @@
 from .genetic_algorithm import genetic_algorithm
+from .island import island_genetic_algorithm
+from .steady_state import steady_state_genetic_algorithm
@@ -1,34 +1,46 @@
+import math
 import numpy as np
 import random
 from concurrent.futures import ProcessPoolExecutor
-from classes import PrioritySolution, Data
+from classes import PrioritySolution, Data, CoverageIndex, FitnessCache
+from classes.Placement import Placement
+from parallel import FitnessPool
+from genetic_algorithm.operators import rectangle_crossover, voronoi_crossover, local_mutation
 
-__all__ = ["genetic_algorithm"]
+__all__ = ["CROSSOVERS", "get_next_population", "evaluate_counting", "genetic_algorithm"]
 
 def mutate(
 		building_matrix: np.array,
 		routers_placement: np.array,
 		router_range: int,
-		fitness_function
+		fitness_function,
+		coverage_index: CoverageIndex = None
 ) -> np.array:
 	"""
+	Adds a router if the placement is within the budget, removes one otherwise. A Placement is mutated locally,
+	around one of its routers (see local_mutation); a matrix is mutated as a step of the priority solver, adding
+	a router on the least covered cell of the building or removing the nearest one to the most covered cell.
 
 	:return: the new routers placement
 	"""
-	pri_dic = PrioritySolution.init_pri_dic(building_matrix, routers_placement, router_range)
-	pri_dic.shuffle()  # shuffle priority dict
-	pri_dic.order()  # ordinate priority dict
-
 	# evaluate child
 	_, out_of_budget = fitness_function(routers_placement)
 
+	if isinstance(routers_placement, Placement):
+		if coverage_index is None:
+			coverage_index = CoverageIndex(building_matrix, router_range)
+		return local_mutation(building_matrix, routers_placement, out_of_budget, coverage_index)
+
+	pri_dic = PrioritySolution.init_pri_dic(building_matrix, routers_placement, router_range, coverage_index)
+
 	move_type = "remove" if out_of_budget else "add"
 	return PrioritySolution._state_neighbor(
 		pri_dic=pri_dic,
 		building_matrix=building_matrix,
 		routers_placement=routers_placement,
 		router_range=router_range,
-		move_type=move_type
+		move_type=move_type,
+		coverage_index=coverage_index
 	)
 
 def reproduce(routers_placement1: np.array, routers_placement2: np.array) -> np.array:
@@ -36,9 +48,12 @@ def reproduce(routers_placement1: np.array, routers_placement2: np.array) -> np.
 	Given 2 parents computes the child by extracting the submatrices for each parent and then merging
 	them.
 
-	:param routers_placement1: array of arrays, the first parent matrix
-	:param routers_placement2: array of arrays, the second parent matrix
-	:return: array of arrays, the child matrix
+	If the parents are Placements the child is built from the coordinates of their routers, without slicing
+	dense matrices.
+
+	:param routers_placement1: array of arrays, the first parent matrix, or its Placement
+	:param routers_placement2: array of arrays, the second parent matrix, or its Placement
+	:return: array of arrays, the child matrix, or its Placement
 	"""
 	matrix_rows, matrix_columns = routers_placement1.shape
 
@@ -46,6 +61,17 @@ def reproduce(routers_placement1: np.array, routers_placement2: np.array) -> np.
 	rows_mid = round(matrix_rows / 2)
 	columns_mid = round(matrix_columns / 2)
 
+	if isinstance(routers_placement1, Placement):
+		routers1, routers2 = routers_placement1.coords, routers_placement2.coords
+		upper1, left1 = routers1[:, 0] < rows_mid, routers1[:, 1] < columns_mid
+		upper2, left2 = routers2[:, 0] < rows_mid, routers2[:, 1] < columns_mid
+
+		# upper left and down right routers of the first parent, upper right and down left of the second one
+		return Placement(
+			routers_placement1.shape,
+			np.concatenate((routers1[upper1 == left1], routers2[upper2 != left2]))
+		)
+
 	# extracting sub-matrices
 	matrix1_upper_left = routers_placement1[0:rows_mid, 0:columns_mid]
 	matrix1_down_right = routers_placement1[rows_mid:, columns_mid:]
@@ -59,6 +85,14 @@ def reproduce(routers_placement1: np.array, routers_placement2: np.array) -> np.
 	return np.concatenate((merged_matrix_upper, merged_matrix_down), axis=0)
 
 
+# the crossover operators, taken two parents return their child
+CROSSOVERS = {
+	"quadrants": reproduce,
+	"rectangle": rectangle_crossover,
+	"voronoi": voronoi_crossover
+}
+
+
 _func = None
 
 def worker_init(func):
@@ -69,28 +103,73 @@ def worker_init(func):
 def worker(x):
 	return _func(x)
 
-def get_weight_population_by_fitness(population: list, fitness_function) -> tuple:
+
+def evaluate_counting(fitness_function, routers_placement) -> tuple:
+	"""
+	:param fitness_function: function that, taken a routers placement as its parameter, returns its value, or a
+		FitnessCache
+	:param routers_placement: the placement to evaluate
+	:return: tuple, the value of the placement and the number of fitness evaluations done to get it, 0 if the value
+		was found in the FitnessCache
+	"""
+	if isinstance(fitness_function, FitnessCache):
+		misses = fitness_function.misses
+		value = fitness_function(routers_placement)
+		return value, fitness_function.misses - misses
+	return fitness_function(routers_placement), 1
+
+def get_weight_population_by_fitness(population: list, fitness_function, fitness_pool: FitnessPool = None) -> tuple:
 	"""
 	Computes for each configuration the probability to be selected (according to the fitness function)
 	and returns the configurations (ordered in descending order)
 
 	:param population: list, list of routers placement
-	:param fitness_function: function that, taken a routers placement as its parameter, returns its value
-	:return: tuple, the first element is the best individual in the population, the latter is a list of tuples,
+	:param fitness_function: function that, taken a routers placement as its parameter, returns its value; if it
+		is a FitnessCache, the values of the configurations already evaluated are taken from it
+	:param fitness_pool: FitnessPool, if given the placements are evaluated by its persistent workers, sending
+		only the routers coordinates, instead of spawning a new pool that receives fitness_function
+	:return: tuple, the first element is the best individual in the population, the second is a list of tuples,
 	for each tuple the first element contains the routers placement, while the second element corresponds to its value
-	according to the fitness function
+	according to the fitness function; the last one is the number of configurations actually evaluated, without the
+	cached ones and the duplicates
 	"""
 	# computing for each configuration the probability to be selected, according to the fitness function
-	with ProcessPoolExecutor(initializer=worker_init, initargs=(fitness_function,)) as executor:
-		weighted_population = [
-			(configuration, configuration_fitness[0])
-			for (configuration, configuration_fitness) in zip(population, executor.map(worker, population))
-		]
+	if isinstance(fitness_function, FitnessCache):
+		# only the configurations not cached are evaluated, once even if they appear more than once
+		keys = [fitness_function.get_key(configuration) for configuration in population]
+		cached, missing, missing_population = {}, [], []
+		for key, configuration in zip(keys, population):
+			if key not in cached:
+				cached[key] = fitness_function.get(key)
+				if cached[key] is None:
+					missing.append(key)
+					missing_population.append(configuration)
+	else:
+		missing_population = population
+
+	if len(missing_population) == 0:
+		fitnesses = []
+	elif fitness_pool is not None:
+		fitnesses = fitness_pool.evaluate([np.transpose(np.nonzero(configuration)) for configuration in missing_population])
+	else:
+		with ProcessPoolExecutor(initializer=worker_init, initargs=(fitness_function,)) as executor:
+			fitnesses = list(executor.map(worker, missing_population))
+
+	if isinstance(fitness_function, FitnessCache):
+		for key, configuration_fitness in zip(missing, fitnesses):
+			cached[key] = configuration_fitness
+			fitness_function.put(key, configuration_fitness)
+		fitnesses = [cached[key] for key in keys]
+
+	weighted_population = [
+		(configuration, configuration_fitness[0])
+		for (configuration, configuration_fitness) in zip(population, fitnesses)
+	]
 
 	# order by the fitness of configuration
 	weighted_population.sort(key=lambda x: x[1], reverse=True)
 
-	return weighted_population[0], weighted_population
+	return weighted_population[0], weighted_population, len(missing_population)
 
 
 def choose_parents_population(
@@ -105,11 +184,59 @@ def choose_parents_population(
 	"""
 	# selected 2 parents with a probabity proportial to the configuration fitness
 	configurations, fitnesses = zip(*weighted_population)
+	# the fitness is negative far out of budget, the weights are then shifted so that the worst one is 1
+	lowest_fitness = min(fitnesses)
+	if lowest_fitness <= 0:
+		fitnesses = [fitness - lowest_fitness + 1 for fitness in fitnesses]
 	picked_parents = random.choices(configurations, weights=fitnesses, k=2)
 
 	return picked_parents[0], picked_parents[1]
 
 
+def get_next_population(
+		weighted_population: list,
+		building_matrix: np.array,
+		data: Data,
+		fitness_function,
+		mutation_probability: float,
+		crossover=reproduce,
+		verbose: bool = False
+) -> list:
+	"""
+	Breeds a new generation of the same size of the current one: each child is the crossover of two parents
+	chosen according to their fitness, mutated with probability mutation_probability
+
+	:param weighted_population: list, the tuples (configuration, fitness value of configuration) of the population
+	:param crossover: function, the crossover operator, see CROSSOVERS
+	:return: list, the new population
+	"""
+	new_population = []
+	for _ in range(len(weighted_population)):
+		# select randomly two individuals in the population, preferring these with better fitness
+		parent1, parent2 = choose_parents_population(weighted_population)
+
+		# let the parents reproduce
+		child = crossover(parent1, parent2)
+
+		# do a mutation
+		if random.random() < mutation_probability:
+			if verbose:
+				print("A random mutation occurred in a child!")
+
+			child = mutate(
+				building_matrix,
+				child,
+				data.router_range,
+				fitness_function,
+				data.coverage_index
+			)
+
+		# add new child to population
+		new_population.append(child)
+
+	return new_population
+
+
 def genetic_algorithm(
 		building_matrix: np.array,
 		population: list,
@@ -118,7 +245,11 @@ def genetic_algorithm(
 		mutation_probability: float,
 		flip_cell_probability: float = 0.05,
 		max_iter: int = 1000,
-		verbose: bool = False
+		verbose: bool = False,
+		workers: int = None,
+		crossover: str = "quadrants",
+		max_evaluations: int = None,
+		use_fitness_pool: bool = False
 ) -> np.array:
 	"""
 	:param building_matrix: array of arrays, indicates where are void, wall and target cells
@@ -128,17 +259,68 @@ def genetic_algorithm(
 	:param flip_cell_probability: float, the probability that during a mutation cell is flipped
 	:param max_iter: int, maximum number of iterations cycles
 	:param verbose: bool
+	:param workers: int, the number of processes evaluating the population, by default the number of processors
+	:param crossover: str, the crossover operator, one of CROSSOVERS: "quadrants" (the quadrants of the building
+		split between the parents), "rectangle" (a random rectangle) or "voronoi" (random Voronoi regions)
+	:param max_evaluations: int, the maximum number of fitness evaluations (each individual of each generation, and
+		each child evaluated to be mutated; the values found in a FitnessCache are not counted), checked after the
+		evaluation of a generation; by default there is no limit
+	:param use_fitness_pool: bool, if True the populations are evaluated by the persistent workers of a FitnessPool,
+		which compute utils.compute_fitness on the problem instance instead of calling fitness_function: set it only
+		if fitness_function computes that same fitness (optionally through a FitnessCache); otherwise each
+		generation is evaluated by a new pool of processes receiving fitness_function
 	:return: the best individual in population, according to fitness
 	"""
+	if not use_fitness_pool:
+		return _genetic_algorithm(
+			building_matrix, population, data, fitness_function, mutation_probability, None, max_iter, verbose,
+			CROSSOVERS[crossover], max_evaluations
+		)
+
+	with FitnessPool(data, workers) as fitness_pool:
+		return _genetic_algorithm(
+			building_matrix, population, data, fitness_function, mutation_probability, fitness_pool, max_iter, verbose,
+			CROSSOVERS[crossover], max_evaluations
+		)
+
+
+def _genetic_algorithm(
+		building_matrix: np.array,
+		population: list,
+		data: Data,
+		fitness_function,
+		mutation_probability: float,
+		fitness_pool: FitnessPool,
+		max_iter: int,
+		verbose: bool,
+		crossover=reproduce,
+		max_evaluations: int = None
+) -> np.array:
+	"""
+	The main loop of genetic_algorithm, evaluating the populations with the persistent workers of fitness_pool if
+	it is given, with fitness_function otherwise
+	"""
 	avg = lambda l: sum(l)/len(l) if len(l) != 0 else 0
 	best_individual_found = None
 
+	evaluations = 0
+	max_evaluations = max_evaluations if max_evaluations is not None else math.inf
+
+	def counted_fitness_function(configuration):
+		nonlocal evaluations
+		value, evaluated = evaluate_counting(fitness_function, configuration)
+		evaluations += evaluated
+		return value
+
 	for i in range(max_iter):  # iterate until some individual is fit enough, or enough time has elapsed
 		if verbose:
 			print(f"ITERATION {i}/{max_iter}")
 
 		# weight each population member by fitness function
-		best_individual_in_population, weighted_population = get_weight_population_by_fitness(population, fitness_function)
+		best_individual_in_population, weighted_population, evaluated = get_weight_population_by_fitness(
+			population, fitness_function, fitness_pool
+		)
+		evaluations += evaluated
 		if best_individual_found is None:
 			best_individual_found = best_individual_in_population
 		else:
@@ -152,33 +334,15 @@ def genetic_algorithm(
 			# print max, min, average of fitness value
 			print(f"Population fitness min/max/avg = {min(fitness_values)}/{max(fitness_values)}/{avg(fitness_values)}")
 
-		new_population = []
-		for _ in range(len(population)):
-			# select randomly two individuals in the population, preferring these with better fitness
-			parent1, parent2 = choose_parents_population(weighted_population)
-
-			# let the parents reproduce
-			child = reproduce(parent1, parent2)
-
-			# do a mutation
-			if random.random() < mutation_probability:
-				if verbose:
-					print("A random mutation occurred in a child!")
-
-				child = mutate(
-					building_matrix,
-					child,
-					data.router_range,
-					fitness_function
-				)
-
-			# add new child to population
-			new_population.append(child)
+		if evaluations >= max_evaluations:
+			return best_individual_found[0]
 
-		population = new_population
+		population = get_next_population(
+			weighted_population, building_matrix, data, counted_fitness_function, mutation_probability, crossover, verbose
+		)
 
 	# return best individual found according to fitness
-	best_individual_in_population, weighted_population = get_weight_population_by_fitness(population, fitness_function)
+	best_individual_in_population, weighted_population, _ = get_weight_population_by_fitness(population, fitness_function, fitness_pool)
 
 	if best_individual_found is None:
 		return best_individual_in_population[0]
@@ -0,0 +1,161 @@
+import math
+import random
+import numpy as np
+import utils
+from concurrent.futures import ProcessPoolExecutor
+from classes import Data, FitnessCache
+from classes.Placement import Placement
+from parallel import SharedData
+from genetic_algorithm.genetic_algorithm import CROSSOVERS, get_next_population
+
+__all__ = ["island_genetic_algorithm"]
+
+
+_data = None
+_fitness_function = None
+
+def worker_init(shared_data: SharedData):
+	global _data, _fitness_function
+	_data = shared_data.attach()
+	# the cache of each worker lives as long as the pool, across the epochs and the islands it runs
+	_fitness_function = FitnessCache(lambda routers: utils.compute_fitness(
+		building_matrix=_data.matrix,
+		routers_placement=routers,
+		router_range=_data.router_range,
+		backbone_starting_point=_data.initial_backbone,
+		router_cost=_data.router_cost,
+		backbone_cost=_data.backbone_cost,
+		budget=_data.budget,
+		coverage_index=_data.coverage_index
+	))
+
+
+def run_island(
+		population: list,
+		generations: int,
+		mutation_probability: float,
+		crossover: str,
+		seed: int
+) -> tuple:
+	"""
+	Evolves the population of an island for some generations, inside a worker
+
+	:param population: list of tuples, the coordinates of the routers of each individual, an array of shape (n, 2),
+		and its fitness, None if it has not been evaluated yet
+	:param generations: int, the number of generations
+	:param mutation_probability: float, probability of a random mutation of a child
+	:param crossover: str, the crossover operator, one of CROSSOVERS
+	:param seed: int, the seed of the random generators of the island
+	:return: tuple, the population evolved as a list of (coordinates, fitness), from the best individual, and the
+		best individual found during the epoch, as (coordinates, fitness)
+	"""
+	random.seed(seed)
+	np.random.seed(seed)
+
+	def evaluate(population, fitnesses):
+		weighted_population = [
+			(configuration, fitness if fitness is not None else _fitness_function(configuration)[0])
+			for (configuration, fitness) in zip(population, fitnesses)
+		]
+		weighted_population.sort(key=lambda x: x[1], reverse=True)
+		return weighted_population
+
+	# the individuals coming from the previous epoch are not evaluated again
+	weighted_population = evaluate(
+		[Placement(_data.matrix.shape, routers_coords) for (routers_coords, _) in population],
+		[fitness for (_, fitness) in population]
+	)
+	best_individual_found = weighted_population[0]
+	for _ in range(generations):
+		population = get_next_population(
+			weighted_population, _data.matrix, _data, _fitness_function, mutation_probability, CROSSOVERS[crossover]
+		)
+		weighted_population = evaluate(population, [None] * len(population))
+		if weighted_population[0][1] > best_individual_found[1]:
+			best_individual_found = weighted_population[0]
+
+	return (
+		[(configuration.coords, fitness) for (configuration, fitness) in weighted_population],
+		(best_individual_found[0].coords, best_individual_found[1])
+	)
+
+
+def island_genetic_algorithm(
+		data: Data,
+		population: list,
+		mutation_probability: float,
+		max_iter: int = 1000,
+		islands: int = 4,
+		workers: int = None,
+		migration_interval: int = 5,
+		migrants: int = 1,
+		crossover: str = "quadrants",
+		verbose: bool = False
+):
+	"""
+	Island model of the genetic algorithm: each island evolves its own copy of the initial population in a worker
+	process, selection, crossover, mutation and evaluation included, and every migration_interval generations
+	the best individuals of each island replace the worst ones of the next island along a ring.
+
+	The building and its coverage index are put in shared memory, so that the workers attach to them instead of
+	receiving a copy, and the individuals travel between the processes as arrays of routers coordinates. The
+	islands of an epoch run at the same time, the migrations happen in this process between two epochs.
+
+	:param data: Data, the problem instance
+	:param population: list, the initial configurations, each island starts from all of them
+	:param mutation_probability: float, probability of a random mutation of a child
+	:param max_iter: int, the number of generations of each island
+	:param islands: int, the number of islands
+	:param workers: int, the number of processes, by default the number of islands
+	:param migration_interval: int, the number of generations between two migrations
+	:param migrants: int, the number of individuals sent by each island to the next one at each migration
+	:param crossover: str, the crossover operator, one of CROSSOVERS
+	:param verbose: bool
+	:return: the best individual found, as a Placement
+	"""
+	shape = data.matrix.shape
+	populations = [
+		[(np.transpose(np.nonzero(configuration)), None) for configuration in population] for _ in range(islands)
+	]
+	migrants = min(migrants, len(population))
+	best_routers, best_fitness = None, -math.inf
+	shared_data = SharedData(data)
+
+	try:
+		with ProcessPoolExecutor(
+				max_workers=workers if workers is not None else islands,
+				initializer=worker_init,
+				initargs=(shared_data,)
+		) as executor:
+			for epoch in range(math.ceil(max_iter / migration_interval)):
+				generations = min(migration_interval, max_iter - epoch * migration_interval)
+				results = list(executor.map(
+					run_island,
+					populations,
+					[generations] * islands,
+					[mutation_probability] * islands,
+					[crossover] * islands,
+					[random.getrandbits(32) for _ in range(islands)]
+				))
+
+				for _, (routers_coords, fitness) in results:
+					if fitness > best_fitness:
+						best_routers, best_fitness = routers_coords, fitness
+
+				# each island sends its best individuals to the next one, where they replace the worst ones
+				populations = [weighted_population for weighted_population, _ in results]
+				if islands > 1 and migrants > 0:
+					populations = [
+						populations[i][:len(populations[i]) - migrants] + populations[i - 1][:migrants]
+						for i in range(islands)
+					]
+
+				if verbose:
+					print(
+						f"EPOCH {epoch}, islands best fitness: {[best[1] for _, best in results]}, "
+						f"best fitness: {best_fitness}"
+					)
+	finally:
+		shared_data.unlink()
+
+	return Placement(shape, best_routers)
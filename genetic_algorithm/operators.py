@@ -0,0 +1,179 @@
+import random
+import numpy as np
+from classes.CoverageIndex import CoverageIndex
+from classes.CellType import get_cell_grid, TARGET
+from classes.Placement import Placement
+
+__all__ = ["rectangle_crossover", "voronoi_crossover", "get_window_counts", "local_mutation"]
+
+# number of regions of the building split between the parents by voronoi_crossover
+VORONOI_SEEDS = 4
+
+# number of cells among which local_mutation adds a router
+MUTATION_CANDIDATES = 32
+
+
+def _get_coords(routers_placement) -> np.array:
+	if isinstance(routers_placement, Placement):
+		return routers_placement.coords
+	return np.transpose(np.nonzero(routers_placement))
+
+
+def _get_child(parent, routers_coords: np.array):
+	"""
+	:return: the placement of the routers, of the same type (np.array or Placement) of the parent
+	"""
+	child = Placement(parent.shape, routers_coords)
+	return child if isinstance(parent, Placement) else np.asarray(child, dtype=parent.dtype)
+
+
+def rectangle_crossover(routers_placement1, routers_placement2):
+	"""
+	Given 2 parents computes the child taking the routers of the first parent inside a random rectangle of the
+	building and the routers of the second one outside it; only the coordinates of the routers are looked at, so
+	the child is built in O(routers)
+
+	:param routers_placement1: Placement, the first parent, or its matrix
+	:param routers_placement2: Placement, the second parent, or its matrix
+	:return: the child, of the same type of the parents
+	"""
+	n, m = routers_placement1.shape
+	top, bottom = sorted(random.sample(range(n + 1), 2))
+	left, right = sorted(random.sample(range(m + 1), 2))
+
+	def inside(routers):
+		return (top <= routers[:, 0]) & (routers[:, 0] < bottom) & (left <= routers[:, 1]) & (routers[:, 1] < right)
+
+	routers1, routers2 = _get_coords(routers_placement1), _get_coords(routers_placement2)
+	return _get_child(routers_placement1, np.concatenate((routers1[inside(routers1)], routers2[~inside(routers2)])))
+
+
+def voronoi_crossover(routers_placement1, routers_placement2):
+	"""
+	Given 2 parents computes the child splitting the building in the Voronoi regions of a few random cells, each
+	region taking the routers of one of the parents (both parents get at least a region); the child is built in
+	O(routers)
+
+	:param routers_placement1: Placement, the first parent, or its matrix
+	:param routers_placement2: Placement, the second parent, or its matrix
+	:return: the child, of the same type of the parents
+	"""
+	n, m = routers_placement1.shape
+	seeds = np.array([(random.randrange(n), random.randrange(m)) for _ in range(VORONOI_SEEDS)])
+	owners = [i % 2 for i in range(VORONOI_SEEDS)]
+	random.shuffle(owners)
+	owners = np.array(owners)
+
+	def owner(routers):
+		distances = ((routers[:, np.newaxis, :] - seeds[np.newaxis, :, :]) ** 2).sum(axis=2)
+		return owners[np.argmin(distances, axis=1)]
+
+	routers1, routers2 = _get_coords(routers_placement1), _get_coords(routers_placement2)
+	return _get_child(routers_placement1, np.concatenate((routers1[owner(routers1) == 0], routers2[owner(routers2) == 1])))
+
+
+def get_window_counts(
+		routers_coords: np.array,
+		center: tuple,
+		radius: int,
+		coverage_index: CoverageIndex
+) -> tuple:
+	"""
+	Counts how many routers cover each cell of the square of side 2 radius + 1 around a cell, clipped to the
+	building, unpacking only the footprints of the routers near the square
+
+	:param routers_coords: array of shape (k, 2), the coordinates of the routers
+	:param center: tuple, the (x,y) coordinates of the center of the square
+	:param radius: int, the distance of the border of the square from its center
+	:param coverage_index: CoverageIndex, the precomputed footprints of the building
+	:return: tuple, the counts of the cells of the square and the coordinates of its upper left cell
+	"""
+	n, m = coverage_index.shape
+	router_range = coverage_index.router_range
+	row_start, row_stop = max(0, center[0] - radius), min(n, center[0] + radius + 1)
+	column_start, column_stop = max(0, center[1] - radius), min(m, center[1] + radius + 1)
+	height, width = row_stop - row_start, column_stop - column_start
+
+	# the routers whose square overlaps the window
+	near = routers_coords[
+		(row_start - router_range <= routers_coords[:, 0]) & (routers_coords[:, 0] < row_stop + router_range)
+		& (column_start - router_range <= routers_coords[:, 1]) & (routers_coords[:, 1] < column_stop + router_range)
+	]
+	offsets = coverage_index.offsets
+	covered = np.unpackbits(coverage_index.footprints[near[:, 0], near[:, 1]], axis=1, count=len(offsets)).astype(bool)
+	rows, columns = ((near[:, np.newaxis, :] + offsets[np.newaxis, :, :])[covered] - (row_start, column_start)).T
+	inside = (0 <= rows) & (rows < height) & (0 <= columns) & (columns < width)
+
+	coverage_counts = np.bincount(rows[inside] * width + columns[inside], minlength=height * width)
+	return coverage_counts.reshape(height, width), (row_start, column_start)
+
+
+def local_mutation(
+		building_matrix: np.array,
+		routers_placement,
+		out_of_budget: bool,
+		coverage_index: CoverageIndex
+):
+	"""
+	Mutates the placement around one of its routers picked at random, looking only at the coverage counts of the
+	cells near it (see get_window_counts), so that the mutation costs O(routers + R^2) instead of O(H*W):
+
+	- if the placement is out of budget, among the routers within range of the picked one it removes the router
+		covering alone the fewest cells;
+	- otherwise, it adds a router within twice the range of the picked one: among a few target cells without router
+		and with the lowest coverage, on the one covering the most cells not covered yet.
+
+	:param building_matrix: array of arrays, the matrix describing the building (voids, targets, walls)
+	:param routers_placement: Placement, the placement to mutate, or its matrix
+	:param out_of_budget: bool, True if the placement is out of budget
+	:param coverage_index: CoverageIndex, the precomputed footprints of the building
+	:return: the mutated placement, of the same type of routers_placement
+	"""
+	router_range = coverage_index.router_range
+	routers = _get_coords(routers_placement)
+	child = routers_placement.copy()
+
+	if len(routers) == 0:
+		if out_of_budget:
+			return child
+		# no router to start from, the center is a target cell at random
+		targets = np.argwhere(get_cell_grid(building_matrix) == TARGET)
+		if len(targets) == 0:
+			return child
+		center = tuple(targets[random.randrange(len(targets))].tolist())
+	else:
+		center = tuple(routers[random.randrange(len(routers))].tolist())
+
+	if out_of_budget:
+		candidates = routers[np.abs(routers - center).max(axis=1) <= router_range]
+		coverage_counts, origin = get_window_counts(routers, center, 2 * router_range, coverage_index)
+		covered_alone = [
+			np.count_nonzero(coverage_counts[tuple((coverage_index.footprint_array(router) - origin).T)] == 1)
+			for router in candidates.tolist()
+		]
+		x, y = candidates[int(np.argmin(covered_alone))]
+		child[x, y] = 0
+		return child
+
+	# the counts around the cells within twice the range, where the router can be added, and their footprints
+	coverage_counts, origin = get_window_counts(routers, center, 3 * router_range, coverage_index)
+	height, width = coverage_counts.shape
+	free = get_cell_grid(building_matrix)[origin[0]:origin[0] + height, origin[1]:origin[1] + width] == TARGET
+	free &= np.abs(np.arange(origin[0], origin[0] + height) - center[0])[:, np.newaxis] <= 2 * router_range
+	free &= np.abs(np.arange(origin[1], origin[1] + width) - center[1])[np.newaxis, :] <= 2 * router_range
+	routers = routers - origin
+	routers = routers[(0 <= routers[:, 0]) & (routers[:, 0] < height) & (0 <= routers[:, 1]) & (routers[:, 1] < width)]
+	free[routers[:, 0], routers[:, 1]] = False
+	if not free.any():
+		return child
+
+	# a few of the least covered cells at random, the one covering the most uncovered cells is taken
+	cells = np.argwhere(free & (coverage_counts == coverage_counts[free].min())) + origin
+	cells = [tuple(cell) for cell in cells[random.sample(range(len(cells)), min(len(cells), MUTATION_CANDIDATES))].tolist()]
+	gains = [
+		np.count_nonzero(coverage_counts[tuple((coverage_index.footprint_array(cell) - origin).T)] == 0)
+		for cell in cells
+	]
+	x, y = cells[int(np.argmax(gains))]
+	child[x, y] = 1
+	return child
@@ -0,0 +1,108 @@
+import math
+import random
+import numpy as np
+from classes import Data
+from genetic_algorithm.genetic_algorithm import CROSSOVERS, mutate, evaluate_counting
+
+__all__ = ["tournament_selection", "steady_state_genetic_algorithm"]
+
+
+def tournament_selection(weighted_population: list, tournament_size: int) -> tuple:
+	"""
+	Picks tournament_size individuals of the population at random and returns the best one; unlike a selection
+	proportional to the fitness it only compares the fitness values, so it works with negative ones too
+
+	:param weighted_population: list, a list containing tuples in the form (configuration, fitness value of configuration)
+	:param tournament_size: int, the number of individuals taking part in the tournament
+	:return: tuple, the (configuration, fitness value) of the winner
+	"""
+	contestants = random.sample(weighted_population, min(tournament_size, len(weighted_population)))
+	return max(contestants, key=lambda x: x[1])
+
+
+def steady_state_genetic_algorithm(
+		building_matrix: np.array,
+		population: list,
+		data: Data,
+		fitness_function,
+		mutation_probability: float,
+		max_iter: int = 1000,
+		replacements: int = 2,
+		tournament_size: int = 3,
+		elites: int = 1,
+		max_evaluations: int = None,
+		crossover: str = "quadrants",
+		verbose: bool = False
+):
+	"""
+	Steady-state variant of the genetic algorithm: at each step only a few children are bred, each one from two
+	parents chosen by tournament selection, and they replace the worst individuals of the population. The best
+	elites individuals are never replaced, and the fitness of the survivors is kept with them, so each step
+	evaluates only its children.
+
+	A fitness evaluation is a call of fitness_function whose value is not found in a FitnessCache: each child costs
+	one, plus one when it is mutated (mutate evaluates the child to choose the mutation), unless they were evaluated
+	before. The run stops after max_iter steps, or once max_evaluations
+	evaluations have been done (checked between two steps), so that runs of different algorithms can be compared
+	at the same number of evaluations.
+
+	:param building_matrix: array of arrays, indicates where are void, wall and target cells
+	:param population: list, list of configurations to use as a starting points
+	:param fitness_function: function, function used to evaluate the fitness of a configuration
+	:param mutation_probability: float, probability of a random mutation of a child
+	:param max_iter: int, maximum number of steps
+	:param replacements: int, the number of children bred at each step
+	:param tournament_size: int, the number of individuals taking part in each tournament
+	:param elites: int, the number of best individuals never replaced, lower than the size of the population
+	:param max_evaluations: int, the maximum number of fitness evaluations, by default there is no limit
+	:param crossover: str, the crossover operator, one of CROSSOVERS
+	:param verbose: bool
+	:return: the best individual found, according to fitness
+	"""
+	evaluations = 0
+
+	def evaluate(configuration):
+		nonlocal evaluations
+		value, evaluated = evaluate_counting(fitness_function, configuration)
+		evaluations += evaluated
+		return value
+
+	if elites >= len(population):
+		raise ValueError(f"{elites} elites leave no individual to replace in a population of {len(population)}")
+
+	max_evaluations = max_evaluations if max_evaluations is not None else math.inf
+	# at least a slot of the population is replaced at each step, never the one of an elite
+	replacements = max(1, min(replacements, len(population) - elites))
+
+	weighted_population = [(configuration, evaluate(configuration)[0]) for configuration in population]
+	weighted_population.sort(key=lambda x: x[1], reverse=True)
+	best_individual_found = weighted_population[0]
+
+	for i in range(max_iter):
+		if evaluations >= max_evaluations:
+			break
+
+		children = []
+		for _ in range(replacements):
+			parent1, _ = tournament_selection(weighted_population, tournament_size)
+			parent2, _ = tournament_selection(weighted_population, tournament_size)
+			child = CROSSOVERS[crossover](parent1, parent2)
+
+			if random.random() < mutation_probability:
+				child = mutate(building_matrix, child, data.router_range, evaluate, data.coverage_index)
+
+			children.append((child, evaluate(child)[0]))
+
+		# the children take the places of the worst individuals, out of the elites
+		weighted_population = weighted_population[:len(weighted_population) - len(children)] + children
+		weighted_population.sort(key=lambda x: x[1], reverse=True)
+		if weighted_population[0][1] > best_individual_found[1]:
+			best_individual_found = weighted_population[0]
+
+		if verbose:
+			print(
+				f"STEP {i}/{max_iter}, evaluations {evaluations}, children fitness {[fitness for _, fitness in children]}, "
+				f"best fitness {best_individual_found[1]}"
+			)
+
+	return best_individual_found[0]
@@ -0,0 +1 @@
+from .greedy import *
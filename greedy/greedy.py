@@ -0,0 +1,124 @@
+import heapq
+import numpy as np
+import backbone
+from classes import Data, FitnessState
+from classes.Placement import Placement
+
+__all__ = ["greedy"]
+
+
+# number of bits set in each byte, to count the cells of the packed footprints
+POPCOUNT = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.int32)
+
+
+def get_footprint_sizes(data: Data) -> np.array:
+	"""
+	:param data: Data, the problem instance
+	:return: array of arrays of ints, the number of target cells covered by a router placed in each cell
+	"""
+	footprints = data.coverage_index.footprints
+	sizes = np.zeros(shape=footprints.shape[:2], dtype=np.int32)
+	for k in range(footprints.shape[2]):
+		sizes += POPCOUNT[footprints[:, :, k]]
+	return sizes
+
+
+def get_steiner_cost(data: Data, placement: Placement) -> int:
+	"""
+	:return: the cost of the placement, with the backbone of backbone.get_steiner_tree
+	"""
+	backbone_length = backbone.get_steiner_length(
+		data.initial_backbone, placement.coords, data.matrix.shape, data.backbone_cost
+	)
+	return len(placement) * data.router_cost + backbone_length * data.backbone_cost
+
+
+def greedy(data: Data, batch_size: int = 32, verbose: bool = False) -> Placement:
+	"""
+	Places the routers one at a time, each time in the target cell with the greatest marginal gain of the score,
+	that is 1000 times the number of new cells covered, minus the router cost and the cost of the backbone
+	needed to connect it (estimated with its distance from the backbone), until the gain is positive and the
+	budget allows it.
+
+	The gains are kept in a max-heap and re-evaluated lazily (CELF): the gain of a candidate is computed again
+	only when it reaches the top of the heap after a router has been placed, and the candidate is placed if it
+	is still on top. The stale gains are computed again in batches, and the distance of a candidate from the
+	backbone is updated only with the cells added to the tree since its last evaluation.
+
+	The coverage part of a stale gain is an upper bound, as a router can only lose new cells when the others are
+	placed, while its backbone part can only get better, as the tree grows; since a cell of coverage is worth
+	much more than a cell of backbone, the few candidates underestimated are picked late, not lost.
+
+	:param data: Data, the problem instance
+	:param batch_size: int, how many stale gains are computed at once, with vectorized operations
+	:param verbose: bool
+	:return: Placement, the routers placed
+	"""
+	fitness_state = FitnessState(data)
+	tree = fitness_state.backbone
+	start_row, start_column = data.initial_backbone
+
+	# initial gains, with the distance from the starting point
+	sizes = get_footprint_sizes(data)
+	rows, columns = np.nonzero(data.target_mask & (1000 * sizes > data.router_cost))
+	distances = np.maximum(np.abs(rows - start_row), np.abs(columns - start_column))
+	gains = 1000 * sizes[rows, columns] - data.router_cost - data.backbone_cost * distances
+
+	# each entry is (-gain, number of routers placed when the gain was computed, row, column, distance from the
+	# tree, number of cells of the tree when the gain was computed)
+	heap = list(zip(
+		(-gains).tolist(), [0] * len(gains), rows.tolist(), columns.tolist(), distances.tolist(), [1] * len(gains)
+	))
+	heapq.heapify(heap)
+
+	evaluations = 0
+	while heap:
+		number_routers = fitness_state.number_routers
+
+		if heap[0][1] != number_routers:
+			# the stale gains on top of the heap are computed again, in batches
+			batch = []
+			while heap and heap[0][1] != number_routers and len(batch) < batch_size:
+				batch.append(heapq.heappop(heap))
+			evaluations += len(batch)
+
+			_, _, rows, columns, distances, numbers_cells = map(np.array, zip(*batch))
+			cells = np.transpose([rows, columns])
+			new_distances = tree.distances(cells, since=numbers_cells.min())
+			if new_distances is not None:
+				distances = np.minimum(distances, new_distances)
+			gains = 1000 * fitness_state.coverage_gains(cells) - data.router_cost - data.backbone_cost * distances
+
+			# the coverage can only get lower, the candidates with no gain are dropped
+			for gain, i, j, distance in zip(gains.tolist(), rows.tolist(), columns.tolist(), distances.tolist()):
+				if gain > 0:
+					heapq.heappush(heap, (-gain, number_routers, i, j, distance, tree.number_cells))
+			continue
+
+		_, _, i, j, _, _ = heapq.heappop(heap)
+		cost = fitness_state.total_cost + data.router_cost + data.backbone_cost * tree.delta_add((i, j))
+		if cost > fitness_state.budget:
+			# the candidate does not fit in the budget, a cheaper one may still fit
+			if fitness_state.total_cost + data.router_cost > fitness_state.budget:
+				break
+			continue
+
+		fitness_state.add((i, j))
+
+		if verbose and fitness_state.number_routers % 100 == 0:
+			print(
+				f"routers: {fitness_state.number_routers}, covered: {fitness_state.number_covered_cells}/"
+				f"{data.target_area}, cost: {fitness_state.total_cost}/{data.budget}, evaluations: {evaluations}"
+			)
+
+	placement = fitness_state.get_placement()
+
+	# the score uses the backbone of backbone.get_steiner_tree, which can be longer than the one grown here
+	routers = fitness_state.routers
+	while get_steiner_cost(data, placement) > data.budget:
+		placement.remove(routers.pop())
+
+	if verbose:
+		print(f"routers: {len(placement)}, evaluations: {evaluations}")
+
+	return placement
@@ -32,7 +32,7 @@ def hill_climb(
         router_mask = data.initial_routers_placement()
         print("STARTING CONFIGURATION:")
         #print_routers(data.matrix, data.router_list)
-        starting_score = get_number_covered_cells(router_mask, data.matrix, data.router_range)
+        starting_score = get_number_covered_cells(router_mask, data.matrix, data.router_range, data.coverage_index)
         print("STARTING SCORE: ", starting_score)
         
         best_routers_settings = None
@@ -48,7 +48,8 @@ def hill_climb(
                         building_matrix=building_matrix,
                         router_list=router_list, 
                         target_coords=target_coords, 
-                        range=router_range)
+                        range=router_range,
+                        coverage_index=data.coverage_index)
         
         if policy == "best":
             policy = Policy.BEST
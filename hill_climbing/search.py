@@ -1,7 +1,9 @@
 import numpy as np
 import random
 from enum import Enum
-from utils import get_number_covered_cells, get_points_around_router, filter_non_target_points
+from classes.CellType import WALL, VOID, get_cell_grid, get_target_mask
+from classes.CoverageIndex import CoverageIndex
+from utils import get_number_covered_cells, get_coverage_counts, get_points_around_router, filter_visible_points, get_router_coverage
 
 class NotValidPolicyExcception(Exception):
     pass
@@ -112,6 +114,7 @@ def best_move(actual_score, map_mask, building_matrix, router_list, range):
     best_move_set = ()
     best_score = actual_score
     
+    building_matrix = get_cell_grid(building_matrix)
     boundary = map_mask.shape
     for i, router in enumerate(router_list):
         start_coord = [router[0], router[1]]
@@ -122,8 +125,8 @@ def best_move(actual_score, map_mask, building_matrix, router_list, range):
             # violating the boundary, should be reset
             if (router[0] >= boundary[0] or router[0] < 0 or
                 router[1] >= boundary[1] or router[1] < 0 or
-                building_matrix[router[0]][router[1]] == '#' or
-                building_matrix[router[0]][router[1]] == '-'
+                building_matrix[router[0]][router[1]] == WALL or
+                building_matrix[router[0]][router[1]] == VOID
                 ):
                 restore_move(router, action)
                 # router = [start_coord[0], start_coord[1]]
@@ -163,7 +166,7 @@ def add_router(map_mask, building_matrix, router_list, _range):
             _range
         )
         # filter points covered by walls and void cells
-        points_covered_by_router = filter_non_target_points(
+        points_covered_by_router = filter_visible_points(
             building_matrix,
             router_coords,
             points_covered_by_router
@@ -171,11 +174,7 @@ def add_router(map_mask, building_matrix, router_list, _range):
         for covered_cell in points_covered_by_router:
             covered_cells.add(covered_cell)
             
-    target_coord = set()
-    for i, row in enumerate(building_matrix):
-        for j, item in enumerate(row):
-            if item == '.':
-                target_coord.add((i,j))
+    target_coord = set((i, j) for (i, j) in np.argwhere(get_target_mask(building_matrix)).tolist())
     
     to_cover = target_coord-covered_cells
     # print("target_coord: {}".format(target_coord))
@@ -253,35 +252,40 @@ class Search:
     """
     the search class, based on the naive implementation but instead calculating each time the overall
     score, we calculate the score locally in the router coverage (it should be faster) 
+
+    The coverage is kept as an int16 array with the number of routers covering each cell, padded by range + 1
+    cells on every side so that the window around any router (or any cell next to it) can be sliced without
+    bound checks; moving a router by one cell only changes the cells in the symmetric difference of the old and
+    the new footprint, so only those are looked up.
     """
-    def __init__(self, map_mask, building_matrix, router_list, target_coords, range) -> None:
+    def __init__(self, map_mask, building_matrix, router_list, target_coords, range, coverage_index=None) -> None:
         """Constructor
-        initialize the coverage of each router in a dictionary form s.t. the pair <key, value> are defined as:
-         - key is the coordinates the each covered cell
-         - value is how many routers have covered that cell
+        initialize the coverage counts of the routers, that is how many routers cover each cell
 
         Args:
             map_mask (np.array): the mask that represents the router on the map (aka building_matrix)
             building_matrix (np.array): the representation of the building
             router_list (list): list of router coordinates
             range (int): the coverage range of the routers
+            coverage_index (CoverageIndex, optional): precomputed footprints of the building. Defaults to None.
         """
-        self.covered_dict = {}
         self.map_mask = map_mask
         self.building_matrix = building_matrix
         self.router_list = router_list
         self.range = range
         self.target_coords = target_coords
         self.cached_move_set = None
-        
-        for router_coords in zip(*map_mask.nonzero()):
-            points_covered_by_router = self.get_router_coverage(router_coords)
-            for covered_cell in points_covered_by_router:
-                if covered_cell not in self.covered_dict.keys():
-                    self.covered_dict[covered_cell] = 1
-                else:
-                    self.covered_dict[covered_cell] += 1
-                    
+        self.coverage_index = coverage_index if coverage_index is not None else CoverageIndex(building_matrix, range)
+        self.target_mask = get_target_mask(building_matrix)
+
+        n, m = map_mask.shape
+        self.padding = range + 1
+        self._padded_counts = np.zeros(shape=(n + 2 * self.padding, m + 2 * self.padding), dtype=np.int16)
+        # view of the counts of the cells of the building
+        self.coverage_counts = self._padded_counts[self.padding:self.padding + n, self.padding:self.padding + m]
+
+        self.coverage_counts[:] = get_coverage_counts(map_mask, building_matrix, range, self.coverage_index)
+
     def get_router_coverage(self, router_coords) -> list:
         """gets the local coverage of the router with coordinates router_coords
 
@@ -291,20 +295,47 @@ class Search:
         Returns:
             list: the list of covered points
         """
-        # compute points covered by the router
-        points_covered_by_router = get_points_around_router(
-        self.map_mask,
-        router_coords,
-        self.range
-        )
-        # filter points covered by walls and void cells
-        points_covered_by_router = filter_non_target_points(
+        # compute points covered by the router, filtering walls and void cells
+        return get_router_coverage(
             self.building_matrix,
-            router_coords,
-            points_covered_by_router
+            (router_coords[0], router_coords[1]),
+            self.range,
+            self.coverage_index
         )
-        return points_covered_by_router
-    
+
+    def _footprint_window(self, router_coords) -> np.array:
+        """
+        Args:
+            router_coords (list): the coordinate of the router
+
+        Returns:
+            np.array: the (2 range + 1, 2 range + 1) boolean mask of the cells covered by the router, centered on it
+        """
+        side = 2 * self.range + 1
+        return self.coverage_index.footprint_mask((router_coords[0], router_coords[1])).reshape(side, side)
+
+    def _counts_window(self, router_coords, size) -> np.array:
+        """
+        Args:
+            router_coords (list): the coordinate of the router
+            size (int): the distance from the router of the border of the window
+
+        Returns:
+            np.array: the view of the coverage counts of the square of side 2 size + 1 centered on the router
+        """
+        row = router_coords[0] + self.padding
+        column = router_coords[1] + self.padding
+        return self._padded_counts[row - size:row + size + 1, column - size:column + size + 1]
+
+    def _add_coverage(self, router_coords, increment):
+        """adds increment to the coverage counts of the cells covered by the router
+
+        Args:
+            router_coords (list): the coordinate of the router
+            increment (int): 1 when placing the router, -1 when removing it
+        """
+        self._counts_window(router_coords, self.range)[self._footprint_window(router_coords)] += increment
+
     def calc_cost(self, new_pos, decreased) -> int:
         """calculate the improvement by moveing a router into new_pos
 
@@ -315,48 +346,81 @@ class Search:
         Returns:
             int: improvement in term of coverage
         """
-        new_pos_coverage = self.get_router_coverage(new_pos)
-        increase = 0
-        for new_cov in new_pos_coverage:
-            # assert(self.covered_dict[new_cov] >= 0)
-            if (new_cov not in self.covered_dict or
-                self.covered_dict[new_cov] == 0):
-                increase += 1
-        return increase - decreased
-    
+        counts = self._counts_window(new_pos, self.range)
+        increase = np.count_nonzero(counts[self._footprint_window(new_pos)] == 0)
+        return int(increase) - decreased
+
+    def move_cost(self, router, actions) -> list:
+        """calculate the improvement of moving the router with each action, looking up only the cells
+        in the symmetric difference of the old and the new footprint:
+        - the cells entering the coverage are gained if no other router covers them
+        - the cells leaving the coverage are lost if the router is the only one covering them
+
+        Args:
+            router (list): the coordinate of the router
+            actions (list): the actions to evaluate, the moves must keep the router inside the building
+
+        Returns:
+            list: the improvement in term of coverage of each action
+        """
+        r = self.range
+        side = 2 * r + 1
+        counts = self._counts_window(router, r + 1)
+        old_window = np.zeros(shape=(side + 2, side + 2), dtype=bool)
+        old_window[1:-1, 1:-1] = self._footprint_window(router)
+
+        improvements = []
+        for action in actions:
+            dx, dy = action.value
+            if dx == 0 and dy == 0:
+                improvements.append(0)
+                continue
+            new_window = np.zeros(shape=(side + 2, side + 2), dtype=bool)
+            new_window[1 + dx:1 + dx + side, 1 + dy:1 + dy + side] = self._footprint_window(
+                (router[0] + dx, router[1] + dy)
+            )
+            entering = new_window & ~old_window
+            leaving = old_window & ~new_window
+            improvements.append(
+                int(np.count_nonzero(counts[entering] == 0)) - int(np.count_nonzero(counts[leaving] == 1))
+            )
+        return improvements
+
+    def _valid_actions(self, router) -> list:
+        """
+        Args:
+            router (list): the coordinate of the router
+
+        Returns:
+            list: the actions that keep the router inside the building
+        """
+        boundary = self.map_mask.shape
+        return [
+            action for action in Action
+            if 0 <= router[0] + action.value[0] < boundary[0] and 0 <= router[1] + action.value[1] < boundary[1]
+        ]
+
     def update(self, moveset):
         """update the state by moving the router
         updates: 
         - the map mask of router
-        - coverage dictionary
+        - coverage counts
         
         Args:
             moveset (tuple): a triplet containing the router index, action and improving score (the last one not used in this function)
         """
         if len(moveset) != 3:
             return
-        # print("router:{}, action:{}, improvement:{}".format(moveset[0], moveset[1], moveset[2]))
         router = self.router_list[moveset[0]]
         action = moveset[1]
         if action is not Action.ADD:
             self.map_mask[router[0], router[1]] = 0
             # -1 for all cell in the old position
-            old_pos_coverage = self.get_router_coverage(router)
-            for old_cov in old_pos_coverage:
-                self.covered_dict[old_cov] -= 1
-            
-            # update for the new position
-            # print("updating dict:")
+            self._add_coverage(router, -1)
             move(router, action)
         self.map_mask[router[0], router[1]] = 1
-        new_pos_coverage = self.get_router_coverage(router)
-        for new_cov in new_pos_coverage:
-            # print(new_cov)
-            if new_cov not in self.covered_dict:
-                self.covered_dict[new_cov] = 1
-            else:
-                self.covered_dict[new_cov] += 1
-                
+        self._add_coverage(router, 1)
+
     def do_cached(self):
         """caches the last action done
         in such way we can significantly improve each optimization step in terms of time
@@ -366,40 +430,16 @@ class Search:
             tuple: the triple of <router idx, action, improvement score>
         """
         router_idx = self.cached_move_set[0]
-        action = self.cached_move_set[1]
         router = self.router_list[router_idx]
-        boundary = self.map_mask.shape
         best_improve = 0
         best_move_set = ()
-        start_coord = [router[0], router[1]]
-        self.map_mask[start_coord[0], start_coord[1]] = 0
-        old_pos_coverage = self.get_router_coverage(router)
-        decreased = 0
-        for old_cov in old_pos_coverage:
-            # print("oldcov:{}".format(old_cov))
-            assert old_cov in self.covered_dict, f"covered_dict:{self.covered_dict} \n old_cov:{old_cov}"
-            self.covered_dict[old_cov] -= 1
-            if self.covered_dict[old_cov] == 0:
-                decreased += 1
-        
-        for action in Action:
-            move(router, action)
-            # violating the boundary, should be reset
-            if ((router[0] >= boundary[0] or router[0] < 0) or 
-                (router[1] >= boundary[1] or router[1] < 0)):
-                restore_move(router, action)
-                continue
-            # checking if improved the fitness
-            improvement = self.calc_cost(router, decreased)
-            restore_move(router, action)
+        actions = self._valid_actions(router)
+        for action, improvement in zip(actions, self.move_cost(router, actions)):
             if improvement > best_improve:
                 best_move_set = (router_idx, action, improvement)
                 best_improve = improvement
-        for old_cov in old_pos_coverage:
-                self.covered_dict[old_cov] += 1
-        self.map_mask[start_coord[0], start_coord[1]] = 1
         return best_move_set
-                
+
     def greedy_move(self):
         """the greedy move action, this retuns the first move triplet that improves the coverage
 
@@ -412,43 +452,13 @@ class Search:
             greedy_move_set = self.do_cached()
             if greedy_move_set is not None:
                 return greedy_move_set
-        boundary = self.map_mask.shape
         for i, router in enumerate(self.router_list):
-            # setting up the coverage and mask
-            start_coord = [router[0], router[1]]
-            self.map_mask[start_coord[0], start_coord[1]] = 0
-            old_pos_coverage = self.get_router_coverage(router)
-            decreased = 0
-            for old_cov in old_pos_coverage:
-                assert old_cov in self.covered_dict, f"old_cov:{old_cov}"
-                self.covered_dict[old_cov] -= 1
-                if self.covered_dict[old_cov] == 0:
-                    decreased += 1
-            
-            for action in Action:
-                move(router, action)
-                # violating the boundary, should be reset
-                if ((router[0] >= boundary[0] or router[0] < 0) or 
-                    (router[1] >= boundary[1] or router[1] < 0)):
-                    restore_move(router, action)
-                    continue
-                # checking if improved the fitness
-                improvement = self.calc_cost(router, decreased)
-                restore_move(router, action)
+            actions = self._valid_actions(router)
+            for action, improvement in zip(actions, self.move_cost(router, actions)):
                 if improvement > 0:
-                    greedy_move_set = (i, action, improvement)
-                    self.map_mask[start_coord[0], start_coord[1]] = 1
-                    # self.update(greedy_move_set)
-                    for old_cov in old_pos_coverage:
-                        self.covered_dict[old_cov] += 1
-                    return greedy_move_set
-                
-            # restore of the coverage and mask
-            for old_cov in old_pos_coverage:
-                self.covered_dict[old_cov] += 1
-            self.map_mask[start_coord[0], start_coord[1]] = 1
+                    return (i, action, improvement)
         return greedy_move_set
-    
+
     def best_move(self):
         """the best move action, this retuns the best move triplet that improves the coverage
 
@@ -461,41 +471,15 @@ class Search:
             best_move_set = self.do_cached()
             if len(best_move_set) == 3 :
                 return best_move_set                
-        
-        boundary = self.map_mask.shape
+
         for i, router in enumerate(self.router_list):
-            # setting up the coverage and mask
-            start_coord = [router[0], router[1]]
-            self.map_mask[start_coord[0], start_coord[1]] = 0
-            old_pos_coverage = self.get_router_coverage(router)
-            decreased = 0
-            for old_cov in old_pos_coverage:
-                # print("oldcov:{}".format(old_cov))
-                assert old_cov in self.covered_dict, f"covered_dict:{self.covered_dict} \n old_cov:{old_cov}"
-                self.covered_dict[old_cov] -= 1
-                if self.covered_dict[old_cov] == 0:
-                    decreased += 1
-            
-            for action in Action:
-                move(router, action)
-                # violating the boundary, should be reset
-                if ((router[0] >= boundary[0] or router[0] < 0) or 
-                    (router[1] >= boundary[1] or router[1] < 0)):
-                    restore_move(router, action)
-                    continue
-                # checking if improved the fitness
-                improvement = self.calc_cost(router, decreased)
-                restore_move(router, action)
+            actions = self._valid_actions(router)
+            for action, improvement in zip(actions, self.move_cost(router, actions)):
                 if improvement > best_improve:
                     best_move_set = (i, action, improvement)
                     best_improve = improvement
-                
-            # restore of the coverage and mask
-            for old_cov in old_pos_coverage:
-                self.covered_dict[old_cov] += 1
-            self.map_mask[start_coord[0], start_coord[1]] = 1
         return best_move_set
-    
+
     def add_router(self, patient = 5):
         """tries to add a new router in the map with some patience
         if after patient pass in a row I can't find an improvement
@@ -506,14 +490,7 @@ class Search:
         Returns:
             np.array, int: the coordinate for the new router and how much new points is possibile to cover
         """
-        covered_cells = set([key for key, value in self.covered_dict.items() if value > 0])
-        target_coord = set(self.target_coords)
-        # for i, row in enumerate(self.building_matrix):
-        #     for j, item in enumerate(row):
-        #         if item == '.':
-        #             target_coord.add((i,j))
-        
-        to_cover = target_coord-covered_cells
+        to_cover = set(map(tuple, np.argwhere(self.target_mask & (self.coverage_counts == 0)).tolist()))
         if len(to_cover) == 0:
             return
         # test where placing the router maximizes the coverage
@@ -1,23 +1,44 @@
+import os
 import utils
 import argparse
+import random
+import numpy as np
 import viz
 import backbone
 from classes.Data import Data
+from classes.Placement import Placement
+from classes.FitnessCache import FitnessCache
 from hill_climbing import hill_climb
 from priority_solution import priority
-from genetic_algorithm import genetic_algorithm
+from genetic_algorithm import genetic_algorithm, island_genetic_algorithm, steady_state_genetic_algorithm
+from greedy import greedy
+from anytime import ANYTIME_ALGORITHMS, anytime_solve
+from profiling import enable_profiling
 import matplotlib.pyplot as plt
-from simulated_annealing import simulated_annealing
+from simulated_annealing import simulated_annealing, parallel_simulated_annealing
 
-def main(args):
-	# parsing command line arguments
-    filepath = args.filepath
+def solve(data: Data, args, initial_state: Placement = None):
+    """
+    Runs the algorithm selected in args on the problem instance
+
+    data: the problem instance
+    args: the parsed command line arguments, see get_parser
+    initial_state: the placement the annealing, genetic and priority algorithms start from, by default their
+        usual initial placement (random or grid), it is not used by the other algorithms
+
+    returns: the best configuration found, None if the algorithm does not exist
+    """
     algorithm = args.algorithm
     num_iterations = args.iterations
     scale_factor = args.scale_factor
     verbose = args.verbose
 
-    data = Data(filepath)
+    if args.seed is not None:
+        random.seed(args.seed)
+        np.random.seed(args.seed)
+
+    # the priority solver changes few routers between two evaluations, so its backbone is kept incrementally
+    backbone_tree = backbone.IncrementalBackbone(data.initial_backbone) if algorithm == "priority" else None
 
     fitness_function = lambda routers: utils.compute_fitness(
         building_matrix=building_matrix,
@@ -26,47 +47,109 @@ def main(args):
         backbone_starting_point=data.initial_backbone,
         router_cost=data.router_cost,
         backbone_cost=data.backbone_cost,
-        budget=data.budget
+        budget=data.budget,
+        coverage_index=data.coverage_index,
+        backbone_tree=backbone_tree
     )
+    # the solvers evaluate the same placements again and again (e.g. the children of the genetic algorithm, first
+    # in mutate and then with their population), the values already computed are looked up by the hash of the routers;
+    # the value computed with the incremental backbone depends on the placements evaluated before, it is not cached
+    if args.fitness_cache_size > 0 and backbone_tree is None:
+        fitness_function = FitnessCache(fitness_function, max_size=args.fitness_cache_size)
 
     building_matrix = data.matrix
     router_radius = data.router_range
 
     if algorithm == "genetic":
-        best_configuration = genetic_algorithm(
-            building_matrix=building_matrix,
-            population=[
-                utils.get_grid_router_placement(data=data, rescale_range_factor=0.6),
-                utils.get_grid_router_placement(data=data, rescale_range_factor=0.6)
-            ],
-            data=data,
-            fitness_function=fitness_function,
-            mutation_probability=args.mutation,
-            max_iter=num_iterations,
-            verbose=verbose
-        )
+        population = [
+            initial_state if initial_state is not None else
+            Placement.from_mask(utils.get_grid_router_placement(data=data, rescale_range_factor=0.6))
+        ] + [
+            Placement.from_mask(utils.get_grid_router_placement(data=data, rescale_range_factor=0.6))
+            for _ in range(args.population - 1)
+        ]
+        if args.islands > 1:
+            best_configuration = island_genetic_algorithm(
+                data=data,
+                population=population,
+                mutation_probability=args.mutation,
+                max_iter=num_iterations,
+                islands=args.islands,
+                workers=args.workers if args.workers > 1 else None,
+                migration_interval=args.migration_interval,
+                migrants=args.migrants,
+                crossover=args.crossover,
+                verbose=verbose
+            )
+        elif args.steady_state:
+            best_configuration = steady_state_genetic_algorithm(
+                building_matrix=building_matrix,
+                population=population,
+                data=data,
+                fitness_function=fitness_function,
+                mutation_probability=args.mutation,
+                max_iter=num_iterations,
+                replacements=args.replacements,
+                tournament_size=args.tournament_size,
+                elites=args.elites,
+                max_evaluations=args.max_evaluations,
+                crossover=args.crossover,
+                verbose=verbose
+            )
+        else:
+            best_configuration = genetic_algorithm(
+                building_matrix=building_matrix,
+                population=population,
+                data=data,
+                fitness_function=fitness_function,
+                mutation_probability=args.mutation,
+                max_iter=num_iterations,
+                verbose=verbose,
+                crossover=args.crossover,
+                max_evaluations=args.max_evaluations,
+                # fitness_function is compute_fitness on the instance, the workers can compute it on their own
+                use_fitness_pool=True
+            )
     elif algorithm == "priority":
         best_configuration = priority(
             data = data,
-            initial_state=utils.get_grid_router_placement(data=data, rescale_range_factor=scale_factor),
+            initial_state=initial_state if initial_state is not None else
+                Placement.from_mask(utils.get_grid_router_placement(data=data, rescale_range_factor=scale_factor)),
             fitness_function=fitness_function,
             num_iterations=num_iterations,
             evaluation_delay=args.evaluation_delay,
-            verbose=verbose
+            verbose=verbose,
+            seed=args.seed
         )
     elif algorithm == "annealing":
-        best_configuration = simulated_annealing(
-            initial_state=utils.get_random_router_placement(
+        if initial_state is None:
+            initial_state = Placement.from_mask(utils.get_random_router_placement(
                 building_matrix=building_matrix,
                 number_routers= int(1.2 * utils.min_routers_optimal_condition(data=data))
-            ),
-            number_iterations=num_iterations,
-            initial_temperature=args.temperature,
-            building_matrix=building_matrix,
-            fitness_function=fitness_function,
-            sigma=router_radius,
-            verbose=verbose
-        )
+            ))
+        if args.workers > 1 or args.replicas > 1:
+            best_configuration = parallel_simulated_annealing(
+                data=data,
+                initial_state=initial_state,
+                number_iterations=num_iterations,
+                initial_temperature=args.temperature,
+                workers=args.workers,
+                replicas=args.replicas,
+                exchange_interval=args.exchange_interval,
+                verbose=verbose
+            )
+        else:
+            best_configuration = simulated_annealing(
+                initial_state=initial_state,
+                number_iterations=num_iterations,
+                initial_temperature=args.temperature,
+                building_matrix=building_matrix,
+                fitness_function=fitness_function,
+                sigma=router_radius,
+                verbose=verbose,
+                data=data,
+                seed=args.seed
+            )
     elif algorithm == "hill":
         best_configuration = hill_climb(
             data=data,
@@ -76,16 +159,41 @@ def main(args):
             policy="best" if args.best_policy else "",
             verbose=verbose
         )
+    elif algorithm == "greedy":
+        best_configuration = greedy(data=data, verbose=verbose)
     else:
+        return None
+
+    if verbose and isinstance(fitness_function, FitnessCache) and fitness_function.hits + fitness_function.misses > 0:
+        print(fitness_function.stats())
+
+    return best_configuration
+
+
+def main(args):
+	# parsing command line arguments
+    cache_dir = None
+    if not args.no_cache:
+        cache_dir = args.cache_dir if args.cache_dir is not None else os.path.join(os.path.dirname(args.filepath), ".cache")
+    data = Data(args.filepath, cache_dir=cache_dir)
+    building_matrix = data.matrix
+    router_radius = data.router_range
+
+    if args.time_limit is not None or args.resume is not None:
+        best_configuration = anytime_solve(data, args, solve)
+    else:
+        best_configuration = solve(data, args)
+    if best_configuration is None:
         return
 
-    g = backbone.get_backbone_graph(
+    backbone_cells = backbone.get_steiner_tree(
         data.initial_backbone,
-        best_configuration,
+        np.transpose(np.nonzero(best_configuration)),
+        building_matrix.shape,
         data.backbone_cost
     )
 
-    print(f"coverage = {utils.get_number_covered_cells(best_configuration, data.matrix, data.router_range)/data.target_area}")
+    print(f"coverage = {utils.get_number_covered_cells(best_configuration, data.matrix, data.router_range, data.coverage_index)/data.target_area}")
     print("total score", utils.compute_fitness(
         building_matrix=building_matrix,
         routers_placement=best_configuration,
@@ -93,20 +201,22 @@ def main(args):
         backbone_starting_point=data.initial_backbone,
         router_cost=data.router_cost,
         backbone_cost=data.backbone_cost,
-        budget=data.budget
+        budget=data.budget,
+        coverage_index=data.coverage_index
     ) )
 
     viz.plot_complete(
         building_matrix,
         best_configuration,
         router_radius,
-        [_ for _ in g.nodes()],
-        data.initial_backbone
+        [tuple(cell) for cell in backbone_cells],
+        data.initial_backbone,
+        data.coverage_index
     )
     plt.show()
 
 def check_args(args) -> bool:
-	if args.algorithm not in ["hill", "annealing", "genetic", "priority"]:
+	if args.algorithm not in ["hill", "annealing", "genetic", "priority", "greedy"]:
 		print("The selected algorithm does not exist!")
 		return False
 
@@ -118,6 +228,30 @@ def check_args(args) -> bool:
 		print("Mutation probability must be a float number between 0.0 and 1.0")
 		return False
 
+	if args.population <= 0:
+		print("Population size must be a positive value")
+		return False
+
+	if args.replacements <= 0 or args.tournament_size <= 0 or args.elites < 0:
+		print("Number of replacements and tournament size must be positive values, number of elites non negative")
+		return False
+
+	if args.steady_state and args.elites >= args.population:
+		print("Number of elites must be lower than the population size")
+		return False
+
+	if args.max_evaluations is not None and args.max_evaluations <= 0:
+		print("Maximum number of evaluations must be a positive value")
+		return False
+
+	if args.steady_state and args.islands > 1:
+		print("The steady-state genetic algorithm cannot run on islands")
+		return False
+
+	if args.islands <= 0 or args.migration_interval <= 0 or args.migrants < 0:
+		print("Number of islands and migration interval must be positive values, number of migrants non negative")
+		return False
+
 	if args.temperature <= 0:
 		print("Temperature must be a positive value")
 		return False
@@ -134,14 +268,38 @@ def check_args(args) -> bool:
 		print("Maximum number of non improvement steps must be a positive value")
 		return False
 
+	if args.fitness_cache_size < 0:
+		print("Fitness cache size must be a non negative value")
+		return False
+
+	if args.workers <= 0 or args.replicas <= 0:
+		print("Number of workers and replicas must be positive values")
+		return False
+
+	if args.exchange_interval < 0:
+		print("Exchange interval must be a non negative value")
+		return False
+
+	if args.time_limit is not None and args.time_limit <= 0:
+		print("Time limit must be a positive value")
+		return False
+
+	if args.checkpoint_interval <= 0:
+		print("Checkpoint interval must be a positive value")
+		return False
+
+	if (args.time_limit is not None or args.resume is not None) and args.algorithm not in ANYTIME_ALGORITHMS:
+		print(f"Only the algorithms {ANYTIME_ALGORITHMS} can run with a time limit or be resumed")
+		return False
+
 	return True
 
-if __name__  == "__main__":
+def get_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser()
     parser.add_argument("filepath", help="Path to the dataset to use")
     parser.add_argument(
         "algorithm",
-        help="Algorithm to use for solving the problem; the possible algorithms are {genetic, priority, annealing, hill}"
+        help="Algorithm to use for solving the problem; the possible algorithms are {genetic, priority, annealing, hill, greedy}"
     )
     parser.add_argument(
         "-i",
@@ -160,6 +318,90 @@ if __name__  == "__main__":
         type=float,
         default=0.5
     )
+    parser.add_argument(
+        "--population",
+        help="""Number of individuals of the population of the genetic algorithm;
+            This parameter is a positive value and is useful only for the {genetic} algorithm
+            """,
+        type=int,
+        default=2
+    )
+    parser.add_argument(
+        "--steady_state",
+        help="""Run the steady-state genetic algorithm: at each iteration a few children, bred from parents chosen by
+            tournament selection, replace the worst individuals of the population;
+            This parameter is useful only for the {genetic} algorithm
+            """,
+        action="store_true"
+    )
+    parser.add_argument(
+        "--replacements",
+        help="""Number of children bred at each iteration of the steady-state genetic algorithm;
+            This parameter is a positive value and is useful only for the {genetic} algorithm
+            """,
+        type=int,
+        default=2
+    )
+    parser.add_argument(
+        "--tournament_size",
+        help="""Number of individuals taking part in each tournament of the steady-state genetic algorithm;
+            This parameter is a positive value and is useful only for the {genetic} algorithm
+            """,
+        type=int,
+        default=3
+    )
+    parser.add_argument(
+        "--elites",
+        help="""Number of best individuals never replaced by the steady-state genetic algorithm;
+            This parameter is a non negative value and is useful only for the {genetic} algorithm
+            """,
+        type=int,
+        default=1
+    )
+    parser.add_argument(
+        "--max_evaluations",
+        help="""Maximum number of fitness evaluations of the genetic algorithm, to compare runs at the same number of
+            evaluations; by default there is no limit;
+            This parameter is a positive value and is useful only for the {genetic} algorithm
+            """,
+        type=int,
+        default=None
+    )
+    parser.add_argument(
+        "--islands",
+        help="""Number of islands of the genetic algorithm, each one evolving its own population in a worker process
+            and sending its best individuals to the next one along a ring (the island model);
+            This parameter is a positive value and is useful only for the {genetic} algorithm
+            """,
+        type=int,
+        default=1
+    )
+    parser.add_argument(
+        "--migration_interval",
+        help="""Number of generations between two migrations of the island model;
+            This parameter is a positive value and is useful only for the {genetic} algorithm
+            """,
+        type=int,
+        default=5
+    )
+    parser.add_argument(
+        "--migrants",
+        help="""Number of individuals sent by each island to the next one at each migration;
+            This parameter is a non negative value and is useful only for the {genetic} algorithm
+            """,
+        type=int,
+        default=1
+    )
+    parser.add_argument(
+        "--crossover",
+        help="""Crossover operator of the genetic algorithm: the child takes the routers of a parent in the quadrants
+            of the building, in a random rectangle or in random Voronoi regions, and the ones of the other parent
+            elsewhere;
+            This parameter is useful only for the {genetic} algorithm
+            """,
+        choices=["quadrants", "rectangle", "voronoi"],
+        default="quadrants"
+    )
     parser.add_argument(
         "-t",
         "--temperature",
@@ -211,9 +453,106 @@ if __name__  == "__main__":
         type=float, 
         default=0.7
     )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        help="""Number of processes running the replicas, or the islands (by default one process per island);
+                This parameter is a positive value and is useful only for the {annealing, genetic} algorithms
+                """,
+        type=int,
+        default=1
+    )
+    parser.add_argument(
+        "--replicas",
+        help="""Number of chains exchanging their states (parallel tempering);
+                This parameter is a positive value and is useful only for the {annealing} algorithm
+                """,
+        type=int,
+        default=1
+    )
+    parser.add_argument(
+        "--exchange_interval",
+        help="""Number of iterations between two exchanges of states between the replicas; 0 runs independent chains,
+                each one with the temperature schedule of the annealing;
+                This parameter is a non negative value and is useful only for the {annealing} algorithm
+                """,
+        type=int,
+        default=1000
+    )
+    parser.add_argument(
+        "--fitness_cache_size",
+        help="""Maximum number of fitness values cached, the least recently used ones are evicted; 0 disables the cache.
+                The fitness of the priority solver, which keeps its backbone incrementally, is never cached
+                """,
+        type=int,
+        default=65536
+    )
+    parser.add_argument(
+        "--seed",
+        help="""Seed of the random generators, to make a run reproducible
+                """,
+        type=int,
+        default=None
+    )
+    parser.add_argument(
+        "--time_limit",
+        "--time-limit",
+        help="""Run the algorithm in rounds, each one starting from the placement found by the previous one, until
+                this number of seconds has passed, keeping the best placement found (the anytime mode);
+                This parameter is useful only for the {hill, annealing, genetic, priority} algorithms
+                """,
+        type=float,
+        default=None
+    )
+    parser.add_argument(
+        "--checkpoint",
+        help="""Path of the checkpoint of the anytime mode, storing the best placement found and the state of the run
+                """,
+        default=None
+    )
+    parser.add_argument(
+        "--checkpoint_interval",
+        help="""How often (in seconds) the checkpoint is written in the anytime mode, it is written anyway at the end
+                and when the run is interrupted
+                """,
+        type=float,
+        default=60
+    )
+    parser.add_argument(
+        "--resume",
+        help="""Path of a checkpoint to resume the anytime mode from, it is also the checkpoint of the resumed run if
+                --checkpoint is not given
+                """,
+        default=None
+    )
+    parser.add_argument(
+        "--cache_dir",
+        help="""Directory of the cache of the artifacts precomputed from the building (e.g. the router footprints);
+                by default it is the .cache directory next to the dataset
+                """,
+        default=None
+    )
+    parser.add_argument("--no_cache", help="Compute the artifacts of the building without reading or writing the cache", action="store_true")
+    parser.add_argument(
+        "--profile",
+        help="""Time the hot paths (coverage, fitness, backbone, hill climbing moves, process pool) and print the
+                number of calls and the time spent in each one at exit
+                """,
+        action="store_true"
+    )
+    parser.add_argument(
+        "--profile_trace",
+        help="""Path of the JSON trace of every call timed by --profile, in the Chrome trace event format
+                """,
+        default=None
+    )
     parser.add_argument("--verbose", help="increase output verbosity", action="store_true")
+    return parser
 
-    args = parser.parse_args()
+if __name__  == "__main__":
+    args = get_parser().parse_args()
 
     if check_args(args):
+        if args.profile or args.profile_trace is not None:
+            enable_profiling(trace_path=args.profile_trace)
         main(args)
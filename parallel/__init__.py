@@ -0,0 +1,2 @@
+from .shared import *
+from .pool import *
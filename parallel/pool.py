@@ -0,0 +1,71 @@
+import math
+import os
+import numpy as np
+import utils
+from concurrent.futures import ProcessPoolExecutor
+from classes.Data import Data
+from parallel.shared import SharedData
+
+__all__ = ["FitnessPool"]
+
+
+_data = None
+
+def worker_init(shared_data: SharedData):
+	global _data
+	_data = shared_data.attach()
+
+
+def evaluate_batch(population: list) -> list:
+	"""
+	:param population: list of arrays of shape (n, 2), the coordinates of the routers of each placement
+	:return: list of tuples, the fitness of each placement, as returned by utils.compute_fitness
+	"""
+	return utils.compute_population_fitness(
+		building_matrix=_data.matrix,
+		population=population,
+		router_range=_data.router_range,
+		backbone_starting_point=_data.initial_backbone,
+		router_cost=_data.router_cost,
+		backbone_cost=_data.backbone_cost,
+		budget=_data.budget,
+		coverage_index=_data.coverage_index
+	)
+
+
+class FitnessPool:
+	"""
+	Persistent pool of processes computing the fitness of routers placements.
+
+	The workers attach once, when they start, to the building and to its coverage index in shared memory; after
+	that each task carries only the coordinates of the routers of the placements. A population is split in one
+	batch per worker, so the cost of a task is paid once per batch, and each worker evaluates its batch with
+	utils.compute_population_fitness.
+	"""
+	def __init__(self, data: Data, workers: int = None):
+		"""
+		:param data: Data, the problem instance
+		:param workers: int, the number of processes, by default the number of processors
+		"""
+		self.workers = workers if workers is not None else os.cpu_count() or 1
+		self.shared_data = SharedData(data)
+		self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=worker_init, initargs=(self.shared_data,))
+
+	def evaluate(self, population: list) -> list:
+		"""
+		:param population: list of arrays of shape (n, 2), the coordinates of the routers of each placement
+		:return: list of tuples, the fitness of each placement
+		"""
+		batch_size = max(1, math.ceil(len(population) / self.workers))
+		batches = [population[i:i + batch_size] for i in range(0, len(population), batch_size)]
+		return [fitness for batch in self.executor.map(evaluate_batch, batches) for fitness in batch]
+
+	def close(self):
+		self.executor.shutdown()
+		self.shared_data.unlink()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.close()
@@ -0,0 +1,107 @@
+import copy
+import numpy as np
+from multiprocessing import shared_memory
+from classes.Data import Data
+from classes.CoverageIndex import CoverageIndex
+
+__all__ = ["SharedArray", "SharedData"]
+
+
+class SharedArray:
+	"""
+	A numpy array stored in a block of shared memory.
+
+	The object is a small picklable handle (name, shape and dtype of the block): the process creating it owns the
+	block and has to call unlink() when done, while the other processes call attach() to get a view of the array
+	without copying it.
+	"""
+	def __init__(self, array: np.array):
+		"""
+		Copies the array in a new block of shared memory
+
+		:param array: the array to share
+		"""
+		self.shape = array.shape
+		self.dtype = array.dtype
+		self._shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+		self.name = self._shm.name
+		np.ndarray(self.shape, dtype=self.dtype, buffer=self._shm.buf)[...] = array
+
+	def __getstate__(self) -> dict:
+		state = self.__dict__.copy()
+		state["_shm"] = None
+		return state
+
+	def attach(self) -> np.array:
+		"""
+		:return: a read-only view of the shared array
+		"""
+		if self._shm is None:
+			self._shm = shared_memory.SharedMemory(name=self.name)
+		array = np.ndarray(self.shape, dtype=self.dtype, buffer=self._shm.buf)
+		array.flags.writeable = False
+		return array
+
+	def unlink(self):
+		"""
+		Releases the block of shared memory, to be called by the owner once the other processes are done
+		"""
+		self._shm.close()
+		self._shm.unlink()
+
+
+class SharedData:
+	"""
+	A Data instance whose building grid and coverage index live in shared memory.
+
+	The uint8 grid is shared together with the arrays of the coverage index (built by the owner if
+	needed), so pickling the object sends to the workers only the parameters of the problem and the handles of
+	the arrays; attach() rebuilds the Data instance inside a worker.
+	"""
+	def __init__(self, data: Data, share_coverage_index: bool = True):
+		"""
+		:param data: Data, the problem instance
+		:param share_coverage_index: bool, if True the coverage index of data is shared too
+		"""
+		self.grid = SharedArray(data.matrix)
+
+		self.coverage_index = None
+		if share_coverage_index:
+			coverage_index = data.coverage_index
+			self.coverage_index = {
+				"wall_prefix_sum": SharedArray(coverage_index.wall_prefix_sum),
+				"offsets": SharedArray(coverage_index.offsets),
+				"footprints": SharedArray(coverage_index.footprints)
+			}
+
+		# everything but the arrays is sent along with the handles
+		self.header = copy.copy(data)
+		self.header.matrix = None
+		self.header.building_matrix = None
+		self.header.target_mask = None
+		self.header.wall_mask = None
+		self.header.void_mask = None
+		self.header.coverage_mask = None
+		self.header._coverage_index = None
+
+	def attach(self) -> Data:
+		"""
+		:return: a Data instance backed by the shared arrays
+		"""
+		data = copy.copy(self.header)
+		data.set_grid(self.grid.attach())
+		data.coverage_mask = np.full(data.matrix.shape, False, dtype=bool)
+
+		if self.coverage_index is not None:
+			data._coverage_index = CoverageIndex.from_arrays(
+				router_range=data.router_range,
+				**{name: shared_array.attach() for name, shared_array in self.coverage_index.items()}
+			)
+
+		return data
+
+	def unlink(self):
+		self.grid.unlink()
+		if self.coverage_index is not None:
+			for shared_array in self.coverage_index.values():
+				shared_array.unlink()
@@ -7,7 +7,8 @@ def priority(
 	fitness_function,
 	num_iterations: int,
 	evaluation_delay: int,
-	verbose:bool = True
+	verbose:bool = True,
+	seed: int = None
 ):
 	return PrioritySolution(
 		data=data,
@@ -16,5 +17,6 @@ def priority(
 		verbose=verbose
 	).run(
 		num_iterations=num_iterations,
-		evaluation_delay=evaluation_delay
+		evaluation_delay=evaluation_delay,
+		seed=seed
 	)
\ No newline at end of file
@@ -0,0 +1,169 @@
+import atexit
+import functools
+import importlib
+import json
+import os
+import sys
+import time
+
+__all__ = ["HOT_PATHS", "Profiler", "enable_profiling"]
+
+# the functions timed by --profile, as (module, qualified name): the coverage filtering and evaluation, the
+# backbone (built from scratch or kept incrementally), the incremental evaluation of the moves of annealing and
+# greedy, the local moves of hill climbing and the process pool of the genetic algorithm (its spin-up and the
+# evaluation of a generation, pickling and waiting for the workers included)
+HOT_PATHS = [
+	("utils", "filter_non_target_points"),
+	("utils", "filter_visible_points"),
+	("utils", "get_number_covered_cells"),
+	("utils", "get_coverage_counts"),
+	("utils", "compute_fitness"),
+	("classes.Visibility", "Visibility.visible_window"),
+	("classes.Visibility", "Visibility.footprint"),
+	("classes.Visibility", "Visibility.is_visible"),
+	("classes.Visibility", "Visibility.filter_non_target_points"),
+	("backbone.get_backbone_graph", "get_backbone_length"),
+	("backbone.steiner", "get_steiner_length"),
+	("backbone.steiner", "get_steiner_tree"),
+	("backbone.grid_graph_tree", "get_grid_graph_tree"),
+	("backbone.incremental", "IncrementalBackbone.add"),
+	("backbone.incremental", "IncrementalBackbone.update"),
+	("backbone.incremental", "IncrementalBackbone.delta_add"),
+	("classes.FitnessState", "FitnessState.delta_add"),
+	("classes.FitnessState", "FitnessState.delta_remove"),
+	("classes.FitnessState", "FitnessState.delta_move"),
+	("classes.FitnessState", "FitnessState.apply"),
+	("hill_climbing.search", "Search.calc_cost"),
+	("hill_climbing.search", "Search.move_cost"),
+	("parallel.pool", "FitnessPool.__init__"),
+	("parallel.pool", "FitnessPool.evaluate")
+]
+
+
+class Profiler:
+	"""
+	Counts the calls and measures the wall time of a set of functions, replacing them with timed wrappers.
+
+	The functions are replaced only when they are instrumented, in their module, in every loaded module that
+	imported them by name and, for methods, in their class: a run without profiling calls the original functions
+	and pays nothing. The times are inclusive, e.g. the time of compute_fitness includes the one of
+	get_number_covered_cells; the calls made inside worker processes are not seen.
+
+	Attributes:
+
+	stats: dict, for each function its number of calls and its total time in nanoseconds
+	events: list of the calls (name, start and duration in nanoseconds), only if the trace is recorded, else None
+	"""
+	def __init__(self, trace: bool = False):
+		"""
+		:param trace: bool, if True every call is recorded, to be dumped with dump_trace
+		"""
+		self.stats = {}
+		self.events = [] if trace else None
+		self._start = time.perf_counter_ns()
+		self._originals = []
+
+	def wrap(self, name: str, function):
+		"""
+		:return: the timed wrapper of function, recorded as name
+		"""
+		stats = self.stats.setdefault(name, [0, 0])
+		events = self.events
+		perf_counter_ns = time.perf_counter_ns
+
+		@functools.wraps(function)
+		def wrapper(*args, **kwargs):
+			start = perf_counter_ns()
+			try:
+				return function(*args, **kwargs)
+			finally:
+				duration = perf_counter_ns() - start
+				stats[0] += 1
+				stats[1] += duration
+				if events is not None:
+					events.append((name, start, duration))
+
+		return wrapper
+
+	def instrument(self, module_name: str, qualified_name: str):
+		"""
+		Replaces a function, or a method, with its timed wrapper
+
+		:param module_name: str, the module defining the function
+		:param qualified_name: str, the name of the function, "Class.method" for a method
+		"""
+		module = importlib.import_module(module_name)
+		if "." in qualified_name:
+			class_name, method_name = qualified_name.split(".")
+			owner = getattr(module, class_name)
+			original = owner.__dict__[method_name]
+			setattr(owner, method_name, self.wrap(qualified_name, original))
+			self._originals.append((owner, method_name, original))
+			return
+
+		original = getattr(module, qualified_name)
+		wrapper = self.wrap(qualified_name, original)
+		# the modules importing the function by name keep their own reference to it
+		for loaded_module in list(sys.modules.values()):
+			if loaded_module is not None and vars(loaded_module).get(qualified_name) is original:
+				setattr(loaded_module, qualified_name, wrapper)
+				self._originals.append((loaded_module, qualified_name, original))
+
+	def uninstall(self):
+		"""
+		Restores the original functions
+		"""
+		for owner, name, original in reversed(self._originals):
+			setattr(owner, name, original)
+		self._originals = []
+
+	def report(self) -> str:
+		"""
+		:return: str, the table of the number of calls, total and mean time of each function, by total time
+		"""
+		wall_time = (time.perf_counter_ns() - self._start) / 1e9
+		lines = [f"{'function':<32}{'calls':>10}{'total (s)':>12}{'mean (ms)':>12}{'% wall':>8}"]
+		for name, (calls, total) in sorted(self.stats.items(), key=lambda item: -item[1][1]):
+			if calls == 0:
+				continue
+			lines.append(
+				f"{name:<32}{calls:>10}{total / 1e9:>12.3f}{total / calls / 1e6:>12.3f}"
+				f"{100 * total / 1e9 / max(wall_time, 1e-9):>7.1f}%"
+			)
+		lines.append(f"wall time: {wall_time:.3f}s")
+		return "\n".join(lines)
+
+	def dump_trace(self, path: str):
+		"""
+		Writes the recorded calls in the Chrome trace event format, to be opened with chrome://tracing or Perfetto
+		"""
+		pid = os.getpid()
+		with open(path, "w") as f:
+			json.dump({
+				"traceEvents": [
+					{"name": name, "ph": "X", "ts": (start - self._start) / 1e3, "dur": duration / 1e3, "pid": pid, "tid": 0}
+					for name, start, duration in self.events
+				],
+				"displayTimeUnit": "ms"
+			}, f)
+
+
+def enable_profiling(trace_path: str = None, hot_paths: list = None) -> Profiler:
+	"""
+	Instruments the hot paths and prints their table at exit, dumping the trace if trace_path is given
+
+	:param trace_path: str, the path of the JSON trace, optional
+	:param hot_paths: list of (module, qualified name), the functions to instrument, HOT_PATHS by default
+	:return: the profiler
+	"""
+	profiler = Profiler(trace=trace_path is not None)
+	for module_name, qualified_name in hot_paths if hot_paths is not None else HOT_PATHS:
+		profiler.instrument(module_name, qualified_name)
+
+	def at_exit():
+		print(profiler.report(), file=sys.stderr)
+		if trace_path is not None:
+			profiler.dump_trace(trace_path)
+
+	atexit.register(at_exit)
+	return profiler
@@ -1 +1,2 @@
-from .simulated_annealing import simulated_annealing
\ No newline at end of file
+from .simulated_annealing import simulated_annealing
+from .parallel import parallel_simulated_annealing
@@ -0,0 +1,235 @@
+import math
+import random as rm
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from classes import Data, FitnessState
+from classes.Placement import Placement
+from parallel import SharedData
+from simulated_annealing.simulated_annealing import anneal
+
+__all__ = ["parallel_simulated_annealing"]
+
+
+_data = None
+_target_coords = None
+# the states of the replicas living in the worker, by replica index
+_states = {}
+
+def worker_init(shared_data: SharedData):
+    global _data, _target_coords
+    _data = shared_data.attach()
+    _target_coords = np.nonzero(_data.target_mask)
+
+
+def get_routers_coords(fitness_state : FitnessState) -> np.array:
+    """
+    returns: array of shape (n, 2), the coordinates of the routers of the state
+    """
+    return np.array(fitness_state.routers, dtype=np.int64).reshape(-1, 2)
+
+
+def run_chain(
+        routers_coords : np.array,
+        initial_temperature : float,
+        temperature_decay : float,
+        number_iterations : int,
+        seed : int
+    ) -> tuple:
+    """
+    Runs a chain of simulated annealing inside a worker
+
+    routers_coords: array of shape (n, 2), the coordinates of the routers of the starting state
+    seed: the seed of the random generator of the chain
+
+    returns: a tuple (routers coordinates, score) of the final state
+    """
+    rm.seed(seed)
+    fitness_state = anneal(
+        fitness_state=FitnessState.from_routers(_data, routers_coords),
+        target_coords=_target_coords,
+        number_iterations=number_iterations,
+        initial_temperature=initial_temperature,
+        temperature_decay=temperature_decay
+    )
+    return get_routers_coords(fitness_state), fitness_state.score
+
+
+def run_replica(
+        replica : int,
+        routers_coords : np.array,
+        temperature : float,
+        number_iterations : int,
+        seed : int
+    ) -> int:
+    """
+    Runs a replica at a fixed temperature inside its worker, where its FitnessState stays between the rounds
+
+    replica: the index of the replica
+    routers_coords: the coordinates of the routers of the starting state, to build the state in the first round,
+        None to go on from the state of the previous round
+    seed: the seed of the random generator of the round
+
+    returns: the score of the state at the end of the round
+    """
+    rm.seed(seed)
+    if routers_coords is not None:
+        _states[replica] = FitnessState.from_routers(_data, routers_coords)
+
+    fitness_state = anneal(
+        fitness_state=_states[replica],
+        target_coords=_target_coords,
+        number_iterations=number_iterations,
+        initial_temperature=temperature,
+        temperature_decay=0
+    )
+    return fitness_state.score
+
+
+def get_replica_routers(replica : int) -> np.array:
+    """
+    returns: array of shape (n, 2), the coordinates of the routers of the current state of a replica of the worker
+    """
+    return get_routers_coords(_states[replica])
+
+
+def get_temperature_ladder(initial_temperature : float, replicas : int) -> list:
+    """
+    returns: the temperatures of the replicas, decreasing geometrically from initial_temperature to 1
+    """
+    if replicas == 1:
+        return [initial_temperature]
+    ratio = (1 / initial_temperature) ** (1 / (replicas - 1))
+    return [initial_temperature * ratio ** r for r in range(replicas)]
+
+
+def parallel_simulated_annealing(
+        data : Data,
+        initial_state : np.array,
+        number_iterations : int,
+        initial_temperature : float,
+        workers : int,
+        replicas : int,
+        exchange_interval : int = 1000,
+        verbose=True
+    ) -> np.array:
+
+    """" simulated annealing with many chains running in a pool of processes
+
+    The building matrix is put in shared memory, so the workers attach to it instead of receiving a copy, and only
+    the coordinates of the routers travel between the processes.
+
+    If exchange_interval is 0 the replicas are independent chains, each one following the linear temperature
+    schedule of simulated_annealing. Otherwise the replicas run at fixed temperatures, spaced geometrically from
+    initial_temperature to 1, for exchange_interval iterations at a time; after each round the states of adjacent
+    temperatures are swapped with the replica exchange (parallel tempering) acceptance rule. Each replica lives in
+    a worker of its own for the whole run, where its FitnessState (backbone tree included) is kept between the
+    rounds: the exchanges swap the temperatures of the replicas instead of their states, so only the temperatures
+    and the scores travel, and the routers of a replica only when it finds the best state.
+
+    data: the problem instance
+    initial_state: the starting configuration, shared by all the replicas
+    number_iterations: the number of iterations of each replica
+    initial_temperature: the starting temperature (the highest one of the ladder)
+    workers: the number of processes
+    replicas: the number of chains
+    exchange_interval: the number of iterations between two exchanges, 0 for independent chains
+
+    returns: the best configuration found, as a Placement if initial_state is a Placement, otherwise as a np.array
+    """
+    routers_coords = np.transpose(np.nonzero(initial_state))
+    shared_data = SharedData(data)
+
+    try:
+        if exchange_interval <= 0:
+            with ProcessPoolExecutor(max_workers=workers, initializer=worker_init, initargs=(shared_data,)) as executor:
+                results = list(executor.map(
+                    run_chain,
+                    [routers_coords] * replicas,
+                    [initial_temperature] * replicas,
+                    [1] * replicas,
+                    [number_iterations] * replicas,
+                    [rm.getrandbits(32) for _ in range(replicas)]
+                ))
+            best_routers, best_score = max(results, key=lambda result: result[1])
+            if verbose:
+                print(f"replicas scores: {[score for _, score in results]}")
+        else:
+            best_routers, best_score = _replica_exchange(
+                shared_data, routers_coords, number_iterations, initial_temperature, workers, replicas,
+                exchange_interval, verbose
+            )
+    finally:
+        shared_data.unlink()
+
+    if isinstance(initial_state, Placement):
+        return Placement(data.matrix.shape, best_routers)
+
+    best_state = np.zeros(shape=data.matrix.shape)
+    best_state[best_routers[:, 0], best_routers[:, 1]] = 1
+    return best_state
+
+
+def _replica_exchange(
+        shared_data : SharedData,
+        routers_coords : np.array,
+        number_iterations : int,
+        initial_temperature : float,
+        workers : int,
+        replicas : int,
+        exchange_interval : int,
+        verbose : bool
+    ) -> tuple:
+    """
+    The rounds of parallel_simulated_annealing with replica exchange: every worker is a process of its own, and
+    the replica r always runs in the worker r % workers
+
+    returns: a tuple (routers coordinates, score) of the best state found
+    """
+    executors = [
+        ProcessPoolExecutor(max_workers=1, initializer=worker_init, initargs=(shared_data,))
+        for _ in range(min(workers, replicas))
+    ]
+    ladder = get_temperature_ladder(initial_temperature, replicas)
+    # the replica at each temperature of the ladder
+    replica_at = list(range(replicas))
+    best_routers, best_score = routers_coords, -math.inf
+
+    try:
+        for round_index in range(math.ceil(number_iterations / exchange_interval)):
+            iterations = min(exchange_interval, number_iterations - round_index * exchange_interval)
+            temperature_of = {replica: ladder[t] for t, replica in enumerate(replica_at)}
+            futures = [
+                executors[replica % len(executors)].submit(
+                    run_replica,
+                    replica,
+                    routers_coords if round_index == 0 else None,
+                    temperature_of[replica],
+                    iterations,
+                    rm.getrandbits(32)
+                )
+                for replica in range(replicas)
+            ]
+            scores = [future.result() for future in futures]
+
+            best = int(np.argmax(scores))
+            if scores[best] > best_score:
+                best_score = scores[best]
+                best_routers = executors[best % len(executors)].submit(get_replica_routers, best).result()
+
+            # swap the replicas of adjacent temperatures, alternating even and odd pairs
+            for t in range(round_index % 2, replicas - 1, 2):
+                score, next_score = scores[replica_at[t]], scores[replica_at[t + 1]]
+                exponent = (next_score - score) * (1 / ladder[t] - 1 / ladder[t + 1])
+                if exponent >= 0 or rm.uniform(0, 1) < math.exp(exponent):
+                    replica_at[t], replica_at[t + 1] = replica_at[t + 1], replica_at[t]
+
+            if verbose:
+                print(
+                    f"ROUND {round_index}, scores by temperature: {[scores[replica] for replica in replica_at]}, "
+                    f"best score: {best_score}"
+                )
+    finally:
+        for executor in executors:
+            executor.shutdown()
+
+    return best_routers, best_score
@@ -1,15 +1,17 @@
 import random as rm
 import numpy as np
-from classes import Data
+from classes import Data, FitnessState
+from classes.Placement import Placement
+from classes.CellType import get_target_mask
 
-__all__ = ["simulated_annealing"]
+__all__ = ["simulated_annealing", "anneal"]
 
 
 def state_neighbor(current_state : np.array, building_matrix : np.array, move_type : str, verbose : bool):
     
     supported_moves = ["add", "remove"]
 
-    new_state = new_state = np.copy(current_state)
+    new_state = current_state.copy() # a dense matrix or a Placement, copying a Placement costs O(routers)
 
     if (move_type not in supported_moves):
         move_type = rm.choice(supported_moves)
@@ -18,22 +20,22 @@ def state_neighbor(current_state : np.array, building_matrix : np.array, move_ty
         print("\t\tnew state type: ", move_type)
 
     if move_type == "add": # add one router
-        target_coords = np.nonzero(building_matrix == ".") #returns a touple of arrays for the row and column coordinates
+        target_coords = np.nonzero(get_target_mask(building_matrix)) #returns a touple of arrays for the row and column coordinates
         if len(target_coords[0]) == 0:
             return current_state
         random_coord = rm.randrange(0, len(target_coords[0]))
         rand_row = target_coords[0][random_coord]
         rand_column = target_coords[1][random_coord]
-        new_state[rand_row][rand_column] = 1
+        new_state[rand_row, rand_column] = 1
 
     elif move_type == "remove": # remove one router
-        router_coords = current_state.nonzero()
+        router_coords = np.nonzero(current_state)
         if len(router_coords[0]) == 0:
             return current_state
         random_coord = rm.randrange(0, len(router_coords[0]))
         rand_row = router_coords[0][random_coord]
         rand_column = router_coords[1][random_coord]
-        new_state[rand_row][rand_column] = 0
+        new_state[rand_row, rand_column] = 0
 
     else:
         pass
@@ -41,6 +43,31 @@ def state_neighbor(current_state : np.array, building_matrix : np.array, move_ty
     return new_state
 
 
+def random_move(fitness_state: FitnessState, target_coords: tuple, move_type: str) -> tuple:
+    """
+    Picks a random move, like state_neighbor, without building the new state
+
+    fitness_state: the incremental evaluation of the current state
+    target_coords: tuple of arrays, the row and column coordinates of the target cells
+    move_type: the type of move, if it is not supported a random one is chosen
+
+    returns: a tuple (move type, cell), cell is None if no move can be done
+    """
+    supported_moves = ["add", "remove"]
+
+    if (move_type not in supported_moves):
+        move_type = rm.choice(supported_moves)
+
+    if move_type == "add": # add one router in a random target cell
+        if len(target_coords[0]) == 0:
+            return move_type, None
+        random_coord = rm.randrange(0, len(target_coords[0]))
+        return move_type, (target_coords[0][random_coord], target_coords[1][random_coord])
+
+    # remove one router
+    return move_type, fitness_state.random_router()
+
+
 def simulated_annealing(
         initial_state : np.array, 
         number_iterations : int, 
@@ -48,22 +75,38 @@ def simulated_annealing(
         building_matrix : np.array, 
         fitness_function,
         sigma,
-        verbose=True
+        verbose=True,
+        data: Data = None,
+        seed: int = None
     ) -> np.array:
 
     """" simulated annealing
 
-    initial_state: rappresentation of the current state of the solution, is a 2D np.array with the same shape of building_matrix, is 1 where there is a router, 0 elsewhere
+    initial_state: rappresentation of the current state of the solution, is a 2D np.array with the same shape of building_matrix, is 1 where there is a router, 0 elsewhere, or a Placement of the routers
     number_iterations : the max number of iterations
     initial_temperature: the starting temperature
     building matrix: the matrix of the buildings
     fitness function: a function that takes as input a matrix representing the state
     sigma: a parameter for the temperature decay
+    data: the problem instance, if given the fitness is evaluated incrementally with a FitnessState, changing
+        one router at a time, and fitness_function is not used
+    seed: the seed of the random generator, by default the run is not reproducible
     
     returns: the final configuration as a np.array
     """
 
-    rm.seed(a=None, version=2)
+    rm.seed(a=seed, version=2)
+
+    if data is not None:
+        return incremental_simulated_annealing(
+            initial_state=initial_state,
+            number_iterations=number_iterations,
+            initial_temperature=initial_temperature,
+            building_matrix=building_matrix,
+            data=data,
+            sigma=sigma,
+            verbose=verbose
+        )
 
     curret_temperature = initial_temperature
     current_state = initial_state
@@ -106,4 +149,86 @@ def simulated_annealing(
         
 
 
-    return current_state
\ No newline at end of file
+    return current_state
+
+
+def anneal(
+        fitness_state : FitnessState,
+        target_coords : tuple,
+        number_iterations : int,
+        initial_temperature : float,
+        temperature_decay : float = 1,
+        verbose=False
+    ) -> FitnessState:
+
+    """" runs a chain of simulated annealing on a FitnessState: each neighbor is evaluated with the delta of the
+    move in O(R^2) and the move is applied only if accepted, so no state is copied and no full fitness is computed
+
+    fitness_state: the incremental evaluation of the starting state, it is modified in place
+    target_coords: tuple of arrays, the row and column coordinates of the target cells
+    number_iterations: the number of moves to try
+    initial_temperature: the starting temperature
+    temperature_decay: how much the temperature is decreased after each move, 0 keeps it constant
+
+    returns: the fitness state at the end of the chain
+    """
+    curret_temperature = initial_temperature
+
+    for i in range(number_iterations):
+        if verbose:
+            print(f"ITERAZIONE {i}")
+
+        move_type, cell = random_move(fitness_state, target_coords, move_type="random")
+        if verbose:
+            print("\t\tnew state type: ", move_type)
+
+        if cell is not None:
+            delta_fitness = fitness_state.delta_add(cell) if move_type == "add" else fitness_state.delta_remove(cell)
+
+            # once the temperature reaches zero only non worsening moves are accepted
+            if delta_fitness >= 0:
+                acceptance_probability = 1
+            elif curret_temperature > 0:
+                acceptance_probability = np.exp(delta_fitness / curret_temperature)
+            else:
+                acceptance_probability = 0
+
+            if acceptance_probability == 1 or rm.uniform(0,1) < acceptance_probability:
+                if verbose and delta_fitness < 0:
+                    print("\t\taccepted negative change")
+                fitness_state.apply(move_type, cell)
+
+            if verbose:
+                print("\t\tdelta fitness", delta_fitness, ", the probability of accept negative changes was:", acceptance_probability)
+
+        curret_temperature -= temperature_decay
+
+    return fitness_state
+
+
+def incremental_simulated_annealing(
+        initial_state : np.array,
+        number_iterations : int,
+        initial_temperature : int,
+        building_matrix : np.array,
+        data : Data,
+        sigma,
+        verbose=True
+    ) -> np.array:
+
+    """" simulated annealing on a FitnessState, see anneal
+
+    see simulated_annealing for the parameters
+
+    returns: the final configuration, as a Placement if initial_state is a Placement, otherwise as a np.array
+    """
+    fitness_state = anneal(
+        fitness_state=FitnessState(data, initial_state),
+        target_coords=np.nonzero(get_target_mask(building_matrix)),
+        number_iterations=number_iterations,
+        initial_temperature=initial_temperature,
+        verbose=verbose
+    )
+    if isinstance(initial_state, Placement):
+        return fitness_state.get_placement()
+    return fitness_state.get_routers_placement()
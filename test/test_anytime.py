@@ -0,0 +1,60 @@
+import unittest
+import os
+import shutil
+import tempfile
+import main
+from classes.Data import Data
+from anytime import Checkpoint, anytime_solve
+
+
+def interrupted_after(number_rounds: int):
+	"""
+	:return: a solve_round function running main.solve, interrupted as with Ctrl-C after number_rounds rounds
+	"""
+	calls = []
+
+	def solve_round(data, args, initial_state):
+		if len(calls) == number_rounds:
+			raise KeyboardInterrupt
+		calls.append(args.seed)
+		return main.solve(data, args, initial_state)
+	return solve_round
+
+
+class TestAnytime(unittest.TestCase):
+	def test_resume_goes_on_as_the_original_run(self):
+		data = Data("Dataset/tiny_test.in")
+		with tempfile.TemporaryDirectory() as directory:
+			path = os.path.join(directory, "run.npz")
+			args = main.get_parser().parse_args(["Dataset/tiny_test.in", "annealing", "-i", "50", "--seed", "3", "--checkpoint", path])
+
+			# 5 rounds in one go, and 3 rounds resumed for 2 more
+			anytime_solve(data, args, interrupted_after(5))
+			uninterrupted = Checkpoint.load(path)
+
+			anytime_solve(data, args, interrupted_after(3))
+			shutil.copy(path, os.path.join(directory, "resumed.npz"))
+			args.checkpoint, args.resume = None, os.path.join(directory, "resumed.npz")
+			best = anytime_solve(data, args, interrupted_after(2))
+			resumed = Checkpoint.load(args.resume)
+
+			self.assertEqual(resumed.round, 5)
+			self.assertEqual(resumed.current, uninterrupted.current)
+			self.assertEqual(resumed.best, uninterrupted.best)
+			self.assertEqual(resumed.best_score, uninterrupted.best_score)
+			self.assertEqual(best, resumed.best)
+
+	def test_resume_checks_the_run(self):
+		data = Data("Dataset/tiny_test.in")
+		with tempfile.TemporaryDirectory() as directory:
+			path = os.path.join(directory, "run.npz")
+			args = main.get_parser().parse_args(["Dataset/tiny_test.in", "annealing", "-i", "50", "--checkpoint", path])
+			anytime_solve(data, args, interrupted_after(1))
+
+			args = main.get_parser().parse_args(["Dataset/tiny_test.in", "priority", "--resume", path])
+			with self.assertRaises(ValueError):
+				anytime_solve(data, args, interrupted_after(1))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,148 @@
+import unittest
+import numpy as np
+import backbone
+
+
+class TestBackbone(unittest.TestCase):
+	@staticmethod
+	def is_connected(cells: set) -> bool:
+		to_visit = [next(iter(cells))]
+		visited = set(to_visit)
+		while to_visit:
+			x, y = to_visit.pop()
+			for dx in [-1, 0, 1]:
+				for dy in [-1, 0, 1]:
+					neighbor = (x + dx, y + dy)
+					if neighbor in cells and neighbor not in visited:
+						visited.add(neighbor)
+						to_visit.append(neighbor)
+		return visited == cells
+
+	def test_chebyshev_path(self):
+		for diagonal_first in [True, False]:
+			path = backbone.get_chebyshev_path((2, 3), (7, 1), diagonal_first)
+
+			self.assertEqual(len(path), 5)
+			self.assertEqual(tuple(path[-1]), (7, 1))
+			self.assertTrue(self.is_connected({(2, 3)} | set(map(tuple, path.tolist()))))
+
+	def test_no_router(self):
+		routers_placement = np.zeros(shape=(10, 10))
+
+		self.assertEqual(backbone.get_backbone_length((3, 3), routers_placement, 1), 0)
+
+	def test_aligned_routers(self):
+		routers_placement = np.zeros(shape=(10, 10))
+		routers_placement[3][6] = 1
+		routers_placement[3][9] = 1
+		routers_placement[6][6] = 1
+
+		# the starting point, the three routers and the six cells between them
+		self.assertEqual(backbone.get_backbone_length((3, 3), routers_placement, 1), 10)
+
+	def test_steiner_tree_spans_routers(self):
+		rng = np.random.default_rng(0)
+		for _ in range(20):
+			routers_coords = rng.integers(0, 30, size=(15, 2))
+			starting_point = tuple(rng.integers(0, 30, size=2).tolist())
+
+			cells = backbone.get_steiner_tree(starting_point, routers_coords)
+			cells_set = set(map(tuple, cells.tolist()))
+
+			self.assertEqual(len(cells_set), len(cells))
+			self.assertTrue(cells_set.issuperset(map(tuple, routers_coords.tolist())))
+			self.assertTrue(self.is_connected(cells_set))
+
+	def test_not_worse_than_grid_graph(self):
+		rng = np.random.default_rng(0)
+		routers_placement = np.zeros(shape=(40, 40))
+		routers_placement[rng.integers(0, 40, size=40), rng.integers(0, 40, size=40)] = 1
+
+		self.assertLessEqual(
+			backbone.get_backbone_length((20, 20), routers_placement, 1),
+			len(backbone.get_backbone_graph((20, 20), routers_placement, 1))
+		)
+
+	def test_grid_graph_tree(self):
+		rng = np.random.default_rng(0)
+		for _ in range(50):
+			n, m = rng.integers(3, 25, size=2)
+			routers_placement = np.zeros(shape=(n, m))
+			routers_placement[rng.integers(0, n, size=10), rng.integers(0, m, size=10)] = 1
+			starting_point = (int(rng.integers(n)), int(rng.integers(m)))
+			backbone_unit_cost = int(rng.choice([1, 5]))
+
+			cells = backbone.get_grid_graph_tree((n, m), starting_point, np.transpose(np.nonzero(routers_placement)), backbone_unit_cost)
+			g = backbone.get_backbone_graph(starting_point, routers_placement, backbone_unit_cost)
+
+			self.assertEqual(tuple(cells[0]), starting_point)
+			self.assertEqual(set(map(tuple, cells.tolist())), set(g.nodes()) | {starting_point})
+
+	def test_grid_graph_tree_ties(self):
+		# layouts full of equally short paths: aligned and symmetric routers, routers on the borders and on the
+		# diagonals of the starting point, two routers in the same cell of the path of a third one
+		layouts = [
+			((10, 10), (0, 0), [(9, 9), (0, 9), (9, 0)]),
+			((9, 13), (4, 6), [(0, 0), (0, 12), (8, 0), (8, 12)]),
+			((12, 12), (6, 6), [(6, 0), (6, 11), (0, 6), (11, 6), (2, 2), (10, 10)]),
+			((7, 20), (3, 0), [(0, 19), (6, 19), (3, 10), (3, 19)]),
+			((15, 8), (14, 7), [(0, 0), (0, 7), (7, 3), (7, 4), (10, 1)]),
+			((16, 16), (8, 8), [(1, 3), (3, 1), (13, 14), (14, 13), (1, 14), (14, 1), (8, 15)])
+		]
+		for shape, starting_point, routers in layouts:
+			routers_placement = np.zeros(shape=shape)
+			routers_placement[tuple(np.transpose(routers))] = 1
+			for backbone_unit_cost in [1, 3]:
+				cells = backbone.get_grid_graph_tree(shape, starting_point, np.array(routers), backbone_unit_cost)
+				g = backbone.get_backbone_graph(starting_point, routers_placement, backbone_unit_cost)
+
+				self.assertEqual(set(map(tuple, cells.tolist())), set(g.nodes()))
+
+	def test_never_worse_than_grid_graph(self):
+		rng = np.random.default_rng(1)
+		for _ in range(200):
+			n = rng.integers(5, 30)
+			number_routers = rng.integers(1, 15)
+			routers_placement = np.zeros(shape=(n, n))
+			routers_placement[rng.integers(0, n, size=number_routers), rng.integers(0, n, size=number_routers)] = 1
+			starting_point = (int(rng.integers(n)), int(rng.integers(n)))
+			backbone_unit_cost = int(rng.choice([1, 5]))
+
+			self.assertLessEqual(
+				backbone.get_backbone_length(starting_point, routers_placement, backbone_unit_cost),
+				len(backbone.get_backbone_graph(starting_point, routers_placement, backbone_unit_cost))
+			)
+
+	def test_incremental_backbone(self):
+		rng = np.random.default_rng(0)
+		backbone_tree = backbone.IncrementalBackbone((15, 15))
+
+		for _ in range(300):
+			length = backbone_tree.length
+			routers = sorted(backbone_tree.routers)
+			move_type = rng.choice(["add", "remove", "move"]) if routers else "add"
+			cell = tuple(rng.integers(0, 30, size=2).tolist())
+
+			if move_type == "add":
+				delta = backbone_tree.delta_add(cell)
+				backbone_tree.add(cell)
+			elif move_type == "remove":
+				router = routers[rng.integers(len(routers))]
+				delta = backbone_tree.delta_remove(router)
+				backbone_tree.remove(router)
+			else:
+				router = routers[rng.integers(len(routers))]
+				delta = backbone_tree.delta_move(router, cell)
+				backbone_tree.remove(router)
+				backbone_tree.add(cell)
+
+			self.assertEqual(backbone_tree.length - length, delta)
+
+			cells = set(map(tuple, backbone_tree.cells.tolist()))
+			self.assertTrue(cells.issuperset(backbone_tree.routers))
+			self.assertTrue(self.is_connected(cells))
+
+		# removing all the routers prunes the whole tree
+		for router in list(backbone_tree.routers):
+			backbone_tree.remove(router)
+		self.assertEqual(backbone_tree.length, 0)
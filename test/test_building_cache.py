@@ -0,0 +1,37 @@
+import unittest
+import hashlib
+import os
+import tempfile
+import numpy as np
+from classes.Data import Data
+from classes.BuildingCache import BuildingCache
+
+
+class TestBuildingCache(unittest.TestCase):
+	def test_cached_coverage_index(self):
+		with tempfile.TemporaryDirectory() as cache_dir:
+			data = Data("Dataset/charleston_road.in", cache_dir=cache_dir)
+			coverage_index = data.coverage_index
+			self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+			# a new run on the same dataset maps the stored arrays instead of computing them
+			cached_index = Data("Dataset/charleston_road.in", cache_dir=cache_dir).coverage_index
+			self.assertIsInstance(cached_index.footprints, np.memmap)
+			self.assertEqual(cached_index.shape, coverage_index.shape)
+			self.assertTrue(np.array_equal(cached_index.footprints, coverage_index.footprints))
+			self.assertTrue(np.array_equal(cached_index.wall_prefix_sum, coverage_index.wall_prefix_sum))
+			self.assertEqual(cached_index.footprint((100, 100)), coverage_index.footprint((100, 100)))
+
+	def test_key_depends_on_content_and_range(self):
+		with open("Dataset/tiny_test.in", "rb") as f:
+			content = f.read()
+		data = Data("Dataset/tiny_test.in", cache_dir="unused")
+		content_hash = hashlib.sha256(content).hexdigest()
+
+		self.assertEqual(data._cache_key, BuildingCache.get_key(content_hash, data.router_range))
+		self.assertNotEqual(data._cache_key, BuildingCache.get_key(content_hash, data.router_range + 1))
+		self.assertNotEqual(data._cache_key, BuildingCache.get_key(hashlib.sha256(content + b".").hexdigest(), data.router_range))
+
+
+if __name__ == '__main__':
+	unittest.main()
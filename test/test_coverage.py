@@ -1,6 +1,9 @@
 import unittest
 import numpy as np
 import utils
+from classes.CoverageIndex import CoverageIndex
+from classes.Data import Data
+from classes.Placement import Placement
 
 
 class TestCoverage(unittest.TestCase):
@@ -73,3 +76,69 @@ class TestCoverage(unittest.TestCase):
 			utils.get_number_covered_cells(routers_placement, building_matrix, router_range),
 			27
 		)
+
+	def test_vectorized_coverage_matches_filter(self):
+		building_matrix = TestCoverage.init_building_matrix()
+		router_range = 3
+		coverage_index = CoverageIndex(building_matrix, router_range)
+
+		rng = np.random.default_rng(0)
+		for _ in range(20):
+			routers_placement = (rng.random(building_matrix.shape) < 0.1).astype(float)
+
+			expected = set()
+			for router_coords in zip(*routers_placement.nonzero()):
+				expected.update(utils.filter_non_target_points(
+					building_matrix,
+					router_coords,
+					utils.get_points_around_router(building_matrix, router_coords, router_range)
+				))
+
+			for index in [None, coverage_index]:
+				coverage_mask, number_covered_cells = utils.get_coverage_mask(
+					routers_placement, building_matrix, router_range, index
+				)
+				self.assertEqual(set(zip(*coverage_mask.nonzero())), expected)
+				self.assertEqual(number_covered_cells, len(expected))
+
+	def test_coverage_counts_match_footprints(self):
+		building_matrix = TestCoverage.init_building_matrix()
+		rng = np.random.default_rng(0)
+		# with range 1 part of the squares have no walls, and are counted with the difference array
+		for router_range in [1, 3]:
+			coverage_index = CoverageIndex(building_matrix, router_range)
+			for _ in range(20):
+				routers_placement = (rng.random(building_matrix.shape) < 0.2).astype(float)
+
+				expected = np.zeros(shape=building_matrix.shape, dtype=np.int32)
+				for router_coords in zip(*routers_placement.nonzero()):
+					for (x, y) in coverage_index.footprint(router_coords):
+						expected[x, y] += 1
+
+				for index in [None, coverage_index]:
+					np.testing.assert_array_equal(
+						utils.get_coverage_counts(routers_placement, building_matrix, router_range, index), expected
+					)
+
+	def test_population_fitness_matches_fitness(self):
+		data = Data("Dataset/charleston_road.in")
+		rng = np.random.default_rng(0)
+		targets = np.argwhere(data.target_mask)
+		population = [targets[rng.choice(len(targets), size=size, replace=False)] for size in [0, 1, 50, 200]]
+
+		arguments = dict(
+			building_matrix=data.matrix,
+			router_range=data.router_range,
+			backbone_starting_point=data.initial_backbone,
+			router_cost=data.router_cost,
+			backbone_cost=data.backbone_cost,
+			budget=data.budget
+		)
+		expected = [
+			utils.compute_fitness(routers_placement=Placement(data.matrix.shape, routers), coverage_index=data.coverage_index, **arguments)
+			for routers in population
+		]
+		for coverage_index in [None, data.coverage_index]:
+			fitnesses = utils.compute_population_fitness(population=population, coverage_index=coverage_index, **arguments)
+			self.assertEqual(fitnesses, expected)
+
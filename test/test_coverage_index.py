@@ -0,0 +1,57 @@
+import unittest
+import itertools
+import numpy as np
+import utils
+from classes.CoverageIndex import CoverageIndex
+
+
+class TestCoverageIndex(unittest.TestCase):
+	@staticmethod
+	def init_building_matrix():
+		building_matrix = np.empty(shape=(7, 16), dtype=str)
+		building_matrix.fill(".")
+		building_matrix[0][1] = "#"
+		building_matrix[1][1] = "#"
+		building_matrix[2][1:5] = "#"
+		building_matrix[3][4] = "#"
+		building_matrix[4][4] = "#"
+		building_matrix[5][4] = "#"
+		building_matrix[6][4] = "#"
+		building_matrix[1][8] = "#"
+		building_matrix[2][8] = "#"
+		building_matrix[5][8] = "#"
+		building_matrix[6][8] = "#"
+		for i in range(7):
+			building_matrix[i][14] = "-"
+			building_matrix[i][15] = "-"
+		return building_matrix
+
+	def test_footprint_matches_filter(self):
+		building_matrix = TestCoverageIndex.init_building_matrix()
+		router_range = 3
+		coverage_index = CoverageIndex(building_matrix, router_range)
+
+		n, m = building_matrix.shape
+		for router_coords in itertools.product(range(n), range(m)):
+			expected = utils.filter_non_target_points(
+				building_matrix,
+				router_coords,
+				utils.get_points_around_router(building_matrix, router_coords, router_range)
+			)
+			self.assertEqual(coverage_index.footprint(router_coords), [(int(x), int(y)) for (x, y) in expected])
+			self.assertEqual(coverage_index.footprint_size(router_coords), len(expected))
+
+	def test_single_router(self):
+		building_matrix = TestCoverageIndex.init_building_matrix()
+		coverage_index = CoverageIndex(building_matrix, 3)
+
+		self.assertEqual(coverage_index.footprint_size((3, 7)), 27)
+
+	def test_has_wall(self):
+		building_matrix = TestCoverageIndex.init_building_matrix()
+		coverage_index = CoverageIndex(building_matrix, 3)
+
+		self.assertTrue(coverage_index.has_wall(0, 0, 0, 1))
+		self.assertTrue(coverage_index.has_wall(3, 5, 6, 8))
+		self.assertFalse(coverage_index.has_wall(3, 5, 4, 10))
+		self.assertFalse(coverage_index.has_wall(0, 9, 6, 15))
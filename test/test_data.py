@@ -0,0 +1,55 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+from classes.Data import Data
+from classes.CellType import TARGET, WALL, encode_building
+
+
+class TestData(unittest.TestCase):
+	def test_grid_matches_file(self):
+		data = Data("Dataset/tiny_test.in")
+
+		with open("Dataset/tiny_test.in", "r") as f:
+			rows = [line.rstrip("\n") for line in f.readlines()[3:]]
+		building_matrix = np.array([list(row) for row in rows], dtype=str)
+
+		self.assertEqual(data.matrix.dtype, np.uint8)
+		self.assertEqual(data.matrix.shape, (data.height, data.width))
+		np.testing.assert_array_equal(data.string_matrix, building_matrix)
+		np.testing.assert_array_equal(data.matrix, encode_building(building_matrix))
+
+		np.testing.assert_array_equal(data.target_mask, building_matrix == ".")
+		np.testing.assert_array_equal(data.wall_mask, building_matrix == "#")
+		np.testing.assert_array_equal(data.void_mask, building_matrix == "-")
+		self.assertEqual(data.target_area, np.count_nonzero(data.matrix == TARGET))
+		self.assertEqual(data.matrix[0][1], WALL)
+
+	def test_invalid_rows(self):
+		with open("Dataset/tiny_test.in", "rb") as f:
+			content = f.read()
+
+		with tempfile.TemporaryDirectory() as directory:
+			file_path = os.path.join(directory, "building.in")
+			# a short row, and the building without its last row
+			short_row = content.replace(b".#...", b".#..", 1)
+			missing_row = content[:content.rindex(b"\n", 0, -1) + 1]
+			for building, message in [(short_row, "row 0 of the building has 15 cells"), (missing_row, "has 6 rows")]:
+				with open(file_path, "wb") as f:
+					f.write(building)
+				with self.assertRaisesRegex(ValueError, message):
+					Data(file_path)
+
+	def test_crlf_rows(self):
+		with open("Dataset/tiny_test.in", "rb") as f:
+			content = f.read()
+
+		with tempfile.TemporaryDirectory() as directory:
+			file_path = os.path.join(directory, "building.in")
+			with open(file_path, "wb") as f:
+				f.write(content.replace(b"\n", b"\r\n"))
+			np.testing.assert_array_equal(Data(file_path).matrix, Data("Dataset/tiny_test.in").matrix)
+
+
+if __name__ == '__main__':
+	unittest.main()
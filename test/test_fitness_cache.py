@@ -0,0 +1,73 @@
+import unittest
+import random
+import numpy as np
+import utils
+from classes import Placement, FitnessCache
+from classes.Data import Data
+from classes.Placement import get_placement_hash
+from parallel import FitnessPool
+from genetic_algorithm.genetic_algorithm import get_weight_population_by_fitness
+
+
+class TestFitnessCache(unittest.TestCase):
+	def test_incremental_hash(self):
+		random.seed(0)
+		routers_placement = np.zeros((9, 13))
+		placement = Placement.from_mask(routers_placement)
+		for _ in range(200):
+			cell = (random.randrange(9), random.randrange(13))
+			value = random.randint(0, 1)
+			routers_placement[cell] = value
+			placement[cell] = value
+			# the hash kept while adding and removing is the one of the routers, whatever the order of the moves
+			self.assertEqual(placement.zobrist_hash, get_placement_hash(routers_placement))
+			self.assertEqual(placement.copy().zobrist_hash, placement.zobrist_hash)
+		self.assertEqual(get_placement_hash(np.zeros((9, 13))), Placement((9, 13)).zobrist_hash)
+
+	def test_lru(self):
+		calls = []
+		def fitness_function(routers_placement):
+			calls.append(routers_placement)
+			return len(routers_placement), False
+
+		cache = FitnessCache(fitness_function, max_size=2)
+		a, b, c = Placement((5, 5), [(0, 0)]), Placement((5, 5), [(1, 1)]), Placement((5, 5), [(2, 2), (3, 3)])
+
+		self.assertEqual(cache(a), (1, False))
+		self.assertEqual(cache(a.copy()), (1, False))
+		cache(b)
+		cache(a)
+		# c evicts b, the least recently used
+		self.assertEqual(cache(c), (2, False))
+		cache(a)
+		cache(b)
+		self.assertEqual(len(calls), 4)
+		self.assertEqual((cache.hits, cache.misses), (3, 4))
+		self.assertEqual(len(cache), 2)
+
+		# a dense placement has the key of the Placement of its routers
+		self.assertEqual(FitnessCache.get_key(np.asarray(c, dtype=float)), FitnessCache.get_key(c))
+
+	def test_population_evaluations(self):
+		data = Data("Dataset/tiny_test.in")
+		cache = FitnessCache(lambda routers: utils.compute_fitness(
+			building_matrix=data.matrix,
+			routers_placement=routers,
+			router_range=data.router_range,
+			backbone_starting_point=data.initial_backbone,
+			router_cost=data.router_cost,
+			backbone_cost=data.backbone_cost,
+			budget=data.budget
+		))
+		a, b = Placement(data.matrix.shape, [(0, 0), (3, 5)]), Placement(data.matrix.shape, [(6, 10)])
+
+		# only the placements neither cached nor already in the population are evaluated, and counted
+		with FitnessPool(data, 1) as fitness_pool:
+			_, weighted_population, evaluated = get_weight_population_by_fitness([a, b, a.copy(), b.copy()], cache, fitness_pool)
+			self.assertEqual(evaluated, 2)
+			self.assertEqual(len(weighted_population), 4)
+			self.assertEqual(get_weight_population_by_fitness([b, a, b], cache, fitness_pool)[2], 0)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+import random
+import numpy as np
+import utils
+from classes.Data import Data
+from classes import FitnessState
+
+
+class TestFitnessState(unittest.TestCase):
+	def test_deltas_match_applied_moves(self):
+		data = Data("Dataset/tiny_test.in")
+		random.seed(0)
+
+		fitness_state = FitnessState(data)
+		target_coords = np.transpose(np.nonzero(data.target_mask))
+		random_target = lambda: tuple(target_coords[random.randrange(len(target_coords))])
+
+		for _ in range(200):
+			score = fitness_state.score
+			move_type = random.choice(["add", "remove", "move"]) if fitness_state.number_routers > 0 else "add"
+
+			if move_type == "add":
+				cells = (random_target(),)
+				delta = fitness_state.delta_add(*cells)
+			elif move_type == "remove":
+				cells = (fitness_state.random_router(),)
+				delta = fitness_state.delta_remove(*cells)
+			else:
+				cells = (fitness_state.random_router(), random_target())
+				delta = fitness_state.delta_move(*cells)
+
+			fitness_state.apply(move_type, *cells)
+			self.assertEqual(fitness_state.score - score, delta)
+
+			routers_placement = fitness_state.get_routers_placement()
+			self.assertEqual(
+				fitness_state.number_covered_cells,
+				utils.get_number_covered_cells(routers_placement, data.matrix, data.router_range)
+			)
+			self.assertEqual(fitness_state.number_routers, utils.get_number_routers(routers_placement))
+
+	def test_empty_state(self):
+		data = Data("Dataset/tiny_test.in")
+		fitness_state = FitnessState(data, np.zeros(data.matrix.shape))
+
+		self.assertEqual(fitness_state.fitness, (data.budget, False))
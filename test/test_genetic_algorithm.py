@@ -0,0 +1,37 @@
+import unittest
+import random
+import utils
+from classes.Data import Data
+from classes.Placement import Placement
+from genetic_algorithm import genetic_algorithm
+
+
+def fewest_routers(routers_placement) -> tuple:
+	# a fitness far from the one of the problem: the fewer routers, the better
+	return -len(routers_placement), False
+
+
+class TestGeneticAlgorithm(unittest.TestCase):
+	def test_fitness_function_ranks(self):
+		data = Data("Dataset/tiny_test.in")
+		population = [
+			Placement.from_mask(utils.get_grid_router_placement(data=data, rescale_range_factor=0.6)) for _ in range(3)
+		] + [Placement(data.matrix.shape)]
+		self.assertGreater(utils.compute_fitness(
+			building_matrix=data.matrix,
+			routers_placement=population[0],
+			router_range=data.router_range,
+			backbone_starting_point=data.initial_backbone,
+			router_cost=data.router_cost,
+			backbone_cost=data.backbone_cost,
+			budget=data.budget
+		)[0], data.budget)
+
+		# the empty placement is the worst one for the fitness of the problem, the best one for fitness_function
+		random.seed(0)
+		best = genetic_algorithm(data.matrix, population, data, fewest_routers, mutation_probability=0, max_iter=2, workers=2)
+		self.assertEqual(len(best), 0)
+
+
+if __name__ == '__main__':
+	unittest.main()
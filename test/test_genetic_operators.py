@@ -0,0 +1,68 @@
+import unittest
+import random
+import numpy as np
+import utils
+from classes.Data import Data
+from classes.Placement import Placement, get_placement_hash
+from classes.CellType import get_target_mask
+from genetic_algorithm.operators import rectangle_crossover, voronoi_crossover, get_window_counts, local_mutation
+
+
+class TestGeneticOperators(unittest.TestCase):
+	def setUp(self):
+		self.data = Data("Dataset/charleston_road.in")
+		rng = np.random.default_rng(0)
+		targets = np.argwhere(get_target_mask(self.data.matrix))
+		self.parents = [
+			Placement(self.data.matrix.shape, targets[rng.choice(len(targets), size=60, replace=False)])
+			for _ in range(2)
+		]
+
+	def test_crossover(self):
+		random.seed(0)
+		parent1, parent2 = self.parents
+		routers1, routers2 = set(parent1), set(parent2)
+		for crossover in [rectangle_crossover, voronoi_crossover]:
+			for _ in range(20):
+				child = crossover(parent1, parent2)
+				self.assertIsInstance(child, Placement)
+				self.assertTrue(set(child) <= routers1 | routers2)
+				self.assertEqual(child.zobrist_hash, get_placement_hash(np.asarray(child)))
+
+				# a matrix gets a matrix child, with the same routers for the same random state
+				state = random.getstate()
+				dense_child = crossover(np.asarray(parent1), np.asarray(parent2))
+				random.setstate(state)
+				np.testing.assert_array_equal(dense_child, np.asarray(crossover(parent1, parent2)))
+
+	def test_window_counts(self):
+		routers = self.parents[0].coords
+		coverage_counts = utils.get_coverage_counts(
+			self.parents[0], self.data.matrix, self.data.router_range, self.data.coverage_index
+		)
+		for center in [(0, 0), tuple(routers[0].tolist()), (self.data.matrix.shape[0] - 1, 10)]:
+			window, (row, column) = get_window_counts(routers, center, 2 * self.data.router_range, self.data.coverage_index)
+			np.testing.assert_array_equal(
+				window, coverage_counts[row:row + window.shape[0], column:column + window.shape[1]]
+			)
+
+	def test_local_mutation(self):
+		random.seed(0)
+		target_mask = get_target_mask(self.data.matrix)
+		placement = self.parents[0]
+		for _ in range(20):
+			added = local_mutation(self.data.matrix, placement, False, self.data.coverage_index)
+			(cell,) = set(added) - set(placement)
+			self.assertEqual(len(added), len(placement) + 1)
+			self.assertTrue(target_mask[cell])
+
+			removed = local_mutation(self.data.matrix, placement, True, self.data.coverage_index)
+			self.assertEqual(len(removed), len(placement) - 1)
+			self.assertTrue(set(removed) < set(placement))
+
+		# the placement mutated is not changed
+		self.assertEqual(len(placement), 60)
+
+
+if __name__ == '__main__':
+	unittest.main()
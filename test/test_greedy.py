@@ -0,0 +1,29 @@
+import unittest
+import utils
+from classes.Data import Data
+from greedy import greedy
+
+
+class TestGreedy(unittest.TestCase):
+	def test_greedy_within_budget(self):
+		data = Data("Dataset/tiny_test.in")
+		placement = greedy(data)
+
+		score, out_of_budget = utils.compute_fitness(
+			building_matrix=data.matrix,
+			routers_placement=placement,
+			router_range=data.router_range,
+			backbone_starting_point=data.initial_backbone,
+			router_cost=data.router_cost,
+			backbone_cost=data.backbone_cost,
+			budget=data.budget,
+			coverage_index=data.coverage_index
+		)
+		self.assertFalse(out_of_budget)
+		self.assertTrue(all(data.target_mask[router] for router in placement))
+		# every target cell of the tiny building can be covered within the budget
+		self.assertEqual(utils.get_number_covered_cells(placement, data.matrix, data.router_range), data.target_area)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+import random
+import numpy as np
+import utils
+from classes.Data import Data
+from classes.Placement import Placement
+from genetic_algorithm import island_genetic_algorithm
+
+
+class TestIsland(unittest.TestCase):
+	def test_island_genetic_algorithm(self):
+		data = Data("Dataset/charleston_road.in")
+		population = [
+			Placement.from_mask(utils.get_grid_router_placement(data=data, rescale_range_factor=0.6)) for _ in range(4)
+		]
+		fitness = lambda routers_placement: utils.compute_fitness(
+			building_matrix=data.matrix,
+			routers_placement=routers_placement,
+			router_range=data.router_range,
+			backbone_starting_point=data.initial_backbone,
+			router_cost=data.router_cost,
+			backbone_cost=data.backbone_cost,
+			budget=data.budget,
+			coverage_index=data.coverage_index
+		)[0]
+
+		results = []
+		for workers in [1, 3]:
+			random.seed(0)
+			np.random.seed(0)
+			results.append(island_genetic_algorithm(
+				data, population, mutation_probability=0.5, max_iter=4, islands=3, workers=workers,
+				migration_interval=2, migrants=1, crossover="rectangle"
+			))
+
+		# the islands are seeded by the caller, whatever the number of processes running them
+		self.assertIsInstance(results[0], Placement)
+		self.assertEqual(results[0], results[1])
+		self.assertGreaterEqual(fitness(results[0]), fitness(population[0]))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import random
+import numpy as np
+import utils
+from classes.Data import Data
+from classes import Placement
+from genetic_algorithm.genetic_algorithm import reproduce
+
+
+class TestPlacement(unittest.TestCase):
+	def test_matches_dense_placement(self):
+		rng = np.random.default_rng(0)
+		routers_placement = (rng.random((7, 16)) < 0.2).astype(float)
+		placement = Placement.from_mask(routers_placement)
+
+		self.assertEqual(len(placement), np.count_nonzero(routers_placement))
+		np.testing.assert_array_equal(np.asarray(placement, dtype=float), routers_placement)
+		self.assertEqual(
+			set(zip(*np.nonzero(placement))),
+			set(zip(*np.nonzero(routers_placement)))
+		)
+
+		# adding, removing and copying
+		random.seed(0)
+		copied = placement.copy()
+		for _ in range(100):
+			cell = (random.randrange(7), random.randrange(16))
+			value = random.randint(0, 1)
+			routers_placement[cell] = value
+			placement[cell] = value
+			self.assertEqual(placement[cell], value)
+			self.assertEqual(cell in placement, value == 1)
+		np.testing.assert_array_equal(np.asarray(placement, dtype=float), routers_placement)
+		self.assertNotEqual(copied, placement)
+		self.assertEqual(placement, Placement.from_mask(routers_placement))
+
+	def test_fitness_and_crossover(self):
+		data = Data("Dataset/tiny_test.in")
+		rng = np.random.default_rng(1)
+		fitness = lambda routers_placement: utils.compute_fitness(
+			building_matrix=data.matrix,
+			routers_placement=routers_placement,
+			router_range=data.router_range,
+			backbone_starting_point=data.initial_backbone,
+			router_cost=data.router_cost,
+			backbone_cost=data.backbone_cost,
+			budget=data.budget,
+			coverage_index=data.coverage_index
+		)
+
+		for _ in range(10):
+			parent1 = ((rng.random(data.matrix.shape) < 0.1) & data.target_mask).astype(float)
+			parent2 = ((rng.random(data.matrix.shape) < 0.1) & data.target_mask).astype(float)
+			placement1, placement2 = Placement.from_mask(parent1), Placement.from_mask(parent2)
+
+			self.assertEqual(fitness(placement1), fitness(parent1))
+			self.assertEqual(
+				reproduce(placement1, placement2),
+				Placement.from_mask(reproduce(parent1, parent2))
+			)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+import random
+from classes.PriorityDict import PriorityDict
+
+
+class TestPriorityDict(unittest.TestCase):
+	def test_edits_keep_order(self):
+		random.seed(0)
+		pri_dict = PriorityDict()
+		levels = {}
+		for i in range(10):
+			for j in range(10):
+				levels[(i, j)] = random.randint(0, 3)
+				pri_dict.add_element((i, j), levels[(i, j)])
+
+		for _ in range(500):
+			cell = random.choice(list(levels))
+			delta = random.choice([-1, 1]) if levels[cell] > 0 else 1
+			levels[cell] += delta
+			pri_dict.edit_element(cell, delta)
+
+			self.assertEqual(levels[pri_dict.peek_min()], min(levels.values()))
+			self.assertEqual(levels[pri_dict.peek_max()], max(levels.values()))
+
+		self.assertEqual(len(pri_dict), len(levels))
+		self.assertTrue(all(pri_dict.get_level(cell) == level for cell, level in levels.items()))
+		self.assertEqual([levels[cell] for cell in pri_dict.iter_lower()], sorted(levels.values()))
+		self.assertEqual([levels[cell] for cell in pri_dict.iter_higher()], sorted(levels.values(), reverse=True))
+
+	def test_ties_are_random(self):
+		pri_dict = PriorityDict()
+		for i in range(20):
+			pri_dict.add_element((i, 0), 1)
+		pri_dict.add_element((20, 0), 0)
+
+		self.assertEqual(pri_dict.peek_min(), (20, 0))
+		self.assertGreater(len({pri_dict.peek_max() for _ in range(50)}), 1)
+
+
+if __name__ == '__main__':
+	unittest.main()
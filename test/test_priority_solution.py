@@ -0,0 +1,33 @@
+import unittest
+import numpy as np
+from classes.Data import Data
+from classes.PrioritySoluton import PrioritySolution
+from classes.RouterIndex import RouterIndex
+
+
+class TestPrioritySolution(unittest.TestCase):
+	def test_add_without_free_cells(self):
+		data = Data("Dataset/tiny_test.in")
+		# a router on every target cell, there is no cell left where to add one
+		routers_placement = data.target_mask.astype(float)
+		pri_dic = PrioritySolution.init_pri_dic(data.matrix, routers_placement, data.router_range, data.coverage_index)
+		router_index = RouterIndex.from_placement(routers_placement, data.router_range)
+		levels = {cell: pri_dic.get_level(cell) for cell in pri_dic.iter_lower()}
+
+		new_state = PrioritySolution._state_neighbor(
+			pri_dic=pri_dic,
+			building_matrix=data.matrix,
+			routers_placement=routers_placement,
+			router_range=data.router_range,
+			move_type="add",
+			coverage_index=data.coverage_index,
+			router_index=router_index
+		)
+
+		self.assertTrue(np.array_equal(new_state, routers_placement))
+		self.assertEqual({cell: pri_dic.get_level(cell) for cell in levels}, levels)
+		self.assertEqual(len(router_index), np.count_nonzero(routers_placement))
+
+
+if __name__ == '__main__':
+	unittest.main()
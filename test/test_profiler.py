@@ -0,0 +1,67 @@
+import unittest
+import sys
+import utils
+import hill_climbing.hill_climb
+import main
+from classes.Data import Data
+from profiling import HOT_PATHS, Profiler
+
+
+class TestProfiler(unittest.TestCase):
+	def test_instrument_and_uninstall(self):
+		data = Data("Dataset/tiny_test.in")
+		routers_placement = utils.get_grid_router_placement(data=data, rescale_range_factor=0.7)
+		original = utils.get_number_covered_cells
+		# the package exports the function hill_climb, hiding the module
+		hill_climb_module = sys.modules["hill_climbing.hill_climb"]
+
+		profiler = Profiler(trace=True)
+		profiler.instrument("utils", "get_number_covered_cells")
+		try:
+			self.assertIsNot(utils.get_number_covered_cells, original)
+			# also the modules importing the function by name call the wrapper
+			self.assertIs(hill_climb_module.get_number_covered_cells, utils.get_number_covered_cells)
+
+			expected = original(routers_placement, data.matrix, data.router_range)
+			self.assertEqual(utils.get_number_covered_cells(routers_placement, data.matrix, data.router_range), expected)
+			utils.compute_fitness(
+				building_matrix=data.matrix,
+				routers_placement=routers_placement,
+				router_range=data.router_range,
+				backbone_starting_point=data.initial_backbone,
+				router_cost=data.router_cost,
+				backbone_cost=data.backbone_cost,
+				budget=data.budget
+			)
+		finally:
+			profiler.uninstall()
+
+		self.assertIs(utils.get_number_covered_cells, original)
+		self.assertIs(hill_climb_module.get_number_covered_cells, original)
+		calls, total = profiler.stats["get_number_covered_cells"]
+		self.assertGreaterEqual(calls, 2)
+		self.assertGreater(total, 0)
+		self.assertEqual(len(profiler.events), calls)
+		self.assertIn("get_number_covered_cells", profiler.report())
+
+	def test_solvers_hot_paths(self):
+		data = Data("Dataset/tiny_test.in")
+		for algorithm, expected in [("priority", "IncrementalBackbone.update"), ("annealing", "FitnessState.delta_add")]:
+			profiler = Profiler()
+			for module_name, qualified_name in HOT_PATHS:
+				profiler.instrument(module_name, qualified_name)
+			try:
+				main.solve(data, main.get_parser().parse_args(["Dataset/tiny_test.in", algorithm, "-i", "20", "--seed", "0"]))
+			finally:
+				profiler.uninstall()
+
+			# the time of the solver is attributed to the backbone and to its own hot path
+			calls = {name: stats[0] for name, stats in profiler.stats.items()}
+			backbone_calls = {name: calls[name] for module_name, name in HOT_PATHS if module_name.startswith("backbone")}
+			self.assertGreater(sum(backbone_calls.values()), 0)
+			self.assertGreater(calls[expected], 0)
+			self.assertIn(max(backbone_calls, key=backbone_calls.get), profiler.report())
+
+
+if __name__ == '__main__':
+	unittest.main()
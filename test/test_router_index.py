@@ -0,0 +1,32 @@
+import unittest
+import numpy as np
+from classes.RouterIndex import RouterIndex
+
+
+class TestRouterIndex(unittest.TestCase):
+	def test_k_nearest_matches_brute_force(self):
+		rng = np.random.default_rng(0)
+		shape = (60, 90)
+		routers = {tuple(cell) for cell in rng.integers(low=0, high=shape, size=(40, 2)).tolist()}
+		router_index = RouterIndex(shape, bucket_size=4, routers_coords=np.array(sorted(routers)))
+
+		# remove some routers, the index must forget them
+		for router in sorted(routers)[::3]:
+			router_index.remove(router)
+			routers.discard(router)
+		self.assertEqual(len(router_index), len(routers))
+
+		for cell in rng.integers(low=0, high=shape, size=(50, 2)).tolist():
+			expected = sorted(routers, key=lambda r: (max(abs(r[0] - cell[0]), abs(r[1] - cell[1])), r))
+			self.assertEqual(router_index.k_nearest(cell, 5), expected[:5])
+			self.assertEqual(router_index.nearest(cell), expected[0])
+
+	def test_empty_index(self):
+		router_index = RouterIndex((10, 10), bucket_size=3)
+		self.assertIsNone(router_index.nearest((5, 5)))
+		router_index.add((9, 0))
+		self.assertEqual(router_index.k_nearest((0, 9), 3), [(9, 0)])
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+import numpy as np
+import utils
+from classes.Data import Data
+from hill_climbing.search import Action, Search, move, restore_move
+
+
+class TestSearch(unittest.TestCase):
+	@staticmethod
+	def init_search(data: Data, number_routers: int) -> Search:
+		np.random.seed(0)
+		rows, columns = np.nonzero(data.target_mask)
+		chosen = np.random.choice(len(rows), size=number_routers, replace=False)
+		router_list = np.transpose([rows[chosen], columns[chosen]])
+		map_mask = np.zeros(shape=data.matrix.shape, dtype=np.int8)
+		map_mask[rows[chosen], columns[chosen]] = 1
+		target_coords = [(i, j) for (i, j) in np.argwhere(data.target_mask).tolist()]
+		return Search(map_mask, data.matrix, router_list, target_coords, data.router_range, data.coverage_index)
+
+	def test_move_cost_matches_coverage(self):
+		data = Data("Dataset/charleston_road.in")
+		search = TestSearch.init_search(data, 40)
+		covered = utils.get_number_covered_cells(search.map_mask, data.matrix, data.router_range, data.coverage_index)
+
+		for router in search.router_list[:10]:
+			actions = search._valid_actions(router)
+			for action, improvement in zip(actions, search.move_cost(router, actions)):
+				mask = search.map_mask.copy()
+				mask[router[0], router[1]] = 0
+				move(router, action)
+				mask[router[0], router[1]] = 1
+				restore_move(router, action)
+				expected = utils.get_number_covered_cells(mask, data.matrix, data.router_range, data.coverage_index)
+				self.assertEqual(improvement, expected - covered)
+
+	def test_update_keeps_counts(self):
+		data = Data("Dataset/charleston_road.in")
+		search = TestSearch.init_search(data, 40)
+		for _ in range(5):
+			search.update(search.best_move())
+
+		expected = np.zeros(shape=data.matrix.shape, dtype=np.int16)
+		for router in search.router_list:
+			for cell in search.get_router_coverage(router):
+				expected[cell] += 1
+		self.assertTrue(np.array_equal(search.coverage_counts, expected))
+
+
+if __name__ == '__main__':
+	unittest.main()
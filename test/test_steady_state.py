@@ -0,0 +1,77 @@
+import unittest
+import random
+import utils
+from classes import FitnessCache
+from classes.Data import Data
+from classes.Placement import Placement
+from genetic_algorithm.genetic_algorithm import choose_parents_population
+from genetic_algorithm.steady_state import tournament_selection, steady_state_genetic_algorithm
+
+
+class TestSteadyState(unittest.TestCase):
+	def test_selection_with_negative_fitness(self):
+		random.seed(0)
+		weighted_population = [("a", -500), ("b", -20), ("c", 3)]
+
+		self.assertEqual(tournament_selection(weighted_population, 3), ("c", 3))
+		for _ in range(20):
+			self.assertIn(tournament_selection(weighted_population, 2)[0], "abc")
+			parents = choose_parents_population(weighted_population)
+			self.assertTrue(set(parents) <= {"a", "b", "c"})
+
+	def test_evaluation_budget(self):
+		data = Data("Dataset/charleston_road.in")
+		evaluations = []
+		def fitness_function(routers_placement):
+			evaluations.append(routers_placement)
+			return utils.compute_fitness(
+				building_matrix=data.matrix,
+				routers_placement=routers_placement,
+				router_range=data.router_range,
+				backbone_starting_point=data.initial_backbone,
+				router_cost=data.router_cost,
+				backbone_cost=data.backbone_cost,
+				budget=data.budget,
+				coverage_index=data.coverage_index
+			)
+
+		population = [
+			Placement.from_mask(utils.get_grid_router_placement(data=data, rescale_range_factor=0.6)) for _ in range(6)
+		]
+		initial_fitness = fitness_function(population[0])[0]
+		evaluations.clear()
+
+		random.seed(0)
+		best = steady_state_genetic_algorithm(
+			data.matrix, population, data, fitness_function, mutation_probability=1.0, max_iter=1000, replacements=2,
+			max_evaluations=30, crossover="rectangle"
+		)
+
+		# the budget is checked between two steps, a step evaluates at most two children twice
+		self.assertGreaterEqual(len(evaluations), 30)
+		self.assertLess(len(evaluations), 30 + 4)
+		# the best individual is never lost
+		self.assertGreaterEqual(fitness_function(best)[0], initial_fitness)
+
+		# the values found in the cache are not counted: the identical individuals of the population cost one
+		# evaluation, the budget is spent on evaluations actually done
+		evaluations.clear()
+		random.seed(0)
+		steady_state_genetic_algorithm(
+			data.matrix, [population[0].copy() for _ in range(6)], data, FitnessCache(fitness_function),
+			mutation_probability=1.0, max_iter=1000, replacements=2, max_evaluations=30, crossover="rectangle"
+		)
+		self.assertGreaterEqual(len(evaluations), 30)
+		self.assertLess(len(evaluations), 30 + 4)
+
+	def test_elites_fill_population(self):
+		data = Data("Dataset/tiny_test.in")
+		population = [Placement(data.matrix.shape, [(0, 0)]), Placement(data.matrix.shape, [(3, 5)])]
+
+		# every individual would be an elite, none could be replaced
+		with self.assertRaises(ValueError):
+			steady_state_genetic_algorithm(data.matrix, population, data, lambda routers: (len(routers), False), 0.5, elites=2)
+
+
+if __name__ == '__main__':
+	unittest.main()
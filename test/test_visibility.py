@@ -0,0 +1,43 @@
+import unittest
+import itertools
+import numpy as np
+import utils
+from classes.Data import Data
+from classes.Visibility import Visibility, get_wall_runs
+
+
+class TestVisibility(unittest.TestCase):
+	@staticmethod
+	def init_building_matrix():
+		# walls of every orientation, crossing and with gaps, and a void border
+		return np.array([list(row) for row in [
+			".#...........--",
+			".#......#....--",
+			".####...#..#.--",
+			"....#......#.--",
+			"....#...####.--",
+			"....#...#....--",
+			"........#..#.--"
+		]])
+
+	def test_wall_runs(self):
+		left, right = get_wall_runs(np.array([list("..#...#"), list("#......")]))
+
+		np.testing.assert_array_equal(left, [[1, 2, 0, 1, 2, 3, 0], [0, 1, 2, 3, 4, 5, 6]])
+		np.testing.assert_array_equal(right, [[2, 1, 0, 3, 2, 1, 0], [0, 6, 5, 4, 3, 2, 1]])
+
+	def test_matches_filter(self):
+		for building_matrix, router_range in ((TestVisibility.init_building_matrix(), 3), (Data("Dataset/tiny_test.in").matrix, 3)):
+			visibility = Visibility(building_matrix)
+			n, m = building_matrix.shape
+			for router_coords in itertools.product(range(n), range(m)):
+				points = utils.get_points_around_router(building_matrix, router_coords, router_range)
+				expected = utils.filter_non_target_points(building_matrix, router_coords, points)
+
+				self.assertEqual(visibility.filter_non_target_points(router_coords, points), expected)
+				self.assertEqual(utils.filter_visible_points(building_matrix, router_coords, points), expected)
+				self.assertEqual(visibility.footprint(router_coords, router_range), [(int(x), int(y)) for (x, y) in expected])
+
+
+if __name__ == '__main__':
+	unittest.main()
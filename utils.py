@@ -1,6 +1,11 @@
 import random
 import numpy as np
 from classes import Data
+from classes.Placement import Placement
+from classes.RouterIndex import RouterIndex
+from classes.CoverageIndex import CoverageIndex, get_wall_prefix_sum
+from classes.Visibility import Visibility
+from classes.CellType import VOID, WALL, TARGET, get_cell_grid, get_target_mask, decode_building
 import math
 import backbone
 import itertools
@@ -10,9 +15,15 @@ from copy import copy
 __all__ = [
 	"get_points_around_router",
 	"filter_non_target_points",
+	"filter_visible_points",
+	"get_router_coverage",
+	"get_coverage_mask",
+	"get_coverage_counts",
 	"get_number_routers",
 	"get_number_covered_cells",
+	"get_population_number_covered_cells",
 	"compute_fitness",
+	"compute_population_fitness",
 	"get_random_router_placement",
 	"print_routers"
 ]
@@ -57,8 +68,9 @@ def filter_non_target_points(
 			considering the walls
 	:return: filtered points
 	"""
-	def is_wall(c): return c == "#"
-	def is_void(c): return c == "-"
+	def is_wall(c): return c == WALL
+	def is_void(c): return c == VOID
+	building_matrix = get_cell_grid(building_matrix)
 	filtered_points = list()
 
 	a, b = router_coords
@@ -89,76 +101,254 @@ def filter_non_target_points(
 	return filtered_points
 
 
+def filter_visible_points(
+	building_matrix: np.array,
+	router_coords: tuple,
+	points: list,
+	visibility: Visibility = None
+) -> list:
+	"""
+	Drop-in replacement of filter_non_target_points, finding the cells visible from the router with a sweep of
+	the nearest-wall runs of each quadrant (see Visibility) instead of scanning the rectangle of each cell
+
+	:param building_matrix: array of arrays, the matrix describing the building (voids, targets, walls)
+	:param router_coords: tuple, the (x,y) coordinates of a router in the building
+	:param points: list, list of the cells (described with (x,y) coordinates) covered by the router without
+			considering the walls
+	:param visibility: Visibility, the run tables of the whole building, optional: by default they are computed
+		only on the square around the router holding the points
+	:return: filtered points
+	"""
+	if len(points) == 0:
+		return []
+
+	a, b = int(router_coords[0]), int(router_coords[1])
+	coords = np.reshape(np.asarray(points, dtype=np.int64), (-1, 2))
+	if visibility is None:
+		radius = int(np.max(np.abs(coords - (a, b))))
+		row_start, column_start = max(0, a - radius), max(0, b - radius)
+		visibility = Visibility(
+			get_cell_grid(building_matrix)[row_start:a + radius + 1, column_start:b + radius + 1]
+		)
+		a, b = a - row_start, b - column_start
+		coords = coords - (row_start, column_start)
+
+	keep = visibility.is_visible((a, b), coords)
+	return [point for (point, kept) in zip(points, keep.tolist()) if kept]
+
+
+def get_router_coverage(
+	building_matrix: np.array,
+	router_coords: tuple,
+	router_range: int,
+	coverage_index: CoverageIndex = None
+) -> list:
+	"""
+	Returns the target cells covered by a router, considering voids and walls. If a coverage index is given the
+	precomputed footprint is used, otherwise the cells around the router are filtered one by one.
+
+	:param building_matrix: array of arrays, the matrix describing the building (voids, targets, walls)
+	:param router_coords: tuple, the (x,y) coordinates of a router in the building
+	:param router_range: int, the range of the router
+	:param coverage_index: CoverageIndex, the precomputed footprints of the building
+	:return: list of tuples, the cells covered by the router
+	"""
+	if coverage_index is not None:
+		return coverage_index.footprint(router_coords)
+
+	return filter_visible_points(
+		building_matrix,
+		router_coords,
+		get_points_around_router(building_matrix, router_coords, router_range)
+	)
+
+
+def get_coverage_mask(
+		routers_placement: np.array,
+		building_matrix: np.array,
+		router_range: int,
+		coverage_index: CoverageIndex = None
+) -> tuple:
+	"""
+	Given a placement of routers and the matrix of the building computes the mask of the target cells covered,
+	considering voids and walls. All the routers are processed at once, looping only over the (2R+1)^2 offsets
+	of the router square: if a coverage index is given the packed footprints of the routers are unpacked and
+	scattered on the mask, otherwise the enclosing rectangle of every (router, cell) pair is checked with the
+	prefix sum of walls.
+
+	:param routers_placement: the mask of the position of routers in the building, or their Placement
+	:param building_matrix: array of arrays, the matrix describing the building (voids, targets, walls)
+	:param router_range: range of the router
+	:param coverage_index: CoverageIndex, the precomputed footprints of the building, optional
+	:return: tuple, the first element is the boolean mask of the covered cells, the latter is the number of
+		unique target cells covered
+	"""
+	n, m = building_matrix.shape
+	coverage_mask = np.zeros(shape=(n, m), dtype=bool)
+
+	routers = np.transpose(np.nonzero(routers_placement))
+	if len(routers) == 0:
+		return coverage_mask, 0
+
+	if coverage_index is not None:
+		offsets = coverage_index.offsets
+		covered = np.unpackbits(
+			coverage_index.footprints[routers[:, 0], routers[:, 1]],
+			axis=1,
+			count=len(offsets)
+		).astype(bool)
+		covered_cells = (routers[:, np.newaxis, :] + offsets[np.newaxis, :, :])[covered]
+		coverage_mask[covered_cells[:, 0], covered_cells[:, 1]] = True
+	else:
+		p = get_wall_prefix_sum(building_matrix)
+		target_mask = get_target_mask(building_matrix)
+		rows, cols = routers[:, 0], routers[:, 1]
+		for dx, dy in itertools.product(range(-router_range, router_range + 1), repeat=2):
+			# keep the routers whose shifted cell is inside the building
+			inside = (0 <= rows + dx) & (rows + dx < n) & (0 <= cols + dy) & (cols + dy < m)
+			a, b = rows[inside], cols[inside]
+			x, y = a + dx, b + dy
+
+			# walls inside the smallest enclosing rectangle of router and cell
+			w_lower, w_upper = np.minimum(a, x), np.maximum(a, x)
+			v_lower, v_upper = np.minimum(b, y), np.maximum(b, y)
+			number_walls = (
+				p[w_upper + 1, v_upper + 1] - p[w_lower, v_upper + 1]
+				- p[w_upper + 1, v_lower] + p[w_lower, v_lower]
+			)
+
+			covered = (number_walls == 0) & target_mask[x, y]
+			coverage_mask[x[covered], y[covered]] = True
+
+	return coverage_mask, int(np.count_nonzero(coverage_mask))
+
+
+def get_coverage_counts(
+		routers_placement: np.array,
+		building_matrix: np.array,
+		router_range: int,
+		coverage_index: CoverageIndex = None
+) -> np.array:
+	"""
+	Given a placement of routers and the matrix of the building computes how many routers cover each cell,
+	considering voids and walls, for the whole placement at once.
+
+	The footprint of a router without walls in its square is the whole square clipped to the building, minus its
+	void cells: those squares are added with a 2D difference array, four updates per router and a prefix sum over
+	the building. Only the routers with a wall in their square are added cell by cell, unpacking their footprints
+	from the coverage index if it is given, otherwise one offset at a time as in get_coverage_mask.
+
+	:param routers_placement: the mask of the position of routers in the building, or their Placement
+	:param building_matrix: array of arrays, the matrix describing the building (voids, targets, walls)
+	:param router_range: range of the router
+	:param coverage_index: CoverageIndex, the precomputed footprints of the building, optional
+	:return: array of arrays of int32, the number of routers covering each cell (0 on walls and voids)
+	"""
+	n, m = building_matrix.shape
+	coverage_counts = np.zeros(shape=(n, m), dtype=np.int32)
+
+	routers = np.transpose(np.nonzero(routers_placement))
+	if len(routers) == 0:
+		return coverage_counts
+
+	target_mask = get_target_mask(building_matrix)
+	p = coverage_index.wall_prefix_sum if coverage_index is not None else get_wall_prefix_sum(building_matrix)
+	rows, cols = routers[:, 0], routers[:, 1]
+
+	# the squares of the routers clipped to the building, and the walls inside them
+	lower_rows, upper_rows = np.maximum(rows - router_range, 0), np.minimum(rows + router_range, n - 1)
+	lower_cols, upper_cols = np.maximum(cols - router_range, 0), np.minimum(cols + router_range, m - 1)
+	number_walls = (
+		p[upper_rows + 1, upper_cols + 1] - p[lower_rows, upper_cols + 1]
+		- p[upper_rows + 1, lower_cols] + p[lower_rows, lower_cols]
+	)
+	free = number_walls == 0
+
+	difference = np.zeros(shape=(n + 1, m + 1), dtype=np.int32)
+	lower_rows, upper_rows = lower_rows[free], upper_rows[free] + 1
+	lower_cols, upper_cols = lower_cols[free], upper_cols[free] + 1
+	np.add.at(difference, (lower_rows, lower_cols), 1)
+	np.add.at(difference, (lower_rows, upper_cols), -1)
+	np.add.at(difference, (upper_rows, lower_cols), -1)
+	np.add.at(difference, (upper_rows, upper_cols), 1)
+	squares = difference.cumsum(axis=0, dtype=np.int32).cumsum(axis=1, dtype=np.int32)[:n, :m]
+	coverage_counts[target_mask] = squares[target_mask]
+
+	# the footprints cut by walls
+	routers = routers[~free]
+	if len(routers) == 0:
+		return coverage_counts
+
+	if coverage_index is not None:
+		offsets = coverage_index.offsets
+		covered = np.unpackbits(
+			coverage_index.footprints[routers[:, 0], routers[:, 1]],
+			axis=1,
+			count=len(offsets)
+		).astype(bool)
+		covered_cells = (routers[:, np.newaxis, :] + offsets[np.newaxis, :, :])[covered]
+		coverage_counts += np.bincount(
+			covered_cells[:, 0] * m + covered_cells[:, 1], minlength=n * m
+		).reshape(n, m).astype(np.int32)
+	else:
+		rows, cols = routers[:, 0], routers[:, 1]
+		for dx, dy in itertools.product(range(-router_range, router_range + 1), repeat=2):
+			inside = (0 <= rows + dx) & (rows + dx < n) & (0 <= cols + dy) & (cols + dy < m)
+			a, b = rows[inside], cols[inside]
+			x, y = a + dx, b + dy
+
+			w_lower, w_upper = np.minimum(a, x), np.maximum(a, x)
+			v_lower, v_upper = np.minimum(b, y), np.maximum(b, y)
+			number_walls = (
+				p[w_upper + 1, v_upper + 1] - p[w_lower, v_upper + 1]
+				- p[w_upper + 1, v_lower] + p[w_lower, v_lower]
+			)
+
+			# for a given offset every router covers a different cell
+			covered = (number_walls == 0) & target_mask[x, y]
+			coverage_counts[x[covered], y[covered]] += 1
+
+	return coverage_counts
+
+
 def get_number_covered_cells(
 		routers_placement: np.array,
 		building_matrix: np.array,
-		router_range: int
+		router_range: int,
+		coverage_index: CoverageIndex = None
 ) -> int:
 	"""
 	Given a placement of routers and the matrix of the building returns the number of unique target
 	cells covered, considering voids and walls.
 
-	:param routers_placement: the mask of the position of routers in the building
+	:param routers_placement: the mask of the position of routers in the building, or their Placement
 	:param building_matrix: array of arrays, the matrix describing the building (voids, targets, walls)
 	:param router_range: range of the router
+	:param coverage_index: CoverageIndex, the precomputed footprints of the building, optional
 	:return: the number of unique target cells covered
 	"""
-	covered_cells = set()
-	# iterate over routers (non zero cells)
-	for router_coords in zip(*routers_placement.nonzero()):
-		# compute points covered by the router
-		points_covered_by_router = get_points_around_router(
-			routers_placement,
-			router_coords,
-			router_range
-		)
-		# filter points covered by walls and void cells
-		points_covered_by_router = filter_non_target_points(
-			building_matrix,
-			router_coords,
-			points_covered_by_router
-		)
-
-		for covered_cell in points_covered_by_router:
-			covered_cells.add(covered_cell)
-
-	return len(covered_cells)
+	_, number_covered_cells = get_coverage_mask(routers_placement, building_matrix, router_range, coverage_index)
+	return number_covered_cells
 
 
 def get_covered_cells(
 		routers_placement: np.array,
 		building_matrix: np.array,
-		router_range: int
+		router_range: int,
+		coverage_index: CoverageIndex = None
 ) -> set:
 	"""
 	Given a placement of routers and the matrix of the building returns the unique target
 	cells covered, considering voids and walls.
 
-	:param routers_placement: the mask of the position of routers in the building
+	:param routers_placement: the mask of the position of routers in the building, or their Placement
 	:param building_matrix: array of arrays, the matrix describing the building (voids, targets, walls)
 	:param router_range: range of the router
+	:param coverage_index: CoverageIndex, the precomputed footprints of the building, optional
 	:return: the number of unique target cells covered
 	"""
-	covered_cells = set()
-	# iterate over routers (non zero cells)
-	for router_coords in zip(*routers_placement.nonzero()):
-		# compute points covered by the router
-		points_covered_by_router = get_points_around_router(
-			routers_placement,
-			router_coords,
-			router_range
-		)
-		# filter points covered by walls and void cells
-		points_covered_by_router = filter_non_target_points(
-			building_matrix,
-			router_coords,
-			points_covered_by_router
-		)
-
-		for covered_cell in points_covered_by_router:
-			covered_cells.add(covered_cell)
-
-	return covered_cells
+	coverage_mask, _ = get_coverage_mask(routers_placement, building_matrix, router_range, coverage_index)
+	return set(zip(*coverage_mask.nonzero()))
 
 
 def get_number_routers(
@@ -166,13 +356,15 @@ def get_number_routers(
 ) -> int:
 	"""
 	:param routers_placement: array of arrays, matrix which indicates the cells where routers are
-			placed. If a cell contains a router its value is 1, otherwise 0
+			placed. If a cell contains a router its value is 1, otherwise 0; or the sparse Placement of the routers
 	:return: the number of routers
 	"""
+	if isinstance(routers_placement, Placement):
+		return len(routers_placement)
 	return np.count_nonzero(routers_placement)
 
 
-def get_uncovered(routers_placement, building_matrix, router_range):
+def get_uncovered(routers_placement, building_matrix, router_range, coverage_index=None):
 
 	"""
 	Given a router placement, the building matrix and the router range, it returns a list of tuples cotaining
@@ -182,11 +374,12 @@ def get_uncovered(routers_placement, building_matrix, router_range):
 	covered_cells = get_covered_cells(
 		routers_placement,
 		building_matrix,
-		router_range
+		router_range,
+		coverage_index
 	)
 	covered_cells = list(covered_cells)
 
-	np_to_cover = np.nonzero(building_matrix == ".")
+	np_to_cover = np.nonzero(get_target_mask(building_matrix))
 	to_cover = [(i, j) for (i, j) in zip(np_to_cover[0], np_to_cover[1])]
 
 	uncovered = []
@@ -205,11 +398,22 @@ def get_nearest_router(cell : tuple[int, int], routers : np.array) -> tuple[int,
 
 	Args:
 		cell: tuple, the cell to be considered
-		routers: numpy array of arrays, the position of the routers
+		routers: numpy array of arrays, the position of the routers, their sparse Placement or their RouterIndex
 
 	Returns:
 		tuple of int indicating the nearest router to cell
 	"""
+	if isinstance(routers, RouterIndex):
+		return routers.nearest(cell)
+
+	if isinstance(routers, Placement):
+		# the router at the minimum Chebyshev distance, the same distance reached by the search below
+		if len(routers) == 0:
+			return None
+		routers_coords = routers.coords
+		i = np.argmin(np.max(np.abs(routers_coords - np.array(cell)), axis=1))
+		return int(routers_coords[i][0]), int(routers_coords[i][1])
+
 	m, n = routers.shape
 	cell_row, cell_col = cell
 
@@ -250,7 +454,7 @@ def get_grid_router_placement(data : Data, rescale_range_factor : float = 1) ->
 
 	for i in np.arange(range, data.height - range , range *2 +1):
 		for j in np.arange(range , data.width - range , range*2 +1):
-			if data.building_matrix[i][j] == '.':
+			if data.target_mask[i][j]:
 				router_placement[i][j] = 1
 
 	return router_placement
@@ -258,6 +462,48 @@ def get_grid_router_placement(data : Data, rescale_range_factor : float = 1) ->
 
 
 
+def get_population_number_covered_cells(
+		population: list,
+		building_matrix: np.array,
+		router_range: int,
+		coverage_index: CoverageIndex = None
+) -> np.array:
+	"""
+	Computes get_number_covered_cells for a whole population at once: the routers of all the placements are
+	stacked, their packed footprints are unpacked in a single pass and scattered on one coverage mask per
+	placement, so the cost of the numpy calls is paid once per population instead of once per placement.
+
+	:param population: list of arrays of shape (k, 2), the coordinates of the routers of each placement
+	:param building_matrix: array of arrays, the matrix describing the building (voids, targets, walls)
+	:param router_range: range of the router
+	:param coverage_index: CoverageIndex, the precomputed footprints of the building, optional; without it the
+		placements are evaluated one at a time
+	:return: array of ints, the number of unique target cells covered by each placement
+	"""
+	n, m = building_matrix.shape
+	if coverage_index is None:
+		return np.array([
+			get_number_covered_cells(Placement((n, m), routers_coords), building_matrix, router_range)
+			for routers_coords in population
+		], dtype=np.int64)
+
+	population = [np.reshape(routers_coords, (-1, 2)).astype(np.int64) for routers_coords in population]
+	routers = np.concatenate(population + [np.empty(shape=(0, 2), dtype=np.int64)])
+	# the index of the placement of each router
+	owners = np.repeat(np.arange(len(population)), [len(routers_coords) for routers_coords in population])
+
+	offsets = coverage_index.offsets
+	covered = np.unpackbits(coverage_index.footprints[routers[:, 0], routers[:, 1]], axis=1, count=len(offsets)).astype(bool)
+
+	# index of each covered cell in the flattened coverage masks of the population, one after the other
+	router_indices = owners * (n * m) + routers[:, 0] * m + routers[:, 1]
+	covered_indices = (router_indices[:, np.newaxis] + (offsets[:, 0] * m + offsets[:, 1])[np.newaxis, :])[covered]
+
+	coverage_masks = np.zeros(shape=(len(population), n * m), dtype=bool)
+	coverage_masks.ravel()[covered_indices] = True
+	return np.count_nonzero(coverage_masks, axis=1)
+
+
 def compute_fitness(
 		building_matrix: np.array,
 		routers_placement: np.array,
@@ -265,7 +511,9 @@ def compute_fitness(
 		backbone_starting_point: tuple,
 		router_cost: int,
 		backbone_cost: int,
-		budget: int
+		budget: int,
+		coverage_index: CoverageIndex = None,
+		backbone_tree: backbone.IncrementalBackbone = None
 	) -> tuple:
 
 	"""
@@ -273,27 +521,35 @@ def compute_fitness(
 
 		:param building_matrix: array of arrays, matrix which indicates the presence of voids/targers/walls
 		:param routers_placement: array of arrays, matrix which indicates the cells where routers are
-			placed. If a cell contains a router its value is 1, otherwise 0
+			placed. If a cell contains a router its value is 1, otherwise 0; or the sparse Placement of the routers
 		:param router_range: int, the range of a router
 		:param backbone_starting_point: tuple, 
 		:param router_cost:
 		:param backbone_cost:
 		:param budget:
+		:param coverage_index: CoverageIndex, the precomputed footprints of the building, optional
+		:param backbone_tree: IncrementalBackbone, if given it is updated with the routers of the placement and
+			its length is used, instead of building the backbone from scratch; useful when consecutive
+			evaluations differ by few routers
 		:return: tuple, the first value is the fitness score, while the second is equal to True if the solution
 			cost is greater than the budget, False otherwise.
 	"""
 	# compute number of cells covered by router signal
-	number_covered_cells = get_number_covered_cells(routers_placement, building_matrix, router_range)
+	number_covered_cells = get_number_covered_cells(routers_placement, building_matrix, router_range, coverage_index)
 
 	# compute number of routers
 	number_routers = get_number_routers(routers_placement)
 
 	# compute cost of backbone connecting routers
-	backbone_length = backbone.get_backbone_length(
-		backbone_starting_point,
-		routers_placement,
-		backbone_cost
-	)
+	if backbone_tree is not None:
+		backbone_tree.update(np.transpose(np.nonzero(routers_placement)))
+		backbone_length = backbone_tree.length
+	else:
+		backbone_length = backbone.get_backbone_length(
+			backbone_starting_point,
+			routers_placement,
+			backbone_cost
+		)
 	
 	total_cost = number_routers*router_cost + backbone_length*backbone_cost
 
@@ -302,6 +558,38 @@ def compute_fitness(
 	return score, total_cost > budget
 
 
+def compute_population_fitness(
+		building_matrix: np.array,
+		population: list,
+		router_range: int,
+		backbone_starting_point: tuple,
+		router_cost: int,
+		backbone_cost: int,
+		budget: int,
+		coverage_index: CoverageIndex = None
+	) -> list:
+	"""
+		Computes compute_fitness for a whole population, the coverage of all the placements with a single
+		vectorized pass (see get_population_number_covered_cells)
+
+		:param population: list of arrays of shape (k, 2), the coordinates of the routers of each placement
+		:return: list of tuples, the fitness of each placement, as returned by compute_fitness
+	"""
+	population = [np.unique(np.reshape(routers_coords, (-1, 2)), axis=0) for routers_coords in population]
+	numbers_covered_cells = get_population_number_covered_cells(population, building_matrix, router_range, coverage_index)
+
+	fitnesses = []
+	for routers_coords, number_covered_cells in zip(population, numbers_covered_cells.tolist()):
+		backbone_length = backbone.get_steiner_length(
+			backbone_starting_point, routers_coords, building_matrix.shape, backbone_cost
+		)
+		total_cost = len(routers_coords) * router_cost + backbone_length * backbone_cost
+		score = 1000 * number_covered_cells + (budget - total_cost)
+		fitnesses.append((score, total_cost > budget))
+
+	return fitnesses
+
+
 def get_random_router_placement(
 		building_matrix: np.array,
 		number_routers: int
@@ -321,7 +609,8 @@ def get_random_router_placement(
 		random.randint(0, width-1),
 		random.randint(0, height-1)
 	)
-	is_target = lambda c: c == "."
+	building_matrix = get_cell_grid(building_matrix)
+	is_target = lambda c: c == TARGET
 	contains_router = lambda c: c == 1
 
 	number_routers_created = 0
@@ -340,7 +629,7 @@ def get_random_router_placement(
 
 
 def save_output_matrix(path, building_matrix, state, score):
-	_building_matrix = np.copy(building_matrix)
+	_building_matrix = decode_building(get_cell_grid(building_matrix))
 	router_coords = [ (i,j) for (i,j) in zip(*state.nonzero())]
 	for (i, j) in router_coords:
 		_building_matrix[i][j] = 1
@@ -1,6 +1,7 @@
 import matplotlib.pyplot as plt
 import numpy as np
 import utils
+from classes.CellType import WALL, VOID, get_cell_grid
 
 def plot_solution(
 		building_matrix: np.array,
@@ -19,15 +20,17 @@ def plot_solution(
 	:param ax: axis on which place the plot
 	"""
 	# creating matrix for plot
+	building_matrix = get_cell_grid(building_matrix)
+	routers_placement = np.asarray(routers_placement)
 	plot_matrix = np.zeros(shape=building_matrix.shape)
 
 	n, m = building_matrix.shape
 	for i in range(n):
 		for j in range(m):
 			# filling the matrix with voids/walls/targets
-			if building_matrix[i][j] == "#":  # adding wall
+			if building_matrix[i][j] == WALL:  # adding wall
 				plot_matrix[i][j] = 10
-			elif building_matrix[i][j] == "-":  # adding void
+			elif building_matrix[i][j] == VOID:  # adding void
 				plot_matrix[i][j] = 20
 
 			# adding routers
@@ -51,7 +54,8 @@ def plot_heatmap(
 	building_matrix: np.array,
 	routers_placement: np.array,
 	router_radius: int,
-	ax=None
+	ax=None,
+	coverage_index=None
 ):
 	"""
 	Plots a heatmap where lighter areas corresponds to cells covered by the routers
@@ -60,34 +64,34 @@ def plot_heatmap(
 	:param routers_placement: array of arrays, the matrix describing the placement of the routers inside the building
 	:param router_radius: int, the range of a router
 	:param ax: axis on which place the plot
+	:param coverage_index: CoverageIndex, the precomputed footprints of the building, optional
 	"""
 	# finding all the points covered by the routers
 	points_covered_by_routers = []
 	for router_coords in np.transpose(np.nonzero(routers_placement)):
 		router_row, router_column = tuple(router_coords)
 
-		covered_points = utils.filter_non_target_points(
+		covered_points = utils.get_router_coverage(
 			building_matrix,
 			(router_row, router_column),
-			utils.get_points_around_router(
-				building_matrix,
-				(router_row, router_column),
-				router_radius
-			)
+			router_radius,
+			coverage_index
 		)
 		for covered_point in covered_points:
 			points_covered_by_routers.append(covered_point)
 
 	# creating matrix for plot
+	building_matrix = get_cell_grid(building_matrix)
+	routers_placement = np.asarray(routers_placement)
 	plot_matrix = np.zeros(shape=building_matrix.shape)
 
 	n, m = building_matrix.shape
 	for i in range(n):
 		for j in range(m):
 			# filling the matrix with voids/walls/targets
-			if building_matrix[i][j] == "#":  # adding wall
+			if building_matrix[i][j] == WALL:  # adding wall
 				plot_matrix[i][j] = 10
-			elif building_matrix[i][j] == "-":  # adding void
+			elif building_matrix[i][j] == VOID:  # adding void
 				plot_matrix[i][j] = 20
 
 			# adding routers
@@ -107,6 +111,7 @@ def plot_complete(
 		router_radius: int,
 		backbone_nodes: list = [],
 		backbone_starting_point: tuple = (),
+		coverage_index=None
 ):
 	"""
 	Plots the building planimetry (and routers placement) alongside the covered area of the building
@@ -116,6 +121,7 @@ def plot_complete(
 	:param router_radius: int, the range of a router
 	:param backbone_nodes: list of tuples, the list of nodes belonging to the backbone
 	:param backbone_starting_point: tuple, the backbone initial starting point coordinates
+	:param coverage_index: CoverageIndex, the precomputed footprints of the building, optional
 	"""
 	# creating figure with 2 subplots
 	fig, (ax1, ax2) = plt.subplots(1, 2)
@@ -135,7 +141,8 @@ def plot_complete(
 		building_matrix,
 		routers_placement,
 		router_radius,
-		ax2
+		ax2,
+		coverage_index
 	)
 
 	plt.show()